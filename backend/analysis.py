@@ -221,29 +221,18 @@ def analyze_client_diversity(proposals_data, cache_data, ens_names):
         'X': 'External'
     }
     
-    # Count distributions
-    execution_counts = {}
-    consensus_counts = {}
-    setup_counts = {}
-    combination_counts = {}
-    
-    for operator, data in operator_proposals.items():
-        exec_client = data['execution_client']
-        cons_client = data['consensus_client']
-        setup_type = data['setup_type']
-        
-        # Count individual client types
-        exec_name = execution_names.get(exec_client, exec_client)
-        cons_name = consensus_names.get(cons_client, cons_client)
-        setup_name = setup_names.get(setup_type, setup_type)
-        
-        execution_counts[exec_name] = execution_counts.get(exec_name, 0) + 1
-        consensus_counts[cons_name] = consensus_counts.get(cons_name, 0) + 1
-        setup_counts[setup_name] = setup_counts.get(setup_name, 0) + 1
-        
-        # Count execution + consensus combinations (ignore setup type)
-        combination = f"{exec_name} + {cons_name}"
-        combination_counts[combination] = combination_counts.get(combination, 0) + 1
+    # Count distributions (single pass over the per-operator client codes)
+    client_codes = [
+        (data['execution_client'], data['consensus_client'], data['setup_type'])
+        for data in operator_proposals.values()
+    ]
+    execution_counts = Counter(execution_names.get(e, e) for e, _, _ in client_codes)
+    consensus_counts = Counter(consensus_names.get(c, c) for _, c, _ in client_codes)
+    setup_counts = Counter(setup_names.get(s, s) for _, _, s in client_codes)
+    # Count execution + consensus combinations (ignore setup type)
+    combination_counts = Counter(
+        f"{execution_names.get(e, e)} + {consensus_names.get(c, c)}" for e, c, _ in client_codes
+    )
     
     # Calculate statistics
     total_operators = len(operator_validators) if operator_validators else 0
@@ -252,10 +241,10 @@ def analyze_client_diversity(proposals_data, cache_data, ens_names):
     return {
         'total_operators': total_operators,
         'operators_with_proposals': operators_with_proposals,
-        'execution_counts': execution_counts,
-        'consensus_counts': consensus_counts,
-        'setup_counts': setup_counts,
-        'combination_counts': combination_counts,
+        'execution_counts': dict(execution_counts),
+        'consensus_counts': dict(consensus_counts),
+        'setup_counts': dict(setup_counts),
+        'combination_counts': dict(combination_counts),
         'operator_details': operator_proposals
     }
 
@@ -291,6 +280,20 @@ def analyze_missed_proposals_stats(missed_proposals_data, proposals_data):
         'avg_missed_per_operator': total_missed / len(operator_missed_counts) if operator_missed_counts else 0
     }
 
+def _group_attestation_totals(operator_codes: np.ndarray, performances: np.ndarray, excluded: np.ndarray, n_operators: int):
+    """
+    Grouped per-operator totals for attestation-only analysis.
+    
+    Returns (total validators, excluded validators, attestation validators, attestation performance sum),
+    each indexed by operator code. Attestation validators are non-excluded validators with positive performance.
+    """
+    attesting = ~excluded & (performances > 0)
+    totals = np.bincount(operator_codes, minlength=n_operators)
+    excluded_counts = np.bincount(operator_codes[excluded], minlength=n_operators)
+    attestation_counts = np.bincount(operator_codes[attesting], minlength=n_operators)
+    performance_sums = np.bincount(operator_codes[attesting], weights=performances[attesting], minlength=n_operators)
+    return totals, excluded_counts, attestation_counts, performance_sums
+
 def calculate_attestation_performance(
     validators_data: Dict[str, Any],
     proposals_data: Dict[str, Any],
@@ -366,9 +369,13 @@ def calculate_attestation_performance(
     if validator_data and validator_data.get('ens_names'):
         ens_names = validator_data['ens_names']
     
-    # Group validators by operator and calculate attestation performance
-    operator_data = {}
+    # Flatten eligible validators into parallel columns keyed by integer operator codes
+    operator_codes = {}
+    codes = []
+    performances = []
+    excluded = []
     validators = validators_data.get('validators', {})
+    performance_field = 'performance_7d' if days == 7 else 'performance_31d'
     
     for validator_id, validator_info in validators.items():
         try:
@@ -384,61 +391,41 @@ def calculate_attestation_performance(
             if activation_timestamp and activation_timestamp > activity_timestamp:
                 continue  # Validator hasn't been active long enough
             
-            # Get performance data (matching frontend access pattern exactly)
-            performance_metrics = validator_info.get('performance_metrics', {})
-            
             # Use the appropriate period's performance data (matching frontend logic)
-            if days == 7:
-                performance_gwei = performance_metrics.get('performance_7d', 0) or 0
-            else:  # 31 days
-                performance_gwei = performance_metrics.get('performance_31d', 0) or 0
-            
-            # Initialize operator data if not exists
-            if operator not in operator_data:
-                operator_data[operator] = {
-                    'operator': operator,
-                    'ens_name': ens_names.get(operator, ''),
-                    'total_validators': 0,
-                    'attestation_validators': 0,
-                    'excluded_validators': 0,
-                    'regular_performances': []  # Track individual performances like frontend
-                }
+            performance_gwei = validator_info.get('performance_metrics', {}).get(performance_field, 0) or 0
             
-            # Count total validators for this operator
-            operator_data[operator]['total_validators'] += 1
-            
-            # Check if validator is excluded from attestation-only analysis (matching frontend logic)
-            if validator_index in excluded_validators:
-                operator_data[operator]['excluded_validators'] += 1
-            elif performance_gwei > 0:  # Only include validators with positive performance (matching frontend)
-                # This is an attestation-only validator with positive performance
-                operator_data[operator]['attestation_validators'] += 1
-                operator_data[operator]['regular_performances'].append(performance_gwei)
+            codes.append(operator_codes.setdefault(operator, len(operator_codes)))
+            performances.append(float(performance_gwei))
+            excluded.append(validator_index in excluded_validators)
         
         except Exception as e:
             print(f"Error processing validator {validator_id}: {e}")
             continue
     
+    totals, excluded_counts, attestation_counts, performance_sums = _group_attestation_totals(
+        np.array(codes, dtype=np.int64),
+        np.array(performances, dtype=np.float64),
+        np.array(excluded, dtype=bool),
+        len(operator_codes)
+    )
+    
     # Calculate final metrics and create preliminary results (matching frontend logic exactly)
     preliminary_results = []
-    for operator, data in operator_data.items():
+    for operator, code in operator_codes.items():
         # Only include operators with attestation-only validators with positive performance (matching frontend filter)
-        if len(data['regular_performances']) == 0:
+        attestation_validators = int(attestation_counts[code])
+        if attestation_validators == 0:
             continue
         
-        # Calculate average performance excluding zero rewards (matching frontend logic)
-        regular_performances = [p for p in data['regular_performances'] if p > 0]
-        avg_attestation_performance = (
-            sum(regular_performances) / len(regular_performances) 
-            if len(regular_performances) > 0 else 0
-        )
+        # Average performance over positive rewards only (matching frontend logic)
+        avg_attestation_performance = float(performance_sums[code]) / attestation_validators
         
         preliminary_results.append({
             'operator': operator,
-            'ens_name': data['ens_name'],
-            'total_validators': data['total_validators'],
-            'attestation_validators': data['attestation_validators'],
-            'excluded_validators': data['excluded_validators'],
+            'ens_name': ens_names.get(operator, ''),
+            'total_validators': int(totals[code]),
+            'attestation_validators': attestation_validators,
+            'excluded_validators': int(excluded_counts[code]),
             'regular_performance_gwei': avg_attestation_performance,
             'avg_performance': avg_attestation_performance
         })
@@ -0,0 +1,58 @@
+"""
+ASGI interceptor answering liveness probes before they reach the FastAPI stack
+"""
+
+from typing import Iterable, List, Tuple
+
+from utils import iso_now
+
+# Frozen probe payload; only the timestamp is spliced in, once per second
+_TEMPLATE_PREFIX = b'{"status":"healthy","timestamp":"'
+_TEMPLATE_SUFFIX = b'"}'
+# [timestamp, response headers, response body] for the last rendered probe
+_probe_cache: list = ["", [], b""]
+
+METHOD_NOT_ALLOWED_BODY = b'{"detail":"Method Not Allowed"}'
+METHOD_NOT_ALLOWED_HEADERS = [
+    (b"content-type", b"application/json"),
+    (b"content-length", str(len(METHOD_NOT_ALLOWED_BODY)).encode()),
+    (b"allow", b"GET, HEAD"),
+]
+
+def _probe_response() -> Tuple[List[Tuple[bytes, bytes]], bytes]:
+    """Headers and body for a liveness probe, re-rendered only when the second changes"""
+    timestamp = iso_now()
+    if _probe_cache[0] != timestamp:
+        body = _TEMPLATE_PREFIX + timestamp.encode() + _TEMPLATE_SUFFIX
+        headers = [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+        _probe_cache[:] = [timestamp, headers, body]
+    return _probe_cache[1], _probe_cache[2]
+
+class HealthCheckInterceptor:
+    """
+    Pure ASGI wrapper that short-circuits liveness probe paths with a precomputed JSON body
+
+    Matching requests skip the rest of the middleware stack, routing and response model
+    validation; everything else (including lifespan events) is passed through to the
+    wrapped app. The full health report stays on the router at /health/.
+    """
+
+    def __init__(self, app, paths: Iterable[str] = ("/health/live",)):
+        self.app = app
+        self.paths = frozenset(paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        if scope["method"] in ("GET", "HEAD"):
+            status = 200
+            headers, body = _probe_response()
+            if scope["method"] == "HEAD":
+                body = b""
+        else:
+            status, headers, body = 405, METHOD_NOT_ALLOWED_HEADERS, METHOD_NOT_ALLOWED_BODY
+
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
@@ -30,6 +30,10 @@ class Settings:
     CLICKHOUSE_DATABASE: str = os.getenv("CLICKHOUSE_DATABASE", "default")
     CLICKHOUSE_ENABLED: bool = os.getenv("CLICKHOUSE_ENABLED", "true").lower() == "true"
     CLICKHOUSE_TIMEOUT: int = int(os.getenv("CLICKHOUSE_TIMEOUT", "300"))
+    CLICKHOUSE_MAX_CONCURRENT_QUERIES: int = int(os.getenv("CLICKHOUSE_MAX_CONCURRENT_QUERIES", "8"))
+    # Per-query memory cap and GROUP BY spill threshold for the window-wide aggregations
+    CLICKHOUSE_MAX_MEMORY_USAGE: int = int(os.getenv("CLICKHOUSE_MAX_MEMORY_USAGE", "8000000000"))
+    CLICKHOUSE_EXTERNAL_GROUP_BY_BYTES: int = int(os.getenv("CLICKHOUSE_EXTERNAL_GROUP_BY_BYTES", "4000000000"))
     
     # Cache Configuration
     CACHE_TTL_SECONDS: int = int(os.getenv("CACHE_TTL_SECONDS", "900"))  # 15 minutes
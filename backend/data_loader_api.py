@@ -4,12 +4,16 @@ Converted from Streamlit version - removes @st.cache_data decorators and Streaml
 """
 
 import json
+import mmap
 import os
 import base64
 from datetime import datetime
 from typing import Tuple, Optional, Dict, Any
 from functools import lru_cache
 
+import numpy as np
+import orjson
+
 # Configuration constants (copied from config.py)
 CACHE_FILES = [
     './nodeset_validator_tracker_cache.json',
@@ -171,14 +175,28 @@ def clear_cache():
     _file_mod_times.clear()
     print("🗑️ Manually cleared all cached data")
 
+def read_json_file(path: str) -> Any:
+    """Parse a JSON file with orjson over a read-only mmap"""
+    with open(path, 'rb') as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped
+            return json.loads(f.read())
+        with mm, memoryview(mm) as view:
+            try:
+                return orjson.loads(view)
+            except orjson.JSONDecodeError:
+                # Let the stdlib parser handle anything orjson rejects
+                return json.loads(bytes(view))
+
 def load_validator_data() -> Tuple[Optional[Dict], Optional[str]]:
     """Load validator data from cache file"""
     def _load():
         for cache_file in CACHE_FILES:
             if os.path.exists(cache_file):
                 try:
-                    with open(cache_file, 'r') as f:
-                        cache = json.load(f)
+                    cache = read_json_file(cache_file)
                     
                     # Add last_updated timestamp based on file modification time
                     # to ensure cache timestamp reflects when data was actually updated
@@ -193,14 +211,58 @@ def load_validator_data() -> Tuple[Optional[Dict], Optional[str]]:
     
     return _get_cached_or_load("validator_data", _load, 900, CACHE_FILES)
 
+def get_operator_validator_counts(validator_data: Optional[Dict]) -> Dict[str, int]:
+    """Extract operator validator counts from validator data"""
+    if not validator_data:
+        return {}
+    
+    # Check if data has operator_validators directly
+    if "operator_validators" in validator_data:
+        return validator_data["operator_validators"]
+    
+    # Fallback to parsing validators array
+    operator_counts = {}
+    validators = validator_data.get("validators", [])
+    
+    for validator in validators:
+        operator = validator.get("operator", "")
+        if operator:
+            operator_counts[operator] = operator_counts.get(operator, 0) + 1
+    
+    return operator_counts
+
+def load_validator_arrays() -> Optional[Dict[str, np.ndarray]]:
+    """Load per-operator columns derived from validator data
+
+    Builds aligned arrays (operator_ids, operator_counts, exited_counts) once per
+    validator data file version so analytics calls can slice columns instead of
+    iterating the raw dicts.
+    """
+    def _build():
+        validator_data, _ = load_validator_data()
+        if not validator_data:
+            return None
+
+        operator_validators = get_operator_validator_counts(validator_data)
+        exited_validators = validator_data.get('exited_validators', {})
+        n = len(operator_validators)
+        return {
+            'operator_ids': np.array(list(operator_validators), dtype=object),
+            'operator_counts': np.fromiter(operator_validators.values(), dtype=np.int64, count=n),
+            'exited_counts': np.fromiter(
+                (exited_validators.get(op, 0) for op in operator_validators), dtype=np.int64, count=n
+            ),
+        }
+
+    return _get_cached_or_load("validator_arrays", _build, 900, CACHE_FILES)
+
 def load_proposals_data() -> Tuple[Optional[Dict], Optional[str]]:
     """Load proposals data from JSON file"""
     def _load():
         for proposals_file in PROPOSALS_FILES:
             if os.path.exists(proposals_file):
                 try:
-                    with open(proposals_file, 'r') as f:
-                        data = json.load(f)
+                    data = read_json_file(proposals_file)
                     return data, proposals_file
                 except Exception as e:
                     print(f"⚠ Error loading {proposals_file}: {str(e)}")
@@ -214,8 +276,7 @@ def load_missed_proposals_data() -> Tuple[Optional[Dict], Optional[str]]:
         for path in MISSED_PROPOSALS_FILES:
             try:
                 if os.path.exists(path):
-                    with open(path, 'r') as f:
-                        data = json.load(f)
+                    data = read_json_file(path)
                     return data, path
             except Exception as e:
                 print(f"⚠ Error loading {path}: {str(e)}")
@@ -229,8 +290,7 @@ def load_mev_analysis_data() -> Tuple[Optional[Dict], Optional[str]]:
         for mev_file in MEV_FILES:
             if os.path.exists(mev_file):
                 try:
-                    with open(mev_file, 'r') as f:
-                        data = json.load(f)
+                    data = read_json_file(mev_file)
                     return data, mev_file
                 except Exception as e:
                     print(f"⚠ Error loading {mev_file}: {str(e)}")
@@ -244,8 +304,7 @@ def load_sync_committee_data() -> Tuple[Optional[Dict], Optional[str]]:
         for path in SYNC_COMMITTEE_FILES:
             try:
                 if os.path.exists(path):
-                    with open(path, 'r') as f:
-                        data = json.load(f)
+                    data = read_json_file(path)
                     return data, path
             except Exception as e:
                 print(f"⚠ Error loading {path}: {str(e)}")
@@ -259,8 +318,7 @@ def load_exit_data() -> Tuple[Optional[Dict], Optional[str]]:
         for path in EXIT_DATA_FILES:
             try:
                 if os.path.exists(path):
-                    with open(path, 'r') as f:
-                        data = json.load(f)
+                    data = read_json_file(path)
                     return data, path
             except Exception as e:
                 print(f"⚠ Error loading {path}: {str(e)}")
@@ -274,8 +332,7 @@ def load_validator_performance_data() -> Tuple[Optional[Dict], Optional[str]]:
         for path in VALIDATOR_PERFORMANCE_FILES:
             try:
                 if os.path.exists(path):
-                    with open(path, 'r') as f:
-                        data = json.load(f)
+                    data = read_json_file(path)
                     
                     # Update last_updated to reflect file modification time
                     # This ensures the cache timestamp reflects when data was actually updated
@@ -295,8 +352,7 @@ def load_ens_names() -> Tuple[Optional[Dict], Optional[str]]:
         for path in ENS_NAMES_FILES:
             try:
                 if os.path.exists(path):
-                    with open(path, 'r') as f:
-                        data = json.load(f)
+                    data = read_json_file(path)
                     return data, path
             except Exception as e:
                 print(f"⚠ Error loading {path}: {str(e)}")
@@ -310,8 +366,7 @@ def load_vault_events_data() -> Tuple[Optional[Dict], Optional[str]]:
         for path in VAULT_EVENTS_FILES:
             try:
                 if os.path.exists(path):
-                    with open(path, 'r') as f:
-                        data = json.load(f)
+                    data = read_json_file(path)
                     
                     # Add last_updated timestamp based on file modification time
                     file_mod_time = os.path.getmtime(path)
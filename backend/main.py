@@ -6,12 +6,18 @@ Main application entry point.
 
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
 import uvicorn
+import asyncio
+import logging
+import signal
 from contextlib import asynccontextmanager
 
 # Import routers
 from routers import dashboard, data, health, analytics, attestations, nodeset, operator_performance, enhanced_analytics, outages
+from utils import FastJSONResponse
+from asgi_health import HealthCheckInterceptor
+
+logger = logging.getLogger(__name__)
 
 # Version and metadata
 __version__ = "1.0.0"
@@ -22,9 +28,19 @@ async def lifespan(app: FastAPI):
     # Startup
     print("🚀 FastAPI Backend Starting...")
     print(f"📊 NodeSet Validator Dashboard API v{__version__}")
+    # Cache clears run in a background worker, triggered by POST /health/clear-cache or SIGUSR1
+    cache_clear_worker = health.start_cache_clear_worker()
+    loop = asyncio.get_running_loop()
+    try:
+        loop.add_signal_handler(signal.SIGUSR1, health.request_cache_clear)
+    except (AttributeError, NotImplementedError):
+        pass  # No SIGUSR1 / loop signal handlers on this platform (e.g. Windows)
     yield
     # Shutdown
     print("🔄 FastAPI Backend Shutting Down...")
+    if hasattr(signal, "SIGUSR1"):
+        loop.remove_signal_handler(signal.SIGUSR1)
+    cache_clear_worker.cancel()
     # Close ClickHouse service connections
     from services.clickhouse_service import clickhouse_service
     await clickhouse_service.close()
@@ -48,6 +64,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Liveness probes (/health/live) are answered here, ahead of CORS and routing
+app.add_middleware(HealthCheckInterceptor)
+
 # Include routers
 app.include_router(health.router, prefix="/health", tags=["health"])
 app.include_router(data.router, prefix="/api/data", tags=["data"])
@@ -74,9 +93,11 @@ async def root():
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
     """Global exception handler for unhandled errors"""
-    return JSONResponse(
+    logger.exception(f"Unhandled error on {request.method} {request.url.path}")
+    return FastJSONResponse(
         status_code=500,
         content={
+            "success": False,
             "error": "Internal server error",
             "message": str(exc),
             "type": type(exc).__name__
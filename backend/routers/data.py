@@ -2,14 +2,12 @@
 Data API endpoints for raw data access
 """
 
-from fastapi import APIRouter, HTTPException, Query
-from pydantic import BaseModel
-from typing import Dict, Any, Optional
-import sys
-import os
-
-# Add parent directory to path for imports
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from fastapi import APIRouter, HTTPException, Query, Request
+from typing import Dict, Any, List, Optional
+from typing_extensions import TypedDict
+from collections import Counter
+import asyncio
+import pandas as pd
 
 from data_loader_api import (
     load_validator_data,
@@ -26,383 +24,303 @@ from data_loader_api import (
     get_cache_info
 )
 from analysis import calculate_attestation_performance
+from utils import FastJSONResponse, data_endpoint
+
+router = APIRouter(default_response_class=FastJSONResponse)
+
+# [validator data object, ENS sources breakdown] from the last /ens-sources call
+_ens_sources_cache = []
 
-router = APIRouter()
+# period -> (validator performance data object, aggregated response data)
+_period_performance_cache = {}
 
-class DataResponse(BaseModel):
-    """Base response model for data endpoints"""
-    data: Optional[Dict[str, Any]] = None
-    source_file: Optional[str] = None
+class DataResponse(TypedDict):
+    """Response shape for data endpoints (documentation only; payloads are not re-validated)"""
+    data: Optional[Dict[str, Any]]
+    source_file: Optional[str]
     success: bool
     message: str
 
-class CacheInfoResponse(BaseModel):
-    """Cache information response model"""
-    cached_items: list
+class CacheInfoResponse(TypedDict):
+    """Cache information response shape"""
+    cached_items: List[str]
     cache_timestamps: Dict[str, float]
     cache_size: int
 
-@router.get("/validator-data", response_model=DataResponse)
-async def get_validator_data():
+# OpenAPI documentation for routes that emit these shapes without a response_model round-trip
+DATA_RESPONSES = {200: {"model": DataResponse}}
+CACHE_INFO_RESPONSES = {200: {"model": CacheInfoResponse}}
+
+@router.get("/validator-data", responses=DATA_RESPONSES)
+@data_endpoint("Validator data loaded successfully", "Validator data not found", cache_bytes=True)
+async def get_validator_data(request: Request):
     """Get main validator data"""
-    try:
-        data, source_file = load_validator_data()
-        if data is None:
-            raise HTTPException(status_code=404, detail="Validator data not found")
-        
-        return DataResponse(
-            data=data,
-            source_file=source_file,
-            success=True,
-            message="Validator data loaded successfully"
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to load validator data: {str(e)}")
+    return load_validator_data()
 
-@router.get("/proposals", response_model=DataResponse)
-async def get_proposals_data():
+@router.get("/proposals", responses=DATA_RESPONSES)
+@data_endpoint("Proposals data loaded successfully", "Proposals data not found", cache_bytes=True)
+async def get_proposals_data(request: Request):
     """Get proposals data"""
-    try:
-        data, source_file = load_proposals_data()
-        if data is None:
-            raise HTTPException(status_code=404, detail="Proposals data not found")
-        
-        return DataResponse(
-            data=data,
-            source_file=source_file,
-            success=True,
-            message="Proposals data loaded successfully"
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to load proposals data: {str(e)}")
+    return load_proposals_data()
 
-@router.get("/missed-proposals", response_model=DataResponse)
-async def get_missed_proposals_data():
+@router.get("/missed-proposals", responses=DATA_RESPONSES)
+@data_endpoint("Missed proposals data loaded successfully", "Missed proposals data not found", cache_bytes=True)
+async def get_missed_proposals_data(request: Request):
     """Get missed proposals data"""
-    try:
-        data, source_file = load_missed_proposals_data()
-        if data is None:
-            raise HTTPException(status_code=404, detail="Missed proposals data not found")
-        
-        return DataResponse(
-            data=data,
-            source_file=source_file,
-            success=True,
-            message="Missed proposals data loaded successfully"
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to load missed proposals data: {str(e)}")
+    return load_missed_proposals_data()
 
-@router.get("/mev-analysis", response_model=DataResponse)
-async def get_mev_analysis_data():
+@router.get("/mev-analysis", responses=DATA_RESPONSES)
+@data_endpoint("MEV analysis data loaded successfully", "MEV analysis data not found", cache_bytes=True)
+async def get_mev_analysis_data(request: Request):
     """Get MEV analysis data"""
-    try:
-        data, source_file = load_mev_analysis_data()
-        if data is None:
-            raise HTTPException(status_code=404, detail="MEV analysis data not found")
-        
-        return DataResponse(
-            data=data,
-            source_file=source_file,
-            success=True,
-            message="MEV analysis data loaded successfully"
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to load MEV analysis data: {str(e)}")
+    return load_mev_analysis_data()
 
-@router.get("/sync-committee", response_model=DataResponse)
-async def get_sync_committee_data():
+@router.get("/sync-committee", responses=DATA_RESPONSES)
+@data_endpoint("Sync committee data loaded successfully", "Sync committee data not found", cache_bytes=True)
+async def get_sync_committee_data(request: Request):
     """Get sync committee data"""
-    try:
-        data, source_file = load_sync_committee_data()
-        if data is None:
-            raise HTTPException(status_code=404, detail="Sync committee data not found")
-        
-        return DataResponse(
-            data=data,
-            source_file=source_file,
-            success=True,
-            message="Sync committee data loaded successfully"
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to load sync committee data: {str(e)}")
+    return load_sync_committee_data()
 
-@router.get("/exit-data", response_model=DataResponse)
-async def get_exit_data():
+@router.get("/exit-data", responses=DATA_RESPONSES)
+@data_endpoint("Exit data loaded successfully", "Exit data not found", cache_bytes=True)
+async def get_exit_data(request: Request):
     """Get exit data"""
-    try:
-        data, source_file = load_exit_data()
-        if data is None:
-            raise HTTPException(status_code=404, detail="Exit data not found")
-        
-        return DataResponse(
-            data=data,
-            source_file=source_file,
-            success=True,
-            message="Exit data loaded successfully"
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to load exit data: {str(e)}")
+    return load_exit_data()
 
-@router.get("/validator-performance", response_model=DataResponse)
+def _aggregate_period_performance(data: Dict[str, Any], period: str, performance_field: str) -> Dict[str, Any]:
+    """Aggregate validator performance for one period into per-operator totals"""
+    # Collect (operator, performance, validator index) for validators reporting this period
+    rows = []
+    for validator_info in data["validators"].values():
+        performance_metrics = validator_info.get("performance_metrics", {})
+        if performance_field in performance_metrics:
+            rows.append((
+                validator_info.get("operator", "Unknown"),
+                performance_metrics[performance_field],
+                validator_info.get("validator_index")
+            ))
+    
+    # Aggregate per operator in pandas, keeping operators in first-seen order. dropna=False
+    # keeps validators whose operator is null; pandas labels that group NaN, so it is mapped
+    # back to the None key these validators have always been listed under
+    df = pd.DataFrame(rows, columns=["operator", "performance", "validator_index"])
+    totals = df.groupby("operator", sort=False, dropna=False)["performance"].agg(["sum", "count", "mean"])
+    
+    operators_performance = {
+        (None if pd.isna(operator) else operator): {
+            "validators": [],
+            "total_performance": float(total),
+            "count": int(count),
+            "average_performance": float(mean) if count > 0 else 0
+        }
+        for operator, total, count, mean in zip(totals.index, totals["sum"], totals["count"], totals["mean"])
+    }
+    for operator, performance, validator_index in rows:
+        operators_performance[operator]["validators"].append({
+            "validator_index": validator_index,
+            "performance": performance
+        })
+    
+    # Create filtered response with operators performance
+    filtered_data = {
+        "last_updated": data.get("last_updated"),
+        "total_validators": data.get("total_validators"),
+        "period": period,
+        "performance_field": performance_field,
+        "operators_performance": operators_performance,
+        "operator_count": len(operators_performance)
+    }
+    
+    return filtered_data
+
+@router.get("/validator-performance", responses=DATA_RESPONSES)
+@data_endpoint(
+    lambda period, **_: f"Validator performance data{f' ({period})' if period else ''} loaded successfully",
+    "Validator performance data not found",
+    cache_bytes=True
+)
 async def get_validator_performance_data(
+    request: Request,
     period: Optional[str] = Query(None, description="Performance period: '1d', '7d', '31d'")
 ):
     """Get validator performance data, optionally filtered by performance period"""
-    try:
-        data, source_file = load_validator_performance_data()
-        if data is None:
-            raise HTTPException(status_code=404, detail="Validator performance data not found")
+    data, source_file = load_validator_performance_data()
+    
+    # If period is specified, filter the performance data
+    if data is not None and period and "validators" in data:
+        # Map period parameter to performance field names
+        period_field_map = {
+            "1d": "performance_1d", 
+            "7d": "performance_7d",
+            "31d": "performance_31d"
+        }
+        
+        if period not in period_field_map:
+            raise HTTPException(status_code=400, detail=f"Invalid period '{period}'. Valid periods are: 1d, 7d, 31d")
         
-        # If period is specified, filter the performance data
-        if period and "validators" in data:
-            # Map period parameter to performance field names
-            period_field_map = {
-                "1d": "performance_1d", 
-                "7d": "performance_7d",
-                "31d": "performance_31d"
-            }
-            
-            if period in period_field_map:
-                performance_field = period_field_map[period]
-                
-                # Create a simplified structure focused on the specific period
-                operators_performance = {}
-                
-                for validator_id, validator_info in data["validators"].items():
-                    operator = validator_info.get("operator", "Unknown")
-                    performance_metrics = validator_info.get("performance_metrics", {})
-                    
-                    if performance_field in performance_metrics:
-                        performance_value = performance_metrics[performance_field]
-                        
-                        if operator not in operators_performance:
-                            operators_performance[operator] = {
-                                "validators": [],
-                                "total_performance": 0,
-                                "count": 0
-                            }
-                        
-                        operators_performance[operator]["validators"].append({
-                            "validator_index": validator_info.get("validator_index"),
-                            "performance": performance_value
-                        })
-                        operators_performance[operator]["total_performance"] += performance_value
-                        operators_performance[operator]["count"] += 1
-                
-                # Calculate average performance per operator
-                for operator, data_info in operators_performance.items():
-                    if data_info["count"] > 0:
-                        data_info["average_performance"] = data_info["total_performance"] / data_info["count"]
-                    else:
-                        data_info["average_performance"] = 0
-                
-                # Create filtered response with operators performance
-                filtered_data = {
-                    "last_updated": data.get("last_updated"),
-                    "total_validators": data.get("total_validators"),
-                    "period": period,
-                    "performance_field": performance_field,
-                    "operators_performance": operators_performance,
-                    "operator_count": len(operators_performance)
-                }
-                
-                return DataResponse(
-                    data=filtered_data,
-                    source_file=source_file,
-                    success=True,
-                    message=f"Validator performance data ({period}) loaded successfully"
-                )
-            else:
-                raise HTTPException(status_code=400, detail=f"Invalid period '{period}'. Valid periods are: 1d, 7d, 31d")
+        performance_field = period_field_map[period]
         
-        return DataResponse(
-            data=data,
-            source_file=source_file,
-            success=True,
-            message="Validator performance data loaded successfully"
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to load validator performance data: {str(e)}")
+        # The aggregation only depends on the loaded file, so reuse it until the loader returns new data
+        cached = _period_performance_cache.get(period)
+        if not cached or cached[0] is not data:
+            cached = (data, _aggregate_period_performance(data, period, performance_field))
+            _period_performance_cache[period] = cached
+        
+        return cached[1], source_file
+    
+    return data, source_file
 
-@router.get("/ens-names", response_model=DataResponse)
-async def get_ens_names():
+@router.get("/ens-names", responses=DATA_RESPONSES)
+@data_endpoint("ENS names data loaded successfully", "ENS names data not found", cache_bytes=True)
+async def get_ens_names(request: Request):
     """Get ENS names data"""
-    try:
-        data, source_file = load_ens_names()
-        if data is None:
-            raise HTTPException(status_code=404, detail="ENS names data not found")
-        
-        return DataResponse(
-            data=data,
-            source_file=source_file,
-            success=True,
-            message="ENS names data loaded successfully"
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to load ENS names data: {str(e)}")
+    return load_ens_names()
 
-@router.get("/vault-events", response_model=DataResponse)
-async def get_vault_events():
+@router.get("/vault-events", responses=DATA_RESPONSES)
+@data_endpoint("Vault events data loaded successfully", "Vault events data not found", cache_bytes=True)
+async def get_vault_events(request: Request):
     """Get vault events data"""
-    try:
-        data, source_file = load_vault_events_data()
-        if data is None:
-            raise HTTPException(status_code=404, detail="Vault events data not found")
-        
-        return DataResponse(
-            data=data,
-            source_file=source_file,
-            success=True,
-            message="Vault events data loaded successfully"
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to load vault events data: {str(e)}")
+    return load_vault_events_data()
 
 @router.get("/logo")
 async def get_logo(dark_mode: bool = False):
     """Get logo as base64 string"""
-    try:
-        logo_b64 = get_logo_base64(dark_mode)
-        if logo_b64 is None:
-            raise HTTPException(status_code=404, detail="Logo not found")
-        
-        return {
-            "logo": logo_b64,
-            "dark_mode": dark_mode,
-            "format": "png",
-            "encoding": "base64"
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to load logo: {str(e)}")
+    logo_b64 = get_logo_base64(dark_mode)
+    if logo_b64 is None:
+        raise HTTPException(status_code=404, detail="Logo not found")
+    
+    return {
+        "logo": logo_b64,
+        "dark_mode": dark_mode,
+        "format": "png",
+        "encoding": "base64"
+    }
 
 @router.post("/clear-cache")
 async def clear_data_cache():
     """Clear all cached data"""
-    try:
-        clear_cache()
-        return {"message": "Cache cleared successfully", "success": True}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to clear cache: {str(e)}")
+    clear_cache()
+    
+    from .enhanced_analytics import enhanced_analytics_service
+    enhanced_analytics_service.clear_cache()
+    return {"message": "Cache cleared successfully", "success": True}
 
-@router.get("/cache-info", response_model=CacheInfoResponse)
+@router.get("/cache-info", responses=CACHE_INFO_RESPONSES)
 async def get_cache_information():
     """Get cache information"""
-    try:
-        cache_info = get_cache_info()
-        return CacheInfoResponse(**cache_info)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get cache info: {str(e)}")
+    cache_info: CacheInfoResponse = get_cache_info()
+    return FastJSONResponse(cache_info)
 
-@router.get("/ens-sources", response_model=DataResponse)
+@router.get("/ens-sources", responses=DATA_RESPONSES)
+@data_endpoint("ENS sources breakdown loaded successfully", "Validator data not found")
 async def get_ens_sources():
     """Get ENS sources breakdown (on-chain vs manual)"""
-    try:
-        data, source_file = load_validator_data()
-        if data is None:
-            raise HTTPException(status_code=404, detail="Validator data not found")
-        
-        # Extract ENS sources data
-        ens_sources = data.get("ens_sources", {})
-        
-        # Count on-chain vs manual
-        on_chain_count = sum(1 for source in ens_sources.values() if source == "on-chain")
-        manual_count = sum(1 for source in ens_sources.values() if source == "manual")
-        total_count = len(ens_sources)
-        
-        # Calculate percentages
-        on_chain_percentage = (on_chain_count / total_count * 100) if total_count > 0 else 0
-        manual_percentage = (manual_count / total_count * 100) if total_count > 0 else 0
-        
-        response_data = {
-            "total_ens_names": total_count,
-            "on_chain_count": on_chain_count,
-            "manual_count": manual_count,
-            "on_chain_percentage": on_chain_percentage,
-            "manual_percentage": manual_percentage,
-            "breakdown": {
-                "on_chain": on_chain_count,
-                "manual": manual_count
-            },
-            "raw_sources": ens_sources
-        }
-        
-        return DataResponse(
-            data=response_data,
-            source_file=source_file,
-            success=True,
-            message="ENS sources breakdown loaded successfully"
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to load ENS sources: {str(e)}")
+    data, source_file = load_validator_data()
+    if data is None:
+        return None, source_file
+    
+    # Reuse the breakdown while the validator data is unchanged
+    if _ens_sources_cache and _ens_sources_cache[0] is data:
+        return _ens_sources_cache[1], source_file
+    
+    # Extract ENS sources data
+    ens_sources = data.get("ens_sources", {})
+    
+    # Count on-chain vs manual in a single pass
+    source_counts = Counter(ens_sources.values())
+    on_chain_count = source_counts.get("on-chain", 0)
+    manual_count = source_counts.get("manual", 0)
+    total_count = len(ens_sources)
+    
+    # Calculate percentages
+    on_chain_percentage = (on_chain_count / total_count * 100) if total_count > 0 else 0
+    manual_percentage = (manual_count / total_count * 100) if total_count > 0 else 0
+    
+    response_data = {
+        "total_ens_names": total_count,
+        "on_chain_count": on_chain_count,
+        "manual_count": manual_count,
+        "on_chain_percentage": on_chain_percentage,
+        "manual_percentage": manual_percentage,
+        "breakdown": {
+            "on_chain": on_chain_count,
+            "manual": manual_count
+        },
+        "raw_sources": ens_sources
+    }
+    _ens_sources_cache[:] = [data, response_data]
+
+    return response_data, source_file
 
-@router.get("/relative-performance", response_model=DataResponse)
+@router.get("/relative-performance", responses=DATA_RESPONSES)
+@data_endpoint(
+    "Relative performance data ({period}) calculated successfully",
+    "Relative performance data not found"
+)
 async def get_relative_performance(
     period: str = Query(..., description="Performance period: '7d' or '31d'")
 ):
     """Get relative performance data for attestation-only analysis"""
-    try:
-        # Validate period parameter
-        if period not in ['7d', '31d']:
-            raise HTTPException(status_code=400, detail="Period must be '7d' or '31d'")
-        
-        # Convert period to days
-        days = 7 if period == '7d' else 31
-        
-        # Load required data
-        validator_performance_data, perf_source = load_validator_performance_data()
-        if not validator_performance_data:
-            raise HTTPException(status_code=404, detail="Validator performance data not found")
-        
-        proposals_data, proposals_source = load_proposals_data()
-        if not proposals_data:
-            raise HTTPException(status_code=404, detail="Proposals data not found")
-        
-        sync_committee_data, sync_source = load_sync_committee_data()
-        if not sync_committee_data:
-            raise HTTPException(status_code=404, detail="Sync committee data not found")
-        
-        validator_data, validator_source = load_validator_data()
-        if not validator_data:
-            raise HTTPException(status_code=404, detail="Validator data not found")
-        
-        exit_data, exit_source = load_exit_data()
-        if not exit_data:
-            raise HTTPException(status_code=404, detail="Exit data not found")
-        
-        # Calculate attestation performance
-        performance_results = calculate_attestation_performance(
-            validator_performance_data,
-            proposals_data,
-            sync_committee_data,
-            validator_data,
-            exit_data,
-            days
-        )
-        
-        # Create response data
-        response_data = {
-            "period": period,
-            "days": days,
-            "lookback_days": 10 if days == 7 else 34,
-            "activity_days": 7 if days == 7 else 32,
-            "total_operators": len(performance_results),
-            "operators": performance_results,
-            "metadata": {
-                "description": f"Attestation-only performance analysis for {period} period",
-                "exclusion_criteria": "Validators with proposals or sync committee duties in lookback window are excluded",
-                "activity_requirement": f"Validators must be active for {7 if days == 7 else 31}+ days"
-            }
+    # Validate period parameter
+    if period not in ['7d', '31d']:
+        raise HTTPException(status_code=400, detail="Period must be '7d' or '31d'")
+    
+    # Convert period to days
+    days = 7 if period == '7d' else 31
+    
+    # Load required data concurrently so cold loads overlap and the event loop stays free
+    (
+        (validator_performance_data, perf_source),
+        (proposals_data, proposals_source),
+        (sync_committee_data, sync_source),
+        (validator_data, validator_source),
+        (exit_data, exit_source)
+    ) = await asyncio.gather(
+        asyncio.to_thread(load_validator_performance_data),
+        asyncio.to_thread(load_proposals_data),
+        asyncio.to_thread(load_sync_committee_data),
+        asyncio.to_thread(load_validator_data),
+        asyncio.to_thread(load_exit_data)
+    )
+    
+    if not validator_performance_data:
+        raise HTTPException(status_code=404, detail="Validator performance data not found")
+    
+    if not proposals_data:
+        raise HTTPException(status_code=404, detail="Proposals data not found")
+    
+    if not sync_committee_data:
+        raise HTTPException(status_code=404, detail="Sync committee data not found")
+    
+    if not validator_data:
+        raise HTTPException(status_code=404, detail="Validator data not found")
+    
+    if not exit_data:
+        raise HTTPException(status_code=404, detail="Exit data not found")
+    
+    # Calculate attestation performance
+    performance_results = calculate_attestation_performance(
+        validator_performance_data,
+        proposals_data,
+        sync_committee_data,
+        validator_data,
+        exit_data,
+        days
+    )
+    
+    # Create response data
+    response_data = {
+        "period": period,
+        "days": days,
+        "lookback_days": 10 if days == 7 else 34,
+        "activity_days": 7 if days == 7 else 32,
+        "total_operators": len(performance_results),
+        "operators": performance_results,
+        "metadata": {
+            "description": f"Attestation-only performance analysis for {period} period",
+            "exclusion_criteria": "Validators with proposals or sync committee duties in lookback window are excluded",
+            "activity_requirement": f"Validators must be active for {7 if days == 7 else 31}+ days"
         }
-        
-        return DataResponse(
-            data=response_data,
-            source_file=f"Combined: {perf_source}, {proposals_source}, {sync_source}, {validator_source}, {exit_source}",
-            success=True,
-            message=f"Relative performance data ({period}) calculated successfully"
-        )
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to calculate relative performance: {str(e)}")
\ No newline at end of file
+    }
+    
+    return response_data, f"Combined: {perf_source}, {proposals_source}, {sync_source}, {validator_source}, {exit_source}"
@@ -4,15 +4,34 @@ Enhanced Analytics API endpoints
 Serves MEV, sync committee, and proposal data for individual operators
 """
 from fastapi import APIRouter, HTTPException, Query
-from typing import List, Dict, Any, Optional
-import json
+from typing import List, Dict, Any, Optional, Tuple
 import os
+import asyncio
+import heapq
 import logging
+import threading
+from collections import Counter
+from operator import itemgetter
 from datetime import datetime, timedelta
 
+from data_loader_api import read_json_file
+from utils import FastJSONResponse
+
 logger = logging.getLogger(__name__)
 
-router = APIRouter()
+router = APIRouter(default_response_class=FastJSONResponse)
+
+# Proposal summary fields reported by MEV analytics, with defaults for operators missing from proposals.json
+DEFAULT_PROPOSAL_VIEW = {
+    "proposal_count": 0,
+    "total_value_eth": 0,
+    "average_value_eth": 0,
+    "consensus_rewards_eth": 0,
+    "execution_rewards_eth": 0,
+    "mev_rewards_eth": 0,
+    "mev_blocks_count": 0,
+    "mev_blocks_percentage": 0
+}
 
 class EnhancedAnalyticsService:
     """Service to load and serve enhanced analytics data"""
@@ -40,72 +59,146 @@ class EnhancedAnalyticsService:
                 "missed_proposals_cache.json"
             ]
         }
+        # data_type -> ((path, mtime_ns, size, generation), parsed data)
         self._cache = {}
-        self._last_loaded = {}
+        self._locks = {data_type: threading.Lock() for data_type in self.data_paths}
+        self._generation = 0
+        self._resolved_paths = {}
+        # (data_type, index name) -> (source data object, derived index)
+        self._indexes = {}
     
     def _find_data_file(self, data_type: str) -> Optional[str]:
-        """Find the data file in possible locations"""
+        """Find the data file in possible locations, remembering the first match"""
+        data_path = self._resolved_paths.get(data_type)
+        if data_path:
+            return data_path
+        
         for path in self.data_paths.get(data_type, []):
             if os.path.exists(path):
+                self._resolved_paths[data_type] = path
                 return path
         return None
     
+    def _stat_data_file(self, data_type: str) -> Optional[Tuple[str, os.stat_result]]:
+        """Stat the resolved data file, searching again if it has disappeared"""
+        for _ in range(2):
+            data_path = self._find_data_file(data_type)
+            if not data_path:
+                return None
+            try:
+                return data_path, os.stat(data_path)
+            except FileNotFoundError:
+                self._resolved_paths.pop(data_type, None)
+        return None
+    
     def _load_data(self, data_type: str, force_reload: bool = False) -> Dict:
-        """Load data with automatic refresh"""
-        data_path = self._find_data_file(data_type)
-        if not data_path:
-            logger.warning(f"{data_type} data file not found")
-            return {}
+        """Load data, re-parsing only when the file's mtime or size changes"""
+        if force_reload:
+            self.clear_cache()
         
         try:
-            file_mtime = os.path.getmtime(data_path)
-            if not force_reload and data_type in self._cache and data_type in self._last_loaded and file_mtime <= self._last_loaded[data_type]:
-                return self._cache[data_type]
+            resolved = self._stat_data_file(data_type)
+            if not resolved:
+                logger.warning(f"{data_type} data file not found")
+                return {}
+            
+            data_path, stat = resolved
+            cache_key = (data_path, stat.st_mtime_ns, stat.st_size, self._generation)
+            cached = self._cache.get(data_type)
+            if cached and cached[0] == cache_key:
+                return cached[1]
             
-            with open(data_path, 'r') as f:
-                self._cache[data_type] = json.load(f)
-                self._last_loaded[data_type] = file_mtime
+            # Only one caller parses a given file; others wait and reuse its result
+            with self._locks[data_type]:
+                cached = self._cache.get(data_type)
+                if cached and cached[0] == cache_key:
+                    return cached[1]
+                
+                data = read_json_file(data_path)
+                self._cache[data_type] = (cache_key, data)
                 logger.debug(f"Loaded {data_type} data from {data_path}")
-                return self._cache[data_type]
+                return data
                 
         except Exception as e:
             logger.error(f"Failed to load {data_type} data: {e}")
             return {}
     
+    def clear_cache(self):
+        """Invalidate all cached files so the next request re-parses them"""
+        self._generation += 1
+        self._cache.clear()
+        self._indexes.clear()
+        self._resolved_paths.clear()
+    
+    def _get_index(self, data_type: str, name: str, build, data: Optional[Dict] = None) -> Any:
+        """Get a derived index of a data file, rebuilt only when the loaded data changes"""
+        if data is None:
+            data = self._load_data(data_type)
+        cached = self._indexes.get((data_type, name))
+        if cached and cached[0] is data:
+            return cached[1]
+        
+        index = build(data)
+        self._indexes[(data_type, name)] = (data, index)
+        return index
+    
+    def _load_bundle(self, *data_types: str) -> Dict[str, Dict]:
+        """Load several data files once so per-operator helpers can share them"""
+        return {data_type: self._load_data(data_type) for data_type in data_types}
+    
+    def get_operator_bundle(self, operator: str) -> Dict[str, Dict[str, Any]]:
+        """Get MEV and sync committee analytics for an operator from a single load of each file"""
+        bundle = self._load_bundle("proposals", "mev_analysis", "missed_proposals", "sync_committee")
+        return {
+            "mev_analytics": self._mev_from(bundle, operator),
+            "sync_committee": self._sync_from(bundle, operator)
+        }
+    
     def get_operator_mev_analytics(self, operator: str) -> Dict[str, Any]:
         """Get MEV analytics for a specific operator"""
-        proposals_data = self._load_data("proposals")
-        mev_data = self._load_data("mev_analysis")
-        
-        operator_summary = proposals_data.get("operator_summary", {}).get(operator, {})
-        
-        # Get MEV relay coverage for this operator's validators
-        mev_coverage = 0
-        relay_details = {}
-        
-        if mev_data and "operator_analysis" in mev_data:
-            operator_mev = mev_data.get("operator_analysis", {}).get(operator, {})
-            mev_coverage = operator_mev.get("mev_coverage_percent", 0)
-            relay_details = operator_mev.get("relay_registrations", {})
+        return self._mev_from(self._load_bundle("proposals", "mev_analysis", "missed_proposals"), operator)
+    
+    def get_operator_sync_committee_analytics(self, operator: str) -> Dict[str, Any]:
+        """Get sync committee analytics for a specific operator"""
+        return self._sync_from(self._load_bundle("sync_committee"), operator)
+    
+    def _mev_from(self, bundle: Dict[str, Dict], operator: str) -> Dict[str, Any]:
+        """Build MEV analytics for an operator from loaded proposals, MEV and missed proposals data"""
+        proposal_views = self._get_index(
+            "proposals", "mev_view_by_operator", self._build_proposal_views, data=bundle["proposals"]
+        )
+        coverage_views = self._get_index(
+            "mev_analysis", "coverage_by_operator", self._build_coverage_views, data=bundle["mev_analysis"]
+        )
         
+        coverage = coverage_views.get(operator)
         return {
             "operator": operator,
-            "proposal_count": operator_summary.get("proposal_count", 0),
-            "total_value_eth": operator_summary.get("total_value_eth", 0),
-            "average_value_eth": operator_summary.get("average_value_eth", 0),
-            "consensus_rewards_eth": operator_summary.get("consensus_rewards_eth", 0),
-            "execution_rewards_eth": operator_summary.get("execution_rewards_eth", 0),
-            "mev_rewards_eth": operator_summary.get("mev_rewards_eth", 0),
-            "mev_blocks_count": operator_summary.get("mev_blocks_count", 0),
-            "mev_blocks_percentage": operator_summary.get("mev_blocks_percentage", 0),
-            "mev_coverage_percentage": mev_coverage,
-            "relay_registrations": relay_details,
-            "proposal_success_rate": self._calculate_proposal_success_rate(operator)
+            **proposal_views.get(operator, DEFAULT_PROPOSAL_VIEW),
+            "mev_coverage_percentage": coverage[0] if coverage else 0,
+            "relay_registrations": coverage[1] if coverage else {},
+            "proposal_success_rate": self._success_rate_from(bundle, operator)
         }
     
-    def get_operator_sync_committee_analytics(self, operator: str) -> Dict[str, Any]:
-        """Get sync committee analytics for a specific operator"""
-        sync_data = self._load_data("sync_committee")
+    @staticmethod
+    def _build_proposal_views(proposals_data: Dict) -> Dict[str, Dict[str, Any]]:
+        """Pre-fill each operator's proposal summary fields with their defaults"""
+        return {
+            operator: {field: summary.get(field, default) for field, default in DEFAULT_PROPOSAL_VIEW.items()}
+            for operator, summary in proposals_data.get("operator_summary", {}).items()
+        }
+    
+    @staticmethod
+    def _build_coverage_views(mev_data: Dict) -> Dict[str, Tuple[Any, Dict]]:
+        """Map each operator to its MEV relay coverage and relay registrations"""
+        return {
+            operator: (operator_mev.get("mev_coverage_percent", 0), operator_mev.get("relay_registrations", {}))
+            for operator, operator_mev in mev_data.get("operator_analysis", {}).items()
+        }
+    
+    def _sync_from(self, bundle: Dict[str, Dict], operator: str) -> Dict[str, Any]:
+        """Build sync committee analytics for an operator from loaded sync committee data"""
+        sync_data = bundle["sync_committee"]
         
         if not sync_data:
             return {
@@ -129,19 +222,21 @@ class EnhancedAnalyticsService:
             "recent_periods": self._get_recent_sync_periods(operator, sync_data)
         }
     
-    def _calculate_proposal_success_rate(self, operator: str) -> float:
-        """Calculate proposal success rate by checking missed proposals"""
-        missed_data = self._load_data("missed_proposals")
-        proposals_data = self._load_data("proposals")
+    def _success_rate_from(self, bundle: Dict[str, Dict], operator: str) -> float:
+        """Calculate proposal success rate from loaded proposals and missed proposals data"""
+        missed_data = bundle["missed_proposals"]
+        proposals_data = bundle["proposals"]
         
         if not missed_data or not proposals_data:
             return 100.0
         
         total_proposals = proposals_data.get("operator_summary", {}).get(operator, {}).get("proposal_count", 0)
-        missed_proposals = len([
-            p for p in missed_data.get("missed_proposals", [])
-            if p.get("operator") == operator
-        ])
+        missed_by_operator = self._get_index(
+            "missed_proposals", "missed_by_operator",
+            lambda data: Counter(p.get("operator") for p in data.get("missed_proposals", [])),
+            data=missed_data
+        )
+        missed_proposals = missed_by_operator.get(operator, 0)
         
         if total_proposals + missed_proposals == 0:
             return 100.0
@@ -150,20 +245,33 @@ class EnhancedAnalyticsService:
     
     def _get_recent_sync_periods(self, operator: str, sync_data: Dict) -> List[Dict]:
         """Get recent sync committee periods for an operator"""
-        detailed_stats = sync_data.get("detailed_stats", [])
-        operator_periods = []
+        recent_periods = self._get_index(
+            "sync_committee", "recent_periods_by_operator", self._build_recent_sync_periods, data=sync_data
+        )
+        return recent_periods.get(operator, [])
+    
+    @staticmethod
+    def _build_recent_sync_periods(sync_data: Dict) -> Dict[str, List[Dict]]:
+        """Group sync committee periods by operator, keeping each operator's last 5 periods"""
+        operator_periods = {}
         
-        for validator_data in detailed_stats:
-            if validator_data.get("operator") == operator:
-                operator_periods.append({
+        # Cast each period once while grouping so the top-5 selection compares plain ints
+        for validator_data in sync_data.get("detailed_stats", []):
+            operator_periods.setdefault(validator_data.get("operator"), []).append((
+                int(validator_data.get("period")),
+                {
                     "period": validator_data.get("period"),
                     "participation_rate": validator_data.get("participation_rate", 0),
                     "successful": validator_data.get("successful_attestations", 0),
                     "missed": validator_data.get("missed_attestations", 0)
-                })
+                }
+            ))
         
-        # Return last 5 periods
-        return sorted(operator_periods, key=lambda x: int(x["period"]), reverse=True)[:5]
+        # Return last 5 periods (nlargest keeps the same order as a stable descending sort)
+        return {
+            operator: [period for _, period in heapq.nlargest(5, periods, key=itemgetter(0))]
+            for operator, periods in operator_periods.items()
+        }
 
 # Global service instance
 enhanced_analytics_service = EnhancedAnalyticsService()
@@ -205,12 +313,16 @@ async def get_operator_comprehensive_analytics(
 ) -> Dict[str, Any]:
     """Get comprehensive enhanced analytics for a specific operator"""
     try:
-        mev_data = enhanced_analytics_service.get_operator_mev_analytics(operator)
-        sync_data = enhanced_analytics_service.get_operator_sync_committee_analytics(operator)
-        
         # Import and get daily performance data
         from .operator_performance import operator_performance_service
-        performance_data = operator_performance_service.get_operator_performance(operator, days)
+        
+        # Enhanced sources load as one bundle alongside the daily performance cache
+        enhanced_data, performance_data = await asyncio.gather(
+            asyncio.to_thread(enhanced_analytics_service.get_operator_bundle, operator),
+            asyncio.to_thread(operator_performance_service.get_operator_performance, operator, days)
+        )
+        mev_data = enhanced_data["mev_analytics"]
+        sync_data = enhanced_data["sync_committee"]
         
         return {
             "success": True,
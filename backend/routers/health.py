@@ -5,16 +5,149 @@ Health check endpoints for monitoring API status
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 import psutil
+import asyncio
+import logging
 import os
-import sys
+import time
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
 
-# Add parent directory to path for imports
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from data_loader_api import clear_cache
+from .enhanced_analytics import enhanced_analytics_service
+from .nodeset import clear_cache as clear_nodeset_cache
+from utils import FastJSONResponse
 
-router = APIRouter()
+logger = logging.getLogger(__name__)
+
+router = APIRouter(default_response_class=FastJSONResponse)
+
+# Directories searched for data files, in order
+DATA_FILE_LOCATIONS = ("./", "./json_data/", "./data/", "../", "../json_data/")
+
+# Data files reported by the health endpoints, in response order
+DATA_FILES = (
+    "nodeset_validator_tracker_cache.json",
+    "validator_performance_cache.json",
+    "proposals.json",
+    "sync_committee_participation.json",
+    "mev_analysis_results.json",
+    "missed_proposals_cache.json",
+    "dashboard_exit_data.json",
+    "manual_ens_names.json"
+)
+_WANTED = frozenset(DATA_FILES)
+
+# (monotonic scan time, filename -> exists); data file layout rarely changes between deployments
+_FILE_CACHE: Dict[str, Tuple[float, Dict[str, bool]]] = {}
+_TTL = 10.0
+
+def data_file_status() -> Dict[str, bool]:
+    """Check which data files exist in any known location, scanning each directory once per _TTL seconds"""
+    now = time.monotonic()
+    cached = _FILE_CACHE.get("status")
+    if cached and now - cached[0] < _TTL:
+        return dict(cached[1])
+    
+    found = set()
+    for location in DATA_FILE_LOCATIONS:
+        try:
+            with os.scandir(location) as entries:
+                # DirEntry.is_file() uses the readdir file type, avoiding a stat per entry
+                found.update(entry.name for entry in entries if entry.name in _WANTED and entry.is_file())
+        except OSError:
+            continue
+    
+    status = {filename: filename in found for filename in DATA_FILES}
+    _FILE_CACHE["status"] = (now, status)
+    return dict(status)
+
+# Process memory is read from /proc on Linux; psutil is the fallback elsewhere (e.g. macOS dev)
+_PID = os.getpid()
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+_MEM_TTL = 2.0
+# (monotonic read time, memory usage dict)
+_mem_cache: Tuple[float, Dict[str, Any]] = (0.0, {})
+
+def _read_proc_memory() -> Dict[str, Any]:
+    """Read system and process memory from /proc/meminfo and /proc/self/statm"""
+    meminfo = {}
+    with open("/proc/meminfo") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            if key in ("MemTotal", "MemAvailable"):
+                meminfo[key] = int(value.split()[0]) * 1024
+                if len(meminfo) == 2:
+                    break
+    with open("/proc/self/statm") as f:
+        rss = int(f.read().split()[1]) * _PAGE_SIZE
+    
+    total = meminfo["MemTotal"]
+    available = meminfo["MemAvailable"]
+    return {
+        "total_mb": round(total / (1024**2), 2),
+        "available_mb": round(available / (1024**2), 2),
+        "percent": round((total - available) / total * 100, 1),
+        "process_mb": round(rss / (1024**2), 2)
+    }
+
+def _read_psutil_memory() -> Dict[str, Any]:
+    """Read system and process memory through psutil"""
+    memory = psutil.virtual_memory()
+    process = psutil.Process(_PID)
+    return {
+        "total_mb": round(memory.total / (1024**2), 2),
+        "available_mb": round(memory.available / (1024**2), 2),
+        "percent": memory.percent,
+        "process_mb": round(process.memory_info().rss / (1024**2), 2)
+    }
+
+def get_memory_usage() -> Dict[str, Any]:
+    """Memory usage for the health report, cached for _MEM_TTL seconds"""
+    global _mem_cache
+    now = time.monotonic()
+    if now - _mem_cache[0] < _MEM_TTL:
+        return _mem_cache[1]
+    
+    try:
+        usage = _read_proc_memory()
+    except (OSError, KeyError, ValueError, IndexError):
+        usage = _read_psutil_memory()
+    
+    _mem_cache = (now, usage)
+    return usage
+
+# Set by POST /clear-cache or SIGUSR1; the background worker clears once per wake-up,
+# so requests arriving while a clear is pending coalesce
+_clear_requested = asyncio.Event()
+_clear_worker: Optional[asyncio.Task] = None
+
+def clear_all_caches():
+    """Clear JSON data, enhanced analytics, NodeSet query and data file caches"""
+    clear_cache()
+    enhanced_analytics_service.clear_cache()
+    clear_nodeset_cache()
+    _FILE_CACHE.clear()
+
+def request_cache_clear():
+    """Ask the background worker to clear all caches (safe to call from a signal handler)"""
+    _clear_requested.set()
+
+async def _run_cache_clears():
+    """Clear caches whenever requested, off the request path"""
+    while True:
+        await _clear_requested.wait()
+        _clear_requested.clear()
+        try:
+            clear_all_caches()
+            logger.info("All cached data cleared")
+        except Exception:
+            logger.exception("Failed to clear cache")
+
+def start_cache_clear_worker() -> asyncio.Task:
+    """Start the background cache clear worker on the running event loop"""
+    global _clear_worker
+    _clear_worker = asyncio.create_task(_run_cache_clears())
+    return _clear_worker
 
 class HealthResponse(BaseModel):
     """Health check response model"""
@@ -31,42 +164,14 @@ async def health_check():
     Returns API status, memory usage, and data file availability
     """
     try:
-        # Get memory usage
-        memory = psutil.virtual_memory()
-        process = psutil.Process(os.getpid())
-        
         # Check data files (check multiple possible locations)
-        def file_exists_anywhere(filename):
-            locations = [
-                f"./{filename}",
-                f"./json_data/{filename}",
-                f"./data/{filename}", 
-                f"../{filename}",
-                f"../json_data/{filename}"
-            ]
-            return any(os.path.exists(path) for path in locations)
-        
-        data_files = {
-            "nodeset_validator_tracker_cache.json": file_exists_anywhere("nodeset_validator_tracker_cache.json"),
-            "validator_performance_cache.json": file_exists_anywhere("validator_performance_cache.json"),
-            "proposals.json": file_exists_anywhere("proposals.json"),
-            "sync_committee_participation.json": file_exists_anywhere("sync_committee_participation.json"),
-            "mev_analysis_results.json": file_exists_anywhere("mev_analysis_results.json"),
-            "missed_proposals_cache.json": file_exists_anywhere("missed_proposals_cache.json"),
-            "dashboard_exit_data.json": file_exists_anywhere("dashboard_exit_data.json"),
-            "manual_ens_names.json": file_exists_anywhere("manual_ens_names.json")
-        }
+        data_files = data_file_status()
         
         return HealthResponse(
             status="healthy",
             timestamp=datetime.now(),
             uptime=0.0,  # Will implement proper uptime tracking
-            memory_usage={
-                "total_mb": round(memory.total / (1024**2), 2),
-                "available_mb": round(memory.available / (1024**2), 2),
-                "percent": memory.percent,
-                "process_mb": round(process.memory_info().rss / (1024**2), 2)
-            },
+            memory_usage=get_memory_usage(),
             data_files=data_files
         )
         
@@ -79,27 +184,7 @@ async def check_data_files():
     Check availability of all required data files
     """
     try:
-        # Helper function to check if file exists in any location
-        def file_exists_anywhere(filename):
-            locations = [
-                f"./{filename}",
-                f"./json_data/{filename}",
-                f"./data/{filename}", 
-                f"../{filename}",
-                f"../json_data/{filename}"
-            ]
-            return any(os.path.exists(path) for path in locations)
-        
-        data_files = {
-            "nodeset_validator_tracker_cache.json": file_exists_anywhere("nodeset_validator_tracker_cache.json"),
-            "validator_performance_cache.json": file_exists_anywhere("validator_performance_cache.json"),
-            "proposals.json": file_exists_anywhere("proposals.json"),
-            "sync_committee_participation.json": file_exists_anywhere("sync_committee_participation.json"),
-            "mev_analysis_results.json": file_exists_anywhere("mev_analysis_results.json"),
-            "missed_proposals_cache.json": file_exists_anywhere("missed_proposals_cache.json"),
-            "dashboard_exit_data.json": file_exists_anywhere("dashboard_exit_data.json"),
-            "manual_ens_names.json": file_exists_anywhere("manual_ens_names.json")
-        }
+        data_files = data_file_status()
         
         missing_files = [file for file, exists in data_files.items() if not exists]
         
@@ -114,19 +199,22 @@ async def check_data_files():
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Data file check failed: {str(e)}")
 
-@router.post("/clear-cache")
+@router.post("/clear-cache", status_code=202)
 async def clear_data_cache():
     """
-    Manually clear all cached data
-    Useful for forcing immediate reload of JSON files
+    Schedule a clear of all cached data
+    Useful for forcing reload of JSON files; the clear runs in the background
+    worker (also triggered by SIGUSR1) and overlapping requests coalesce
     """
-    try:
-        clear_cache()
-        return {
-            "status": "success",
-            "message": "All cached data cleared successfully",
-            "timestamp": datetime.now(),
-            "note": "Next API calls will reload fresh data from JSON files"
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to clear cache: {str(e)}")
\ No newline at end of file
+    if _clear_worker is None or _clear_worker.done():
+        # No background worker (app served without lifespan events): clear inline
+        clear_all_caches()
+    else:
+        request_cache_clear()
+    
+    return {
+        "status": "accepted",
+        "message": "Cache clear scheduled",
+        "timestamp": datetime.now(),
+        "note": "Next API calls will reload fresh data from JSON files"
+    }
@@ -4,47 +4,152 @@ NodeSet API Router
 Endpoints for NodeSet-specific validator operations and monitoring
 """
 
-from fastapi import APIRouter, HTTPException, Query
-from typing import List, Dict, Any, Optional, Union
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
 import logging
 import asyncio
 import time
+from config import settings
 from services.clickhouse_service import clickhouse_service
+from services.epoch_cache import EpochScopedCache
+from services.nodeset_queries import (
+    EPOCH_RANGE_QUERY,
+    PARTITION_EPOCH_BOUNDS_QUERY,
+    LATEST_PARTITION_EPOCH_QUERY,
+    VALIDATORS_DOWN_FIELDS,
+    VALIDATORS_DOWN_QUERY,
+    VALIDATORS_DOWN_MISSED_QUERY,
+    MISSED_ATTESTATION_COLUMN_QUERY,
+    OPERATOR_ACTIVE_VALIDATORS_QUERY,
+    VALIDATORS_DOWN_STATUS_QUERY,
+    VALIDATORS_DOWN_SUMMARY_QUERY,
+    BELOW_THRESHOLD_ROLLUP_QUERY,
+    BELOW_THRESHOLD_QUERY,
+    BELOW_THRESHOLD_CANDIDATES_QUERY,
+    BELOW_THRESHOLD_DETAILS_QUERY,
+    THEORETICAL_PERFORMANCE_QUERY,
+    THEORETICAL_PERFORMANCE_EXTENDED_DAY_QUERY,
+    THEORETICAL_PERFORMANCE_EXTENDED_QUERY,
+    THEORETICAL_PERFORMANCE_EXTENDED_ROLLUP_QUERY,
+    OPERATOR_EFFICIENCY_QUERY,
+    OPERATOR_EFFICIENCY_ROLLUP_QUERY,
+    VALIDATOR_STATUS_VALUES_QUERY
+)
+from utils import EPOCH_CACHE_CONTROL, FastJSONResponse, epoch_etag, etag_matches
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter()
+router = APIRouter(default_response_class=FastJSONResponse)
 
 _EPOCH_CACHE_TTL_SECONDS = 30
+# The earliest epoch only moves when old partitions are dropped, so it is refreshed far less often
+_MIN_EPOCH_CACHE_TTL_SECONDS = 300
+# /below_threshold/extended requests above this limit stream rollup rows straight through
+# instead of building (and caching) the full list in memory
+_STREAM_MIN_LIMIT = 1000
+# Window-wide operator aggregations (theoretical_performance*): bounded memory, with GROUP BY
+# spilling to disk past the threshold instead of failing the query
+_AGGREGATION_SETTINGS = {
+    "max_threads": 8,
+    "max_memory_usage": settings.CLICKHOUSE_MAX_MEMORY_USAGE,
+    "max_bytes_before_external_group_by": settings.CLICKHOUSE_EXTERNAL_GROUP_BY_BYTES
+}
 _nodeset_epoch_cache: Dict[str, Any] = {
     "latest_epoch": None,
     "min_epoch": None,
-    "updated_at": 0.0
+    "updated_at": 0.0,
+    "min_updated_at": 0.0
 }
 _nodeset_epoch_cache_lock = asyncio.Lock()
-_rollup_table_cache: Dict[str, Any] = {"available": None, "checked_at": 0.0}
+_rollup_table_cache: Dict[str, Any] = {"first_epoch": None, "checked_at": 0.0}
+_missed_column_cache: Dict[str, Any] = {"available": None, "checked_at": 0.0}
+_performance_rollup_cache: Dict[str, Any] = {"first_epoch": None, "checked_at": 0.0}
+_operator_stats_cache: Dict[str, Any] = {"first_epoch": None, "checked_at": 0.0}
+
+# Validators-down and below-threshold results are a pure function of the latest epoch and
+# the request arguments, so they are reused until a new epoch lands
+_epoch_results = EpochScopedCache()
+
+def clear_cache():
+    """Drop cached epoch bounds and per-epoch endpoint results"""
+    _nodeset_epoch_cache.update({"latest_epoch": None, "min_epoch": None, "updated_at": 0.0, "min_updated_at": 0.0})
+    _rollup_table_cache.update({"first_epoch": None, "checked_at": 0.0})
+    _missed_column_cache.update({"available": None, "checked_at": 0.0})
+    _performance_rollup_cache.update({"first_epoch": None, "checked_at": 0.0})
+    _operator_stats_cache.update({"first_epoch": None, "checked_at": 0.0})
+    _epoch_results.clear()
 
-async def _has_daily_rollup_table() -> bool:
-    """Check whether the daily rollup table exists (cached)."""
+async def _schema_probe(cache: Dict[str, Any], query: str) -> bool:
+    """Run a 1/0 schema check (table or column exists) and cache the answer for five minutes."""
     now = time.time()
-    if _rollup_table_cache["available"] is not None and (now - _rollup_table_cache["checked_at"]) < 300:
-        return bool(_rollup_table_cache["available"])
+    if cache["available"] is not None and (now - cache["checked_at"]) < 300:
+        return bool(cache["available"])
 
     try:
-        table_exists_rows = await clickhouse_service.execute_query(
-            "EXISTS TABLE validators_daily_attestation_rollup",
+        probe_rows = await clickhouse_service.execute_query(
+            query,
             client_timeout=5,
             max_execution_time=3,
             settings={"max_threads": 1}
         )
-        available = bool(table_exists_rows and table_exists_rows[0] and str(table_exists_rows[0][0]) == "1")
+        available = bool(probe_rows and probe_rows[0] and str(probe_rows[0][0]) == "1")
     except Exception:
         available = False
 
-    _rollup_table_cache["available"] = available
-    _rollup_table_cache["checked_at"] = time.time()
+    cache["available"] = available
+    cache["checked_at"] = time.time()
     return available
 
+async def _rollup_covers(cache: Dict[str, Any], query: str, start_epoch: int) -> bool:
+    """
+    Check whether a rollup table holds data back to `start_epoch`, caching its first epoch for five minutes.
+
+    Existence alone is not enough: a table whose backfill has not run yet only holds the epochs
+    its materialized view has seen, and would silently return partial sums for older windows.
+    A missing or empty table (NULL first epoch) never covers a window.
+    """
+    now = time.time()
+    if (now - cache["checked_at"]) >= 300:
+        try:
+            probe_rows = await clickhouse_service.execute_query(
+                query,
+                client_timeout=5,
+                max_execution_time=3,
+                settings={"max_threads": 1},
+                typed=True
+            )
+            first_epoch = probe_rows[0][0] if probe_rows and probe_rows[0] else None
+        except Exception:
+            first_epoch = None
+
+        cache["first_epoch"] = first_epoch
+        cache["checked_at"] = time.time()
+
+    return cache["first_epoch"] is not None and cache["first_epoch"] <= start_epoch
+
+async def _daily_rollup_covers(start_epoch: int) -> bool:
+    """Check whether the daily attestation rollup covers the window from `start_epoch` (cached)."""
+    return await _rollup_covers(
+        _rollup_table_cache, "SELECT minOrNull(day_partition) * 225 FROM validators_daily_attestation_rollup", start_epoch
+    )
+
+async def _performance_rollup_covers(start_epoch: int) -> bool:
+    """Check whether the daily performance rollup covers the window from `start_epoch` (cached)."""
+    return await _rollup_covers(
+        _performance_rollup_cache, "SELECT minOrNull(day_partition) * 225 FROM validators_daily_performance_rollup", start_epoch
+    )
+
+async def _operator_stats_cover(start_epoch: int) -> bool:
+    """Check whether the per-epoch operator stats cover the window from `start_epoch` (cached)."""
+    return await _rollup_covers(
+        _operator_stats_cache, "SELECT minOrNull(epoch) FROM validators_epoch_operator_stats", start_epoch
+    )
+
+async def _has_missed_attestation_column() -> bool:
+    """Check whether validators_summary has the materialized missed_attestation column (cached)."""
+    return await _schema_probe(_missed_column_cache, MISSED_ATTESTATION_COLUMN_QUERY)
+
 async def _get_nodeset_epoch_bounds() -> Optional[Dict[str, int]]:
     """Return cached latest/min NodeSet epochs using a fast partition-based lookup."""
     now = time.time()
@@ -70,88 +175,66 @@ async def _get_nodeset_epoch_bounds() -> Optional[Dict[str, int]]:
                 "min_epoch": int(_nodeset_epoch_cache["min_epoch"])
             }
 
-        try:
-            # Fast metadata scan: find partition bounds first.
-            partitions_query = """
-            SELECT
-                min(toInt64(partition)) as min_partition,
-                max(toInt64(partition)) as max_partition
-            FROM system.parts
-            WHERE active
-              AND database = currentDatabase()
-              AND table = 'validators_summary'
-            """
-            partition_rows = await clickhouse_service.execute_query(
-                partitions_query,
-                client_timeout=10,
-                max_execution_time=8,
-                settings={"max_threads": 2}
-            )
-
-            if partition_rows and len(partition_rows[0]) >= 2:
-                min_partition = int(partition_rows[0][0])
-                max_partition = int(partition_rows[0][1])
-
-                max_epoch_query = f"""
-                SELECT MAX(epoch)
-                FROM validators_summary
-                PREWHERE intDiv(epoch, 225) = {max_partition}
-                WHERE val_nos_id IS NOT NULL
-                """
-                min_epoch_query = f"""
-                SELECT MIN(epoch)
-                FROM validators_summary
-                PREWHERE intDiv(epoch, 225) = {min_partition}
-                WHERE val_nos_id IS NOT NULL
-                """
-
-                max_epoch_rows = await clickhouse_service.execute_query(
-                    max_epoch_query,
-                    client_timeout=15,
-                    max_execution_time=12,
-                    settings={"max_threads": 2}
-                )
-                min_epoch_rows = await clickhouse_service.execute_query(
-                    min_epoch_query,
-                    client_timeout=15,
-                    max_execution_time=12,
+        # Only the latest epoch has expired: refresh it alone and keep the cached minimum
+        if (
+            _nodeset_epoch_cache["min_epoch"] is not None
+            and (now - _nodeset_epoch_cache["min_updated_at"]) < _MIN_EPOCH_CACHE_TTL_SECONDS
+        ):
+            try:
+                latest_rows = await clickhouse_service.execute_query(
+                    LATEST_PARTITION_EPOCH_QUERY,
+                    client_timeout=10,
+                    max_execution_time=8,
                     settings={"max_threads": 2}
                 )
-
-                if (
-                    max_epoch_rows and max_epoch_rows[0][0] not in [None, '\\N', '']
-                    and min_epoch_rows and min_epoch_rows[0][0] not in [None, '\\N', '']
-                ):
-                    latest_epoch = int(max_epoch_rows[0][0])
-                    min_epoch = int(min_epoch_rows[0][0])
+                if latest_rows and latest_rows[0] and latest_rows[0][0] not in [None, '\\N', '']:
+                    latest_epoch = int(latest_rows[0][0])
+                    min_epoch = int(_nodeset_epoch_cache["min_epoch"])
                     _nodeset_epoch_cache["latest_epoch"] = latest_epoch
-                    _nodeset_epoch_cache["min_epoch"] = min_epoch
                     _nodeset_epoch_cache["updated_at"] = time.time()
                     return {"latest_epoch": latest_epoch, "min_epoch": min_epoch}
+            except Exception as latest_lookup_error:
+                logger.warning(f"Latest epoch lookup failed, refreshing both bounds: {latest_lookup_error}")
+
+        try:
+            # Partition bounds come from a metadata scan; ClickHouse evaluates the scalar
+            # subqueries first, so both epoch lookups stay partition-pruned in one round-trip.
+            bounds_rows = await clickhouse_service.execute_query(
+                PARTITION_EPOCH_BOUNDS_QUERY,
+                client_timeout=15,
+                max_execution_time=12,
+                settings={"max_threads": 2}
+            )
+
+            if (
+                bounds_rows and len(bounds_rows[0]) >= 2
+                and bounds_rows[0][0] not in [None, '\\N', '']
+                and bounds_rows[0][1] not in [None, '\\N', '']
+            ):
+                latest_epoch = int(bounds_rows[0][0])
+                min_epoch = int(bounds_rows[0][1])
+                _nodeset_epoch_cache["latest_epoch"] = latest_epoch
+                _nodeset_epoch_cache["min_epoch"] = min_epoch
+                _nodeset_epoch_cache["updated_at"] = _nodeset_epoch_cache["min_updated_at"] = time.time()
+                return {"latest_epoch": latest_epoch, "min_epoch": min_epoch}
         except Exception as fast_lookup_error:
             logger.warning(f"Fast epoch lookup failed, falling back to direct query: {fast_lookup_error}")
 
         # Fallback path (kept for resiliency).
-        latest_rows = await clickhouse_service.execute_query(
-            "SELECT MAX(epoch) FROM validators_summary WHERE val_nos_name IS NOT NULL",
-            client_timeout=20,
-            max_execution_time=15,
-            settings={"max_threads": 2}
-        )
-        min_rows = await clickhouse_service.execute_query(
-            "SELECT MIN(epoch) FROM validators_summary WHERE val_nos_name IS NOT NULL",
+        bounds_rows = await clickhouse_service.execute_query(
+            EPOCH_RANGE_QUERY,
             client_timeout=20,
             max_execution_time=15,
             settings={"max_threads": 2}
         )
-        if not latest_rows or not latest_rows[0][0] or not min_rows or not min_rows[0][0]:
+        if not bounds_rows or len(bounds_rows[0]) < 2 or not bounds_rows[0][0] or not bounds_rows[0][1]:
             return None
 
-        latest_epoch = int(latest_rows[0][0])
-        min_epoch = int(min_rows[0][0])
+        latest_epoch = int(bounds_rows[0][0])
+        min_epoch = int(bounds_rows[0][1])
         _nodeset_epoch_cache["latest_epoch"] = latest_epoch
         _nodeset_epoch_cache["min_epoch"] = min_epoch
-        _nodeset_epoch_cache["updated_at"] = time.time()
+        _nodeset_epoch_cache["updated_at"] = _nodeset_epoch_cache["min_updated_at"] = time.time()
         return {"latest_epoch": latest_epoch, "min_epoch": min_epoch}
 
 async def _query_below_threshold_extended_from_rollup(
@@ -163,107 +246,165 @@ async def _query_below_threshold_extended_from_rollup(
     limit: int
 ) -> List[Dict[str, Any]]:
     """Serve below-threshold query from pre-aggregated daily rollup data."""
-    start_partition = start_epoch // 225
-    latest_partition = latest_epoch // 225
-
-    rollup_query = f"""
-    WITH validator_rollup AS (
-        SELECT
-            val_id,
-            anyLast(val_nos_name) as operator,
-            SUM(active_duty_epochs) as active_duty_epochs,
-            SUM(actual_rewards) as actual_rewards,
-            SUM(theoretical_max_rewards) as theoretical_max_rewards,
-            SUM(attestations_made) as attestations_made,
-            SUM(blocks_proposed) as blocks_proposed,
-            SUM(proposer_slots) as proposer_slots,
-            SUM(sync_percent_sum) as sync_percent_sum,
-            SUM(sync_percent_count) as sync_percent_count,
-            SUM(if(day_partition = {latest_partition}, actual_rewards, 0)) as day_1_actual,
-            SUM(if(day_partition = {latest_partition}, theoretical_max_rewards, 0)) as day_1_theoretical
-        FROM validators_daily_attestation_rollup
-        PREWHERE day_partition BETWEEN {start_partition} AND {latest_partition}
-        WHERE val_nos_id IS NOT NULL
-          AND val_nos_name IS NOT NULL
-        GROUP BY val_id
-        HAVING active_duty_epochs = {total_epochs}
-    ),
-    scored AS (
-        SELECT
-            operator,
-            val_id as validator_id,
-            active_duty_epochs,
-            actual_rewards,
-            theoretical_max_rewards,
-            attestations_made,
-            blocks_proposed,
-            proposer_slots,
-            sync_percent_sum,
-            sync_percent_count,
-            day_1_actual,
-            day_1_theoretical,
-            if(theoretical_max_rewards > 0, (actual_rewards * 100.0 / theoretical_max_rewards), 0.0) as reward_percentage,
-            if(day_1_theoretical > 0, (day_1_actual * 100.0 / day_1_theoretical), 0.0) as day_1_percentage,
-            if(sync_percent_count > 0, (sync_percent_sum / sync_percent_count), 0.0) as avg_sync_performance
-        FROM validator_rollup
+    # Rows come back as typed dicts already in the response shape
+    return await clickhouse_service.execute_query(
+        BELOW_THRESHOLD_ROLLUP_QUERY,
+        client_timeout=25,
+        max_execution_time=20,
+        settings={"max_threads": 4},
+        params=_rollup_query_params(start_epoch, latest_epoch, total_epochs, days, threshold, limit),
+        named=True
     )
-    SELECT
-        operator,
-        validator_id,
-        active_duty_epochs,
-        actual_rewards,
-        theoretical_max_rewards,
-        reward_percentage,
-        attestations_made,
-        (active_duty_epochs - attestations_made) as attestations_missed,
-        blocks_proposed,
-        (proposer_slots - blocks_proposed) as blocks_missed,
-        avg_sync_performance,
-        day_1_actual,
-        day_1_theoretical,
-        day_1_percentage
-    FROM scored
-    WHERE reward_percentage < {threshold}
-    ORDER BY reward_percentage ASC, operator, validator_id
-    LIMIT {limit}
-    """
 
-    raw_data = await clickhouse_service.execute_query(
-        rollup_query,
+def _rollup_query_params(
+    start_epoch: int,
+    latest_epoch: int,
+    total_epochs: int,
+    days: int,
+    threshold: float,
+    limit: int
+) -> Dict[str, Any]:
+    """Bound parameters for BELOW_THRESHOLD_ROLLUP_QUERY"""
+    return {
+        "start_partition": start_epoch // 225,
+        "latest_partition": latest_epoch // 225,
+        "start_epoch": start_epoch,
+        "latest_epoch": latest_epoch,
+        "total_epochs": total_epochs,
+        "days": days,
+        "threshold": threshold,
+        "lim": limit
+    }
+
+async def _stream_below_threshold_extended_from_rollup(
+    response: Response,
+    start_epoch: int,
+    latest_epoch: int,
+    total_epochs: int,
+    days: int,
+    threshold: float,
+    limit: int
+) -> Optional[StreamingResponse]:
+    """Stream rollup below-threshold rows as a JSON array, or None when the stream can't be opened"""
+    chunks = clickhouse_service.stream_query(
+        BELOW_THRESHOLD_ROLLUP_QUERY,
         client_timeout=25,
         max_execution_time=20,
-        settings={"max_threads": 4}
+        settings={"max_threads": 4},
+        params=_rollup_query_params(start_epoch, latest_epoch, total_epochs, days, threshold, limit)
     )
+    # Pull the first chunk here so query errors fall back to the buffered path instead of
+    # surfacing after a 200 has been sent
+    try:
+        first_chunk = await chunks.__anext__()
+    except StopAsyncIteration:
+        first_chunk = b"[]"
+    except Exception as stream_error:
+        logger.warning(f"Streaming rollup query failed, falling back to buffered query: {stream_error}")
+        return None
 
-    results: List[Dict[str, Any]] = []
-    for row in raw_data:
-        if len(row) >= 14:
-            results.append({
-                'operator': row[0],
-                'validator_id': int(row[1]),
-                'total_epochs': total_epochs,
-                'active_duty_epochs': int(row[2]),
-                'actual_rewards': int(row[3]),
-                'theoretical_max_rewards': int(row[4]),
-                'reward_percentage': float(row[5]),
-                'attestations_made': int(row[6]),
-                'attestations_missed': int(row[7]),
-                'blocks_proposed': int(row[8]),
-                'blocks_missed': int(row[9]),
-                'avg_sync_performance': float(row[10]) if row[10] not in ['\\N', None, ''] else 0.0,
-                'day_1_actual_rewards': int(row[11]),
-                'day_1_theoretical_rewards': int(row[12]),
-                'day_1_percentage': float(row[13]),
-                'latest_epoch': latest_epoch,
-                'start_epoch': start_epoch,
-                'days_analyzed': days,
-                'threshold_percentage': threshold
-            })
+    async def body():
+        yield first_chunk
+        async for chunk in chunks:
+            yield chunk
 
-    return results
+    return StreamingResponse(body(), media_type="application/json", headers=_epoch_headers(response))
+
+def _epoch_headers(response: Response) -> Dict[str, str]:
+    """ETag/Cache-Control headers set by _not_modified, for handlers that return their own Response"""
+    return {name: response.headers[name] for name in ("ETag", "Cache-Control") if name in response.headers}
+
+def _epoch_json_response(results: List[Dict[str, Any]], response: Response) -> FastJSONResponse:
+    """Serialize rows with orjson directly, skipping response-model validation and jsonable_encoder"""
+    return FastJSONResponse(results, headers=_epoch_headers(response))
+
+def _not_modified(request: Request, response: Response, endpoint: str, latest_epoch: int, params: Tuple = ()) -> Optional[Response]:
+    """Attach per-epoch ETag/Cache-Control headers, returning a 304 when the client already has this epoch's response"""
+    etag = epoch_etag(endpoint, latest_epoch, params)
+    headers = {"ETag": etag, "Cache-Control": EPOCH_CACHE_CONTROL}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+async def _compute_validators_down(latest_epoch: int, epochs_back: int, limit: int) -> Tuple[Dict[str, Any], ...]:
+    """Validators that missed attestations in each of the `epochs_back` epochs ending at `latest_epoch` (cached per epoch)"""
+    return await _epoch_results.get_or_compute(
+        ("validators_down", epochs_back, limit),
+        latest_epoch,
+        lambda: _query_validators_down(latest_epoch, epochs_back, limit)
+    )
+
+async def _query_validators_down(latest_epoch: int, epochs_back: int, limit: int) -> Tuple[Dict[str, Any], ...]:
+    """Run VALIDATORS_DOWN_QUERY (or its missed_attestation variant) for one epoch window"""
+    query = VALIDATORS_DOWN_MISSED_QUERY if await _has_missed_attestation_column() else VALIDATORS_DOWN_QUERY
+    raw_data = await clickhouse_service.execute_query(
+        query,
+        client_timeout=30,
+        max_execution_time=25,
+        settings={"max_threads": 4},
+        params={"start_epoch": latest_epoch - epochs_back + 1, "latest_epoch": latest_epoch, "n": epochs_back, "lim": limit},
+        typed=True
+    )
+    
+    # Rows arrive natively typed in the fixed VALIDATORS_DOWN_FIELDS projection order
+    return tuple(dict(zip(VALIDATORS_DOWN_FIELDS, row)) for row in raw_data)
+
+async def _compute_validators_down_summary(latest_epoch: int) -> Optional[Dict[str, Any]]:
+    """Downtime summary for the 3 epochs ending at `latest_epoch` (cached per epoch)"""
+    return await _epoch_results.get_or_compute(
+        ("validators_down_summary",),
+        latest_epoch,
+        lambda: _query_validators_down_summary(latest_epoch)
+    )
+
+async def _query_validators_down_summary(latest_epoch: int) -> Optional[Dict[str, Any]]:
+    """Run the single-pass summary scan for the 3 epochs ending at `latest_epoch`"""
+    rows = await clickhouse_service.execute_query(
+        VALIDATORS_DOWN_SUMMARY_QUERY,
+        client_timeout=30,
+        max_execution_time=25,
+        settings={"max_threads": 4},
+        params={"start_epoch": latest_epoch - 2, "latest_epoch": latest_epoch, "n": 3},
+        typed=True
+    )
+    
+    if not rows or len(rows[0]) < 6:
+        return None
+    
+    total_validators, total_operators, missed_latest, missed_minus_1, missed_minus_2, consecutive_down = rows[0]
+    result = {
+        'total_validators': total_validators,
+        'total_operators': total_operators,
+        'missed_latest_epoch': missed_latest,
+        'consecutive_down_3_epochs': consecutive_down,
+        'latest_epoch': latest_epoch,
+        'start_epoch': latest_epoch - 2,
+        'epoch_breakdown': {
+            'latest_epoch': {
+                'epoch': latest_epoch,
+                'missed': missed_latest or 0
+            },
+            'epoch_minus_1': {
+                'epoch': latest_epoch - 1,
+                'missed': missed_minus_1 or 0
+            },
+            'epoch_minus_2': {
+                'epoch': latest_epoch - 2,
+                'missed': missed_minus_2 or 0
+            }
+        },
+        'latest_epoch_participation_rate': round(((total_validators - missed_latest) / total_validators) * 100, 2) if total_validators > 0 else 0,
+        'three_epoch_consecutive_failure_rate': round((consecutive_down / total_validators) * 100, 2) if total_validators > 0 else 0
+    }
+    
+    return result
 
 @router.get("/validators_down")
 async def get_validators_down(
+    request: Request,
+    response: Response,
     limit: int = Query(100, description="Maximum number of validators to return", ge=1, le=99999)
 ) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
     """
@@ -282,48 +423,15 @@ async def get_validators_down(
             raise HTTPException(status_code=404, detail="No epoch data found")
 
         latest_epoch = int(epoch_bounds["latest_epoch"])
-        start_epoch = latest_epoch - 2  # 3 epochs total: latest, latest-1, latest-2
-        
-        # Query to find validators that missed attestations in all 3 epochs
-        # Single-pass aggregation for better performance
-        query = f"""
-        SELECT 
-            any(val_nos_name) as operator,
-            val_id as validator_id,
-            {latest_epoch} as latest_epoch,
-            {start_epoch} as start_epoch
-        FROM validators_summary
-        PREWHERE epoch BETWEEN {start_epoch} AND {latest_epoch}
-            AND val_status IN ('active_ongoing', 'active_slashed')
-            AND val_nos_id IS NOT NULL
-        GROUP BY val_id
-        HAVING COUNT() = 3
-           AND countIf(att_happened = 1) = 0
-        ORDER BY operator, val_id
-        LIMIT {limit}
-        """
-        
-        raw_data = await clickhouse_service.execute_query(
-            query,
-            client_timeout=30,
-            max_execution_time=25,
-            settings={"max_threads": 4}
-        )
+        not_modified = _not_modified(request, response, "validators_down", latest_epoch, (limit,))
+        if not_modified:
+            return not_modified
         
-        # Transform to structured format
-        results = []
-        for row in raw_data:
-            if len(row) >= 4:
-                results.append({
-                    'operator': row[0],
-                    'validator_id': int(row[1]),
-                    'latest_epoch': int(row[2]),
-                    'start_epoch': int(row[3]),
-                    'consecutive_misses': 3
-                })
+        # Validators that missed attestations in all 3 epochs: latest, latest-1, latest-2
+        results = list(await _compute_validators_down(latest_epoch, 3, limit))
         
         logger.info(f"Found {len(results)} validators with 3 consecutive missed attestations")
-        return results
+        return _epoch_json_response(results, response)
         
     except HTTPException:
         raise
@@ -333,6 +441,8 @@ async def get_validators_down(
 
 @router.get("/validators_down/extended")
 async def get_validators_down_extended(
+    request: Request,
+    response: Response,
     epochs_back: int = Query(2, description="Number of consecutive epochs to check", ge=2, le=10),
     limit: int = Query(100, description="Maximum number of validators to return", ge=1, le=99999),
     test_operator: Optional[str] = Query(None, description="Operator address for test data generation")
@@ -363,21 +473,12 @@ async def get_validators_down_extended(
             start_epoch = latest_epoch - epochs_back + 1
             
             # Get real validator IDs for the test operator
-            validator_query = f"""
-            SELECT DISTINCT val_id
-            FROM validators_summary 
-            PREWHERE epoch = {latest_epoch}
-            WHERE val_nos_name = '{test_operator}'
-            AND val_status IN ('active_ongoing', 'active_slashed')
-            ORDER BY val_id
-            LIMIT {limit}
-            """
-            
             validator_data = await clickhouse_service.execute_query(
-                validator_query,
+                OPERATOR_ACTIVE_VALIDATORS_QUERY,
                 client_timeout=20,
                 max_execution_time=15,
-                settings={"max_threads": 2}
+                settings={"max_threads": 2},
+                params={"latest_epoch": latest_epoch, "operator": test_operator, "lim": limit}
             )
             
             if not validator_data:
@@ -405,49 +506,15 @@ async def get_validators_down_extended(
             raise HTTPException(status_code=404, detail="No epoch data found")
 
         latest_epoch = int(epoch_bounds["latest_epoch"])
-        start_epoch = latest_epoch - epochs_back + 1
-        
-        # Build query to find validators that missed attestations in all specified epochs
-        # Single-pass aggregation for better performance
-        query = f"""
-        SELECT 
-            any(val_nos_name) as operator,
-            val_id as validator_id,
-            {latest_epoch} as latest_epoch,
-            {start_epoch} as start_epoch,
-            {epochs_back} as consecutive_misses
-        FROM validators_summary
-        PREWHERE epoch BETWEEN {start_epoch} AND {latest_epoch}
-            AND val_status IN ('active_ongoing', 'active_slashed')
-            AND val_nos_id IS NOT NULL
-        GROUP BY val_id
-        HAVING COUNT() = {epochs_back}
-           AND countIf(att_happened = 1) = 0
-        ORDER BY operator, val_id
-        LIMIT {limit}
-        """
+        not_modified = _not_modified(request, response, "validators_down_extended", latest_epoch, (epochs_back, limit))
+        if not_modified:
+            return not_modified
         
-        raw_data = await clickhouse_service.execute_query(
-            query,
-            client_timeout=30,
-            max_execution_time=25,
-            settings={"max_threads": 4}
-        )
-        
-        # Transform to structured format
-        results = []
-        for row in raw_data:
-            if len(row) >= 5:
-                results.append({
-                    'operator': row[0],
-                    'validator_id': int(row[1]),
-                    'latest_epoch': int(row[2]),
-                    'start_epoch': int(row[3]),
-                    'consecutive_misses': int(row[4])
-                })
+        # Find validators that missed attestations in all specified epochs
+        results = list(await _compute_validators_down(latest_epoch, epochs_back, limit))
         
         logger.info(f"Found {len(results)} validators with {epochs_back} consecutive missed attestations")
-        return results
+        return _epoch_json_response(results, response)
         
     except HTTPException:
         raise
@@ -456,7 +523,7 @@ async def get_validators_down_extended(
         raise HTTPException(status_code=500, detail=f"Database query failed: {str(e)}")
 
 @router.get("/validators_down/summary")
-async def get_validators_down_summary() -> Dict[str, Any]:
+async def get_validators_down_summary(request: Request, response: Response) -> Dict[str, Any]:
     """
     Get summary statistics about validators that have missed recent attestations.
     Excludes exited validators and those in withdrawal process.
@@ -474,91 +541,14 @@ async def get_validators_down_summary() -> Dict[str, Any]:
 
         latest_epoch = int(epoch_bounds["latest_epoch"])
         start_epoch = latest_epoch - 2  # 3 epochs total
+        not_modified = _not_modified(request, response, "validators_down_summary", latest_epoch)
+        if not_modified:
+            return not_modified
         
-        # Summary for 3 consecutive epochs using one base scan.
-        query = f"""
-        WITH base AS (
-            SELECT 
-                epoch,
-                val_id,
-                val_nos_name,
-                att_happened
-            FROM validators_summary
-            PREWHERE epoch BETWEEN {start_epoch} AND {latest_epoch}
-                AND val_status IN ('active_ongoing', 'active_slashed')
-                AND val_nos_id IS NOT NULL
-            WHERE val_nos_name IS NOT NULL
-        ),
-        epoch_stats AS (
-            SELECT
-                countIf(epoch = {latest_epoch}) as total_validators,
-                uniqExactIf(val_nos_name, epoch = {latest_epoch}) as total_operators,
-                sumIf((att_happened = 0) OR isNull(att_happened), epoch = {latest_epoch}) as missed_latest,
-                sumIf((att_happened = 0) OR isNull(att_happened), epoch = {latest_epoch - 1}) as missed_epoch_minus_1,
-                sumIf((att_happened = 0) OR isNull(att_happened), epoch = {latest_epoch - 2}) as missed_epoch_minus_2
-            FROM base
-        ),
-        three_epoch_consecutive AS (
-            SELECT
-                COUNT(*) as consecutive_down_3
-            FROM (
-                SELECT val_id
-                FROM base
-                GROUP BY val_id
-                HAVING COUNT() = 3
-                   AND countIf(att_happened = 1) = 0
-            )
-        )
-        SELECT 
-            e.total_validators,
-            e.total_operators,
-            e.missed_latest,
-            c.consecutive_down_3,
-            {latest_epoch} as latest_epoch,
-            {start_epoch} as start_epoch,
-            e.missed_latest as missed_epoch_latest,
-            e.missed_epoch_minus_1,
-            e.missed_epoch_minus_2
-        FROM epoch_stats e
-        CROSS JOIN three_epoch_consecutive c
-        """
-        
-        raw_data = await clickhouse_service.execute_query(
-            query,
-            client_timeout=30,
-            max_execution_time=25,
-            settings={"max_threads": 4}
-        )
-        
-        if not raw_data or len(raw_data[0]) < 9:
+        result = await _compute_validators_down_summary(latest_epoch)
+        if result is None:
             raise HTTPException(status_code=404, detail="No summary data found")
         
-        row = raw_data[0]
-        result = {
-            'total_validators': int(row[0]),
-            'total_operators': int(row[1]),
-            'missed_latest_epoch': int(row[2]),
-            'consecutive_down_3_epochs': int(row[3]),
-            'latest_epoch': int(row[4]),
-            'start_epoch': int(row[5]),
-            'epoch_breakdown': {
-                'latest_epoch': {
-                    'epoch': int(row[4]),
-                    'missed': int(row[6]) if row[6] else 0
-                },
-                'epoch_minus_1': {
-                    'epoch': int(row[4]) - 1,
-                    'missed': int(row[7]) if row[7] else 0
-                },
-                'epoch_minus_2': {
-                    'epoch': int(row[4]) - 2,
-                    'missed': int(row[8]) if row[8] else 0
-                }
-            },
-            'latest_epoch_participation_rate': round(((int(row[0]) - int(row[2])) / int(row[0])) * 100, 2) if int(row[0]) > 0 else 0,
-            'three_epoch_consecutive_failure_rate': round((int(row[3]) / int(row[0])) * 100, 2) if int(row[0]) > 0 else 0
-        }
-        
         logger.info(f"Generated validators down summary for 3 consecutive epochs {start_epoch}-{latest_epoch}")
         return result
         
@@ -568,8 +558,40 @@ async def get_validators_down_summary() -> Dict[str, Any]:
         logger.error(f"Failed to get validators down summary: {e}")
         raise HTTPException(status_code=500, detail=f"Database query failed: {str(e)}")
 
+async def _query_below_threshold(latest_epoch: int, min_epoch: int, threshold: float, limit: int) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
+    """Validators below `threshold` over the day ending at `latest_epoch`, or an insufficient-data report"""
+    epochs_requested = 225  # 1 day
+    start_epoch = latest_epoch - 224  # 225 epochs total (1 day)
+    
+    # Check if we have enough historical data
+    if start_epoch < min_epoch:
+        epochs_available = latest_epoch - min_epoch + 1
+        return {
+            "error": "Insufficient data available",
+            "message": f"Not enough historical data to perform {epochs_requested} epoch analysis",
+            "epochs_requested": epochs_requested,
+            "epochs_available": epochs_available,
+            "latest_epoch": latest_epoch,
+            "min_available_epoch": min_epoch,
+            "requested_start_epoch": start_epoch,
+            "data_completeness_percentage": round((epochs_available / epochs_requested) * 100, 2)
+        }
+
+    # Query to find validators below threshold
+    # Calculate theoretical maximum rewards vs actual rewards
+    # Only include epochs where validators were actively supposed to earn rewards
+    # The window is bound from the same cached bounds the cache key and ETag use
+    # Rows come back as typed dicts already in the response shape
+    return await clickhouse_service.execute_query(
+        BELOW_THRESHOLD_QUERY,
+        params={"start_epoch": start_epoch, "latest_epoch": latest_epoch, "threshold": threshold, "lim": limit},
+        named=True
+    )
+
 @router.get("/below_threshold")
 async def get_below_threshold(
+    request: Request,
+    response: Response,
     limit: int = Query(100, description="Maximum number of validators to return")
 ) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
     """
@@ -593,145 +615,140 @@ async def get_below_threshold(
         if not await clickhouse_service.is_available():
             raise HTTPException(status_code=503, detail="ClickHouse service unavailable")
         
-        # Get the latest epoch first
-        epoch_query = "SELECT MAX(epoch) FROM validators_summary WHERE val_nos_name IS NOT NULL"
-        epoch_data = await clickhouse_service.execute_query(epoch_query)
-        
-        if not epoch_data or not epoch_data[0][0]:
-            raise HTTPException(status_code=404, detail="No epoch data found")
-        
-        latest_epoch = int(epoch_data[0][0])
-        start_epoch = latest_epoch - 224  # 225 epochs total (1 day)
         threshold = 97.0  # 97% threshold
         
-        # Check if we have sufficient data availability
-        min_epoch_query = "SELECT MIN(epoch) FROM validators_summary WHERE val_nos_name IS NOT NULL"
-        min_epoch_data = await clickhouse_service.execute_query(min_epoch_query)
-        
-        if not min_epoch_data or not min_epoch_data[0][0]:
-            raise HTTPException(status_code=404, detail="No minimum epoch data found")
-        
-        min_available_epoch = int(min_epoch_data[0][0])
-        epochs_requested = 225
-        
-        # Check if we have enough historical data
-        if start_epoch < min_available_epoch:
-            epochs_available = latest_epoch - min_available_epoch + 1
-            return {
-                "error": "Insufficient data available",
-                "message": f"Not enough historical data to perform {epochs_requested} epoch analysis",
-                "epochs_requested": epochs_requested,
-                "epochs_available": epochs_available,
-                "latest_epoch": latest_epoch,
-                "min_available_epoch": min_available_epoch,
-                "requested_start_epoch": start_epoch,
-                "data_completeness_percentage": round((epochs_available / epochs_requested) * 100, 2)
-            }
+        # Cached per latest epoch
+        epoch_bounds = await _get_nodeset_epoch_bounds()
+        if not epoch_bounds:
+            raise HTTPException(status_code=404, detail="No epoch data found")
         
-        # Query to find validators below threshold
-        # Calculate theoretical maximum rewards vs actual rewards
-        # Only include epochs where validators were actively supposed to earn rewards
-        query = f"""
-        WITH validator_rewards AS (
-            SELECT 
-                val_id,
-                val_nos_name,
-                -- Count all epochs and active duty epochs separately
-                COUNT(*) as total_epochs,
-                SUM(CASE WHEN val_status IN ('active_ongoing', 'active_slashed') THEN 1 ELSE 0 END) as active_duty_epochs,
-                -- Actual attestation rewards earned (only during active duty)
-                SUM(CASE WHEN val_status IN ('active_ongoing', 'active_slashed') THEN COALESCE(att_earned_reward, 0) ELSE 0 END) as actual_rewards,
-                -- Theoretical maximum attestation rewards (earned + missed, only during active duty)
-                SUM(CASE WHEN val_status IN ('active_ongoing', 'active_slashed') THEN COALESCE(att_earned_reward, 0) + COALESCE(att_missed_reward, 0) ELSE 0 END) as theoretical_max_rewards,
-                -- Performance metrics (only during active duty)
-                SUM(CASE WHEN val_status IN ('active_ongoing', 'active_slashed') AND att_happened = 1 THEN 1 ELSE 0 END) as attestations_made,
-                SUM(CASE WHEN val_status IN ('active_ongoing', 'active_slashed') AND (att_happened = 0 OR att_happened IS NULL) THEN 1 ELSE 0 END) as attestations_missed,
-                SUM(CASE WHEN val_status IN ('active_ongoing', 'active_slashed') AND is_proposer = 1 AND block_proposed = 1 THEN 1 ELSE 0 END) as blocks_proposed,
-                SUM(CASE WHEN val_status IN ('active_ongoing', 'active_slashed') AND is_proposer = 1 AND (block_proposed = 0 OR block_proposed IS NULL) THEN 1 ELSE 0 END) as blocks_missed,
-                AVG(CASE WHEN val_status IN ('active_ongoing', 'active_slashed') AND sync_percent IS NOT NULL THEN sync_percent ELSE NULL END) as avg_sync_performance
-            FROM validators_summary 
-            WHERE epoch >= {start_epoch} 
-            AND epoch <= {latest_epoch}
-            AND val_nos_name IS NOT NULL
-            AND val_status NOT IN ('exited_unslashed', 'active_exiting', 'withdrawal_possible', 'withdrawal_done')
-            GROUP BY val_id, val_nos_name
-            HAVING SUM(CASE WHEN val_status IN ('active_ongoing', 'active_slashed') THEN 1 ELSE 0 END) = 225  -- Must have 100% active duty data coverage for 1 day (225 epochs)
-        ),
-        performance_analysis AS (
-            SELECT 
-                val_id,
-                val_nos_name,
-                total_epochs,
-                active_duty_epochs,
-                actual_rewards,
-                theoretical_max_rewards,
-                attestations_made,
-                attestations_missed,
-                blocks_proposed,
-                blocks_missed,
-                avg_sync_performance,
-                -- Calculate reward percentage
-                CASE 
-                    WHEN theoretical_max_rewards > 0 THEN (actual_rewards * 100.0 / theoretical_max_rewards)
-                    ELSE 0.0
-                END as reward_percentage
-            FROM validator_rewards
+        latest_epoch = int(epoch_bounds["latest_epoch"])
+        not_modified = _not_modified(request, response, "below_threshold", latest_epoch, (limit,))
+        if not_modified:
+            return not_modified
+        
+        results = await _epoch_results.get_or_compute(
+            ("below_threshold", limit),
+            latest_epoch,
+            lambda: _query_below_threshold(latest_epoch, int(epoch_bounds["min_epoch"]), threshold, limit)
         )
-        SELECT 
-            val_nos_name as operator,
-            val_id as validator_id,
-            total_epochs,
-            active_duty_epochs,
-            actual_rewards,
-            theoretical_max_rewards,
-            reward_percentage,
-            attestations_made,
-            attestations_missed,
-            blocks_proposed,
-            blocks_missed,
-            avg_sync_performance,
-            {latest_epoch} as latest_epoch,
-            {start_epoch} as start_epoch,
-            {threshold} as threshold_percentage
-        FROM performance_analysis
-        WHERE reward_percentage < {threshold}
-        ORDER BY reward_percentage ASC, val_nos_name, val_id
-        LIMIT {limit}
-        """
-        
-        raw_data = await clickhouse_service.execute_query(query)
-        
-        # Transform to structured format
-        results = []
-        for row in raw_data:
-            if len(row) >= 15:
-                results.append({
-                    'operator': row[0],
-                    'validator_id': int(row[1]),
-                    'total_epochs': int(row[2]),
-                    'active_duty_epochs': int(row[3]),
-                    'actual_rewards': int(row[4]),
-                    'theoretical_max_rewards': int(row[5]),
-                    'reward_percentage': float(row[6]),
-                    'attestations_made': int(row[7]),
-                    'attestations_missed': int(row[8]),
-                    'blocks_proposed': int(row[9]),
-                    'blocks_missed': int(row[10]),
-                    'avg_sync_performance': float(row[11]) if row[11] not in ['\\N', None, ''] else 0.0,
-                    'latest_epoch': int(row[12]),
-                    'start_epoch': int(row[13]),
-                    'threshold_percentage': float(row[14])
-                })
+        if isinstance(results, dict):
+            return results
         
         logger.info(f"Found {len(results)} validators below {threshold}% reward threshold for 1 day period")
-        return results
+        return _epoch_json_response(results, response)
         
     except Exception as e:
         logger.error(f"Failed to get below threshold validators: {e}")
         raise HTTPException(status_code=500, detail=f"Database query failed: {str(e)}")
 
+async def _query_below_threshold_extended(
+    start_epoch: int,
+    latest_epoch: int,
+    total_epochs: int,
+    days: int,
+    threshold: float,
+    limit: int
+) -> List[Dict[str, Any]]:
+    """Below-threshold validators for one epoch window, from the daily rollup when it covers the window"""
+    # Preferred fast path: use pre-aggregated daily rollup table once it covers the whole window.
+    if await _daily_rollup_covers(start_epoch):
+        try:
+            rollup_results = await _query_below_threshold_extended_from_rollup(
+                start_epoch=start_epoch,
+                latest_epoch=latest_epoch,
+                total_epochs=total_epochs,
+                days=days,
+                threshold=threshold,
+                limit=limit
+            )
+            logger.info(
+                "Served below_threshold_extended from daily rollup table (%s results)",
+                len(rollup_results)
+            )
+            return rollup_results
+        except Exception as rollup_error:
+            logger.warning(f"Daily rollup query failed, falling back to raw query: {rollup_error}")
+
+    # Phase 1: lightweight scan to identify candidate validators below threshold.
+    candidate_rows = await clickhouse_service.execute_query(
+        BELOW_THRESHOLD_CANDIDATES_QUERY,
+        client_timeout=80,
+        max_execution_time=75,
+        settings={"max_threads": 6},
+        params={
+            "start_epoch": start_epoch,
+            "latest_epoch": latest_epoch,
+            "total_epochs": total_epochs,
+            "threshold": threshold,
+            "lim": limit
+        },
+        named=True
+    )
+
+    if not candidate_rows:
+        return []
+
+    # Phase 2: compute detailed metrics only for selected validators.
+    detail_rows = await clickhouse_service.execute_query(
+        BELOW_THRESHOLD_DETAILS_QUERY,
+        client_timeout=40,
+        max_execution_time=35,
+        settings={"max_threads": 4},
+        params={
+            "start_epoch": start_epoch,
+            "latest_epoch": latest_epoch,
+            "validator_ids": [candidate["validator_id"] for candidate in candidate_rows]
+        },
+        named=True
+    )
+    detail_map: Dict[int, Dict[str, Any]] = {row["validator_id"]: row for row in detail_rows}
+
+    # Merge candidate metrics with details while keeping response shape stable.
+    # Both phases return natively typed dicts, so no per-value conversion is needed here.
+    results = []
+    for candidate in candidate_rows:
+        validator_id = candidate["validator_id"]
+        details = detail_map.get(validator_id, {})
+        active_duty_epochs = candidate["active_duty_epochs"]
+        attestations_made = details.get("attestations_made", 0)
+        attestations_missed = max(active_duty_epochs - attestations_made, 0)
+        blocks_proposed = details.get("blocks_proposed", 0)
+        proposer_slots = details.get("proposer_slots", 0)
+        blocks_missed = max(proposer_slots - blocks_proposed, 0)
+        day_1_actual = details.get("day_1_actual", 0)
+        day_1_theoretical = details.get("day_1_theoretical", 0)
+        day_1_percentage = (day_1_actual * 100.0 / day_1_theoretical) if day_1_theoretical > 0 else 0.0
+
+        results.append({
+            'operator': details.get("operator"),
+            'validator_id': validator_id,
+            'total_epochs': total_epochs,
+            'active_duty_epochs': active_duty_epochs,
+            'actual_rewards': candidate['actual_rewards'],
+            'theoretical_max_rewards': candidate['theoretical_max_rewards'],
+            'reward_percentage': candidate['reward_percentage'],
+            'attestations_made': attestations_made,
+            'attestations_missed': attestations_missed,
+            'blocks_proposed': blocks_proposed,
+            'blocks_missed': blocks_missed,
+            'avg_sync_performance': details.get("avg_sync_performance") or 0.0,
+            'day_1_actual_rewards': day_1_actual,
+            'day_1_theoretical_rewards': day_1_theoretical,
+            'day_1_percentage': day_1_percentage,
+            'latest_epoch': latest_epoch,
+            'start_epoch': start_epoch,
+            'days_analyzed': days,
+            'threshold_percentage': threshold
+        })
+
+    results.sort(key=lambda row: (row['reward_percentage'], row['operator'] or '', row['validator_id']))
+    return results
+
 @router.get("/below_threshold/extended")
 async def get_below_threshold_extended(
+    request: Request,
+    response: Response,
     days: int = Query(1, description="Number of days to analyze (1-31)", ge=1, le=31),
     threshold: float = Query(97.0, description="Reward percentage threshold (90-99%)", ge=90.0, le=99.0),
     limit: int = Query(100, description="Maximum number of validators to return", ge=1, le=99999)
@@ -766,6 +783,10 @@ async def get_below_threshold_extended(
             raise HTTPException(status_code=404, detail="No epoch data found")
 
         latest_epoch = int(epoch_bounds["latest_epoch"])
+        not_modified = _not_modified(request, response, "below_threshold_extended", latest_epoch, (days, threshold, limit))
+        if not_modified:
+            return not_modified
+        
         total_epochs = days * 225  # 225 epochs per day
         start_epoch = latest_epoch - total_epochs + 1
 
@@ -782,160 +803,21 @@ async def get_below_threshold_extended(
             days = max(1, int(epochs_available / 225))  # Ensure days is an integer, minimum 1
             logger.info(f"Using {epochs_available} epochs ({days_actual} days actual) instead of requested due to insufficient data")
 
-        # Preferred fast path: use pre-aggregated daily rollup table when available.
-        if await _has_daily_rollup_table():
-            try:
-                rollup_results = await _query_below_threshold_extended_from_rollup(
-                    start_epoch=start_epoch,
-                    latest_epoch=latest_epoch,
-                    total_epochs=total_epochs,
-                    days=days,
-                    threshold=threshold,
-                    limit=limit
-                )
-                logger.info(
-                    "Served below_threshold_extended from daily rollup table (%s results)",
-                    len(rollup_results)
-                )
-                return rollup_results
-            except Exception as rollup_error:
-                logger.warning(f"Daily rollup query failed, falling back to raw query: {rollup_error}")
-        
-        # Phase 1: lightweight scan to identify candidate validators below threshold.
-        candidate_query = f"""
-        WITH validator_rewards AS (
-            SELECT
-                val_id,
-                COUNT() as active_duty_epochs,
-                SUM(COALESCE(att_earned_reward, 0)) as actual_rewards,
-                SUM(COALESCE(att_earned_reward, 0) + COALESCE(att_missed_reward, 0)) as theoretical_max_rewards,
-                if(theoretical_max_rewards > 0, (actual_rewards * 100.0 / theoretical_max_rewards), 0.0) as reward_percentage
-            FROM validators_summary
-            PREWHERE epoch BETWEEN {start_epoch} AND {latest_epoch}
-                AND val_status IN ('active_ongoing', 'active_slashed')
-                AND val_nos_id IS NOT NULL
-            GROUP BY val_id
-            HAVING active_duty_epochs = {total_epochs}
-        )
-        SELECT
-            val_id as validator_id,
-            active_duty_epochs,
-            actual_rewards,
-            theoretical_max_rewards,
-            reward_percentage
-        FROM validator_rewards
-        WHERE reward_percentage < {threshold}
-        ORDER BY reward_percentage ASC, validator_id
-        LIMIT {limit}
-        """
-
-        candidate_rows = await clickhouse_service.execute_query(
-            candidate_query,
-            client_timeout=80,
-            max_execution_time=75,
-            settings={"max_threads": 6}
-        )
-
-        if not candidate_rows:
-            return []
-
-        candidate_results: List[Dict[str, Any]] = []
-        validator_ids: List[int] = []
-        for row in candidate_rows:
-            if len(row) >= 5:
-                validator_id = int(row[0])
-                validator_ids.append(validator_id)
-                candidate_results.append({
-                    'operator': None,
-                    'validator_id': validator_id,
-                    'total_epochs': total_epochs,
-                    'active_duty_epochs': int(row[1]),
-                    'actual_rewards': int(row[2]),
-                    'theoretical_max_rewards': int(row[3]),
-                    'reward_percentage': float(row[4]),
-                })
+        if limit > _STREAM_MIN_LIMIT and await _daily_rollup_covers(start_epoch):
+            streamed = await _stream_below_threshold_extended_from_rollup(
+                response, start_epoch, latest_epoch, total_epochs, days, threshold, limit
+            )
+            if streamed is not None:
+                return streamed
 
-        # Phase 2: compute detailed metrics only for selected validators.
-        validators_clause = ",".join(str(validator_id) for validator_id in validator_ids)
-        details_query = f"""
-        SELECT
-            val_id as validator_id,
-            any(val_nos_name) as operator,
-            SUM(att_happened = 1) as attestations_made,
-            SUM((is_proposer = 1) AND (block_proposed = 1)) as blocks_proposed,
-            SUM(is_proposer = 1) as proposer_slots,
-            AVG(sync_percent) as avg_sync_performance,
-            SUM(if(epoch > {latest_epoch} - 225, COALESCE(att_earned_reward, 0), 0)) as day_1_actual,
-            SUM(if(epoch > {latest_epoch} - 225, COALESCE(att_earned_reward, 0) + COALESCE(att_missed_reward, 0), 0)) as day_1_theoretical
-        FROM validators_summary
-        PREWHERE epoch BETWEEN {start_epoch} AND {latest_epoch}
-            AND val_id IN ({validators_clause})
-            AND val_status IN ('active_ongoing', 'active_slashed')
-            AND val_nos_id IS NOT NULL
-            AND val_nos_name IS NOT NULL
-        GROUP BY val_id
-        """
-
-        detail_rows = await clickhouse_service.execute_query(
-            details_query,
-            client_timeout=40,
-            max_execution_time=35,
-            settings={"max_threads": 4}
+        results = await _epoch_results.get_or_compute(
+            ("below_threshold_extended", days, total_epochs, threshold, limit),
+            latest_epoch,
+            lambda: _query_below_threshold_extended(start_epoch, latest_epoch, total_epochs, days, threshold, limit)
         )
-
-        detail_map: Dict[int, Dict[str, Any]] = {}
-        for row in detail_rows:
-            if len(row) >= 8:
-                detail_map[int(row[0])] = {
-                    "operator": row[1],
-                    "attestations_made": int(row[2]),
-                    "blocks_proposed": int(row[3]),
-                    "proposer_slots": int(row[4]),
-                    "avg_sync_performance": float(row[5]) if row[5] not in ['\\N', None, ''] else 0.0,
-                    "day_1_actual": int(row[6]),
-                    "day_1_theoretical": int(row[7]),
-                }
-
-        # Merge candidate metrics with details while keeping response shape stable.
-        results = []
-        for candidate in candidate_results:
-            validator_id = candidate["validator_id"]
-            details = detail_map.get(validator_id, {})
-            attestations_made = details.get("attestations_made", 0)
-            attestations_missed = max(candidate["active_duty_epochs"] - attestations_made, 0)
-            blocks_proposed = details.get("blocks_proposed", 0)
-            proposer_slots = details.get("proposer_slots", 0)
-            blocks_missed = max(proposer_slots - blocks_proposed, 0)
-            day_1_actual = details.get("day_1_actual", 0)
-            day_1_theoretical = details.get("day_1_theoretical", 0)
-            day_1_percentage = (day_1_actual * 100.0 / day_1_theoretical) if day_1_theoretical > 0 else 0.0
-
-            results.append({
-                'operator': details.get("operator", candidate['operator']),
-                'validator_id': validator_id,
-                'total_epochs': candidate['total_epochs'],
-                'active_duty_epochs': candidate['active_duty_epochs'],
-                'actual_rewards': candidate['actual_rewards'],
-                'theoretical_max_rewards': candidate['theoretical_max_rewards'],
-                'reward_percentage': candidate['reward_percentage'],
-                'attestations_made': attestations_made,
-                'attestations_missed': attestations_missed,
-                'blocks_proposed': blocks_proposed,
-                'blocks_missed': blocks_missed,
-                'avg_sync_performance': details.get("avg_sync_performance", 0.0),
-                'day_1_actual_rewards': day_1_actual,
-                'day_1_theoretical_rewards': day_1_theoretical,
-                'day_1_percentage': day_1_percentage,
-                'latest_epoch': latest_epoch,
-                'start_epoch': start_epoch,
-                'days_analyzed': days,
-                'threshold_percentage': threshold
-            })
-
-        results.sort(key=lambda row: (row['reward_percentage'], row['operator'] or '', row['validator_id']))
         
         logger.info(f"Found {len(results)} validators below {threshold}% reward threshold for {days} day(s) period")
-        return results
+        return _epoch_json_response(results, response)
         
     except HTTPException:
         raise
@@ -1079,8 +961,168 @@ async def get_validator_details(
             detail=f"Database query failed: {str(e)}"
         )
 
+def _operator_efficiency(row: List[Any], window: Dict[str, Any]) -> Dict[str, Any]:
+    """Build an operator efficiency entry from a typed OPERATOR_EFFICIENCY_QUERY row plus the analysis window fields"""
+    (operator, validator_count, attester_actual, attester_ideal, proposer_actual, proposer_ideal,
+     sync_actual, sync_ideal, successful_attestations, missed_attestations, successful_proposals,
+     missed_proposals, total_proposer_duties, total_sync_duties, avg_sync_participation, total_epochs_data) = row
+
+    # Calculate individual efficiencies
+    attester_efficiency = (attester_actual * 100.0 / attester_ideal) if attester_ideal > 0 else 0.0
+    proposer_efficiency = min(100.0, (proposer_actual * 100.0 / proposer_ideal)) if proposer_ideal > 0 else 0.0
+    sync_efficiency = (sync_actual * 100.0 / sync_ideal) if sync_ideal > 0 else 0.0
+
+    # Calculate capped proposer actual for overall efficiency (cap at baseline)
+    proposer_actual_capped = min(proposer_actual, proposer_ideal) if proposer_ideal > 0 else proposer_actual
+    total_actual_capped = attester_actual + proposer_actual_capped + sync_actual
+    total_ideal = attester_ideal + proposer_ideal + sync_ideal
+
+    result = {
+        'operator': operator,
+        'validator_count': validator_count,
+        # Reward components
+        'attester_actual_reward': attester_actual,
+        'proposer_actual_reward': proposer_actual,
+        'sync_actual_reward': sync_actual,
+        'attester_ideal_reward': attester_ideal,
+        'proposer_ideal_reward': proposer_ideal,
+        'sync_ideal_reward': sync_ideal,
+        'total_actual_reward': total_actual_capped,
+        'total_ideal_reward': total_ideal,
+        # Efficiency metrics
+        'overall_efficiency': (total_actual_capped * 100.0 / total_ideal) if total_ideal > 0 else 0.0,
+        'attester_efficiency': attester_efficiency,
+        'proposer_efficiency': proposer_efficiency,
+        'sync_efficiency': sync_efficiency,
+        # Performance metrics
+        'successful_attestations': successful_attestations,
+        'missed_attestations': missed_attestations,
+        'successful_proposals': successful_proposals,
+        'missed_proposals': missed_proposals,
+        'total_proposer_duties': total_proposer_duties,
+        'total_sync_duties': total_sync_duties,
+        'avg_sync_participation': avg_sync_participation,
+        'total_epochs_data': total_epochs_data
+    }
+    result.update(window)
+    return result
+
+async def _theoretical_performance_impl(
+    request: Request,
+    response: Response,
+    endpoint: str,
+    days: int,
+    limit: int,
+    *,
+    extended: bool,
+    compute: Callable[[Dict[str, Any], int], Awaitable[List[Dict[str, Any]]]]
+) -> Union[List[Dict[str, Any]], Dict[str, Any], Response]:
+    """
+    Shared path of the theoretical_performance endpoints: epoch bounds, ETag check,
+    `days`-day window and the per-epoch result cache around `compute(window, limit)`.
+
+    The fixed 1-day endpoints (extended=False) shrink the window to the available data;
+    the extended endpoints return an insufficient-data payload instead.
+    """
+    if not await clickhouse_service.is_available():
+        raise HTTPException(status_code=503, detail="ClickHouse service unavailable")
+    
+    # Get cached epoch bounds using a fast partition-based lookup.
+    epoch_bounds = await _get_nodeset_epoch_bounds()
+    
+    if not epoch_bounds:
+        raise HTTPException(status_code=404, detail="No epoch data found")
+    
+    latest_epoch = int(epoch_bounds["latest_epoch"])
+    not_modified = _not_modified(request, response, endpoint, latest_epoch, (days, limit))
+    if not_modified:
+        return not_modified
+    
+    total_epochs = days * 225  # 225 epochs per day
+    start_epoch = latest_epoch - total_epochs + 1
+    
+    # Check if we have sufficient data availability
+    min_available_epoch = int(epoch_bounds["min_epoch"])
+    
+    # Check if we have enough historical data
+    if start_epoch < min_available_epoch:
+        epochs_available = latest_epoch - min_available_epoch + 1
+        if extended:
+            return {
+                "error": "Insufficient data available",
+                "message": f"Not enough historical data to perform {total_epochs} epoch analysis ({days} days)",
+                "epochs_requested": total_epochs,
+                "epochs_available": epochs_available,
+                "days_requested": days,
+                "days_available": round(epochs_available / 225, 2),
+                "latest_epoch": latest_epoch,
+                "min_available_epoch": min_available_epoch,
+                "requested_start_epoch": start_epoch,
+                "data_completeness_percentage": round((epochs_available / total_epochs) * 100, 2)
+            }
+        # Use available data instead of returning error
+        logger.info(f"Using {epochs_available} epochs instead of {total_epochs} due to insufficient data")
+        start_epoch = min_available_epoch
+        total_epochs = epochs_available
+    
+    window = {"latest_epoch": latest_epoch, "start_epoch": start_epoch}
+    if extended:
+        window["days_analyzed"] = days
+    window["epochs_analyzed"] = total_epochs
+    
+    return await _epoch_results.get_or_compute(
+        (endpoint, start_epoch, days, limit),
+        latest_epoch,
+        lambda: compute(window, limit)
+    )
+
+async def _query_theoretical_performance(window: Dict[str, Any], limit: int) -> List[Dict[str, Any]]:
+    """Run THEORETICAL_PERFORMANCE_QUERY for one epoch window and shape the operator rows"""
+    start_epoch, latest_epoch = window["start_epoch"], window["latest_epoch"]
+    # Single bulk query for all operators with fixed calculation
+    raw_data = await clickhouse_service.execute_query(
+        THEORETICAL_PERFORMANCE_QUERY,
+        params={"start_epoch": start_epoch, "latest_epoch": latest_epoch, "lim": limit},
+        settings=_AGGREGATION_SETTINGS,
+        typed=True
+    )
+    
+    # Rows arrive natively typed in the THEORETICAL_PERFORMANCE_QUERY projection order
+    return [
+        {
+            'operator': row[0],
+            'validator_count': row[1],
+            'total_actual_rewards': row[6],
+            'total_theoretical_max_rewards': row[8],
+            'operator_reward_percentage': row[13],
+            'avg_validator_reward_percentage': row[13],
+            'total_attestations_made': row[3],
+            'total_attestations_missed': row[4],
+            'total_blocks_proposed': 0,  # Not calculated in this query
+            'total_blocks_missed': 0,    # Not calculated in this query
+            'avg_sync_performance': 0.0, # Not calculated in this query
+            'latest_epoch': latest_epoch,
+            'start_epoch': start_epoch,
+            'epochs_analyzed': row[10],
+            # Additional fields for debugging/monitoring
+            'active_duty_periods': row[2],
+            'successful_attestations': row[3],
+            'missed_attestations': row[4],
+            'pending_periods': row[5],
+            'total_penalties': row[7],
+            'net_rewards': row[12],
+            'max_possible_rewards': row[8],
+            'attestation_success_rate': row[14],
+            'data_coverage_percentage': row[15],
+            'missing_data_points': row[11] - row[9]
+        }
+        for row in raw_data
+    ]
+
 @router.get("/theoretical_performance")
 async def get_theoretical_performance(
+    request: Request,
+    response: Response,
     limit: int = Query(100, description="Maximum number of operators to return")
 ) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
     """
@@ -1096,174 +1138,70 @@ async def get_theoretical_performance(
         List of operators with their theoretical attestation performance metrics
     """
     try:
-        if not await clickhouse_service.is_available():
-            raise HTTPException(status_code=503, detail="ClickHouse service unavailable")
-        
-        # Get the latest epoch first
-        epoch_query = "SELECT MAX(epoch) FROM validators_summary WHERE val_nos_name IS NOT NULL"
-        epoch_data = await clickhouse_service.execute_query(epoch_query)
-        
-        if not epoch_data or not epoch_data[0][0]:
-            raise HTTPException(status_code=404, detail="No epoch data found")
-        
-        latest_epoch = int(epoch_data[0][0])
-        start_epoch = latest_epoch - 224  # 225 epochs total (1 day)
-        
-        # Check if we have sufficient data availability
-        min_epoch_query = "SELECT MIN(epoch) FROM validators_summary WHERE val_nos_name IS NOT NULL"
-        min_epoch_data = await clickhouse_service.execute_query(min_epoch_query)
-        
-        if not min_epoch_data or not min_epoch_data[0][0]:
-            raise HTTPException(status_code=404, detail="No minimum epoch data found")
-        
-        min_available_epoch = int(min_epoch_data[0][0])
-        epochs_requested = 225
-        
-        # Check if we have enough historical data, if not use available data
-        if start_epoch < min_available_epoch:
-            epochs_available = latest_epoch - min_available_epoch + 1
-            # Use available data instead of returning error
-            start_epoch = min_available_epoch
-            epochs_requested = epochs_available
-            logger.info(f"Using {epochs_available} epochs instead of 225 due to insufficient data")
-        
-        # Single bulk query for all operators with fixed calculation
-        query = f"""
-        WITH validator_data AS (
-            SELECT 
-                val_id,
-                val_nos_name,
-                epoch,
-                val_status,
-                att_happened,
-                att_earned_reward,
-                att_missed_reward,
-                att_penalty,
-                -- Flag active duty periods
-                CASE WHEN val_status = 'active_ongoing' THEN 1 ELSE 0 END as is_active_duty,
-                -- Flag pending periods
-                CASE WHEN val_status IN ('pending_initialized', 'pending_queued') THEN 1 ELSE 0 END as is_pending,
-                -- Flag successful attestations
-                CASE WHEN val_status = 'active_ongoing' AND att_happened = 1 THEN 1 ELSE 0 END as successful_attestation,
-                -- Flag missed attestations (active but no attestation)
-                CASE WHEN val_status = 'active_ongoing' AND (att_happened = 0 OR att_happened IS NULL) THEN 1 ELSE 0 END as missed_attestation
-            FROM validators_summary
-            WHERE epoch >= {start_epoch}
-            AND epoch <= {latest_epoch}
-            AND val_nos_name IS NOT NULL
-            AND val_status NOT IN ('exited_unslashed', 'active_exiting', 'withdrawal_possible', 'withdrawal_done')
-        ),
-        operator_performance AS (
-            SELECT 
-                val_nos_name as operator,
-                COUNT(DISTINCT val_id) as validator_count,
-                -- Count duty periods and attestations
-                SUM(is_active_duty) as active_duty_periods,
-                SUM(successful_attestation) as successful_attestations,
-                SUM(missed_attestation) as missed_attestations,
-                SUM(is_pending) as pending_periods,
-                -- Sum rewards and penalties for active periods only
-                SUM(CASE WHEN is_active_duty = 1 THEN COALESCE(att_earned_reward, 0) ELSE 0 END) as total_actual_rewards,
-                SUM(CASE WHEN is_active_duty = 1 THEN COALESCE(att_penalty, 0) ELSE 0 END) as total_penalties,
-                -- Calculate theoretical maximum using actual reward structure
-                SUM(CASE WHEN is_active_duty = 1 THEN COALESCE(att_earned_reward, 0) + COALESCE(att_missed_reward, 0) ELSE 0 END) as total_theoretical_max_rewards,
-                -- Calculate validator coverage
-                COUNT(*) as total_data_points,
-                ({latest_epoch} - {start_epoch} + 1) as epochs_in_period
-            FROM validator_data
-            GROUP BY val_nos_name
+        results = await _theoretical_performance_impl(
+            request, response, "theoretical_performance", 1, limit,
+            extended=False, compute=_query_theoretical_performance
         )
-        SELECT 
-            operator,
-            validator_count,
-            active_duty_periods,
-            successful_attestations,
-            missed_attestations,
-            pending_periods,
-            total_actual_rewards,
-            total_penalties,
-            total_theoretical_max_rewards,
-            total_data_points,
-            epochs_in_period,
-            -- Calculate expected total epochs for all validators
-            (validator_count * epochs_in_period) as expected_total_epochs,
-            -- Net rewards after penalties
-            (total_actual_rewards - total_penalties) as net_rewards,
-            -- Theoretical performance using actual reward structure
-            CASE 
-                WHEN total_theoretical_max_rewards > 0 
-                THEN ((total_actual_rewards - total_penalties) * 100.0 / total_theoretical_max_rewards)
-                ELSE 0.0
-            END as theoretical_performance,
-            -- Attestation success rate
-            CASE 
-                WHEN active_duty_periods > 0 
-                THEN (successful_attestations * 100.0 / active_duty_periods)
-                ELSE 0.0
-            END as attestation_success_rate,
-            -- Data coverage
-            CASE 
-                WHEN (validator_count * epochs_in_period) > 0 
-                THEN (total_data_points * 100.0 / (validator_count * epochs_in_period))
-                ELSE 0.0
-            END as data_coverage_percentage
-        FROM operator_performance
-        ORDER BY theoretical_performance DESC
-        LIMIT {limit}
-        """
-        
-        raw_data = await clickhouse_service.execute_query(query)
-        
-        # Transform to structured format
-        results = []
-        for row in raw_data:
-            if len(row) >= 16:
-                try:
-                    expected_total_epochs = int(float(row[11])) if row[11] is not None else 0
-                    total_data_points = int(float(row[9])) if row[9] is not None else 0
-                    missing_data_points = expected_total_epochs - total_data_points
-                    
-                    results.append({
-                        'operator': str(row[0]),
-                        'validator_count': int(float(row[1])) if row[1] is not None else 0,
-                        'total_actual_rewards': int(float(row[6])) if row[6] is not None else 0,
-                        'total_theoretical_max_rewards': int(float(row[8])) if row[8] is not None else 0,
-                        'operator_reward_percentage': float(row[13]) if row[13] is not None else 0.0,
-                        'avg_validator_reward_percentage': float(row[13]) if row[13] is not None else 0.0,
-                        'total_attestations_made': int(float(row[3])) if row[3] is not None else 0,
-                        'total_attestations_missed': int(float(row[4])) if row[4] is not None else 0,
-                        'total_blocks_proposed': 0,  # Not calculated in this query
-                        'total_blocks_missed': 0,    # Not calculated in this query
-                        'avg_sync_performance': 0.0, # Not calculated in this query
-                        'latest_epoch': latest_epoch,
-                        'start_epoch': start_epoch,
-                        'epochs_analyzed': int(float(row[10])) if row[10] is not None else 0,
-                        # Additional fields for debugging/monitoring
-                        'active_duty_periods': int(float(row[2])) if row[2] is not None else 0,
-                        'successful_attestations': int(float(row[3])) if row[3] is not None else 0,
-                        'missed_attestations': int(float(row[4])) if row[4] is not None else 0,
-                        'pending_periods': int(float(row[5])) if row[5] is not None else 0,
-                        'total_penalties': int(float(row[7])) if row[7] is not None else 0,
-                        'net_rewards': int(float(row[12])) if row[12] is not None else 0,
-                        'max_possible_rewards': int(float(row[8])) if row[8] is not None else 0,
-                        'attestation_success_rate': float(row[14]) if row[14] is not None else 0.0,
-                        'data_coverage_percentage': float(row[15]) if row[15] is not None else 0.0,
-                        'missing_data_points': missing_data_points
-                    })
-                except (ValueError, TypeError) as e:
-                    logger.warning(f"Failed to parse row for operator {row[0]}: {e}")
-                    continue
+        if not isinstance(results, list):
+            return results
         
         logger.info(f"Found theoretical performance data for {len(results)} operators over 1 day period")
-        return results
+        return _epoch_json_response(results, response)
         
     except Exception as e:
         logger.error(f"Failed to get theoretical performance: {e}")
         raise HTTPException(status_code=500, detail=f"Database query failed: {str(e)}")
 
 
+def _performance_rollup_split(start_epoch: int, latest_epoch: int) -> Optional[Dict[str, int]]:
+    """Whole day partitions of the window before its most recent 225 epochs, or None when there are none"""
+    first_partition = -(-start_epoch // 225)
+    last_partition = max(start_epoch, latest_epoch - 224) // 225 - 1
+    if first_partition > last_partition:
+        return None
+    return {
+        "first_partition": first_partition,
+        "last_partition": last_partition,
+        "head_end_epoch": first_partition * 225 - 1,
+        "tail_start_epoch": (last_partition + 1) * 225
+    }
+
+async def _query_theoretical_performance_extended(window: Dict[str, Any], limit: int) -> List[Dict[str, Any]]:
+    """Operator theoretical performance for one epoch window; rows come back as typed dicts in the response shape"""
+    start_epoch, latest_epoch = window["start_epoch"], window["latest_epoch"]
+    params = {
+        "start_epoch": start_epoch,
+        "latest_epoch": latest_epoch,
+        "days": window["days_analyzed"],
+        "total_epochs": window["epochs_analyzed"],
+        "lim": limit
+    }
+
+    rollup_split = _performance_rollup_split(start_epoch, latest_epoch)
+    if rollup_split and await _performance_rollup_covers(rollup_split["first_partition"] * 225):
+        try:
+            return await clickhouse_service.execute_query(
+                THEORETICAL_PERFORMANCE_EXTENDED_ROLLUP_QUERY,
+                params={**params, **rollup_split},
+                settings=_AGGREGATION_SETTINGS,
+                named=True
+            )
+        except Exception as rollup_error:
+            logger.warning(f"Daily performance rollup query failed, falling back to raw query: {rollup_error}")
+
+    # A 1-day window is the recent day itself, so the variant without the recent-day sums applies
+    query = THEORETICAL_PERFORMANCE_EXTENDED_DAY_QUERY if window["days_analyzed"] == 1 else THEORETICAL_PERFORMANCE_EXTENDED_QUERY
+    return await clickhouse_service.execute_query(
+        query,
+        params=params,
+        settings=_AGGREGATION_SETTINGS,
+        named=True
+    )
+
 @router.get("/theoretical_performance/extended")
 async def get_theoretical_performance_extended(
+    request: Request,
+    response: Response,
     days: int = Query(1, description="Number of days to analyze (1-31)", ge=1, le=31),
     limit: int = Query(100, description="Maximum number of operators to return")
 ) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
@@ -1283,169 +1221,50 @@ async def get_theoretical_performance_extended(
         List of operators with their averaged theoretical attestation performance metrics
     """
     try:
-        if not await clickhouse_service.is_available():
-            raise HTTPException(status_code=503, detail="ClickHouse service unavailable")
-        
-        # Get the latest epoch first
-        epoch_query = "SELECT MAX(epoch) FROM validators_summary WHERE val_nos_name IS NOT NULL"
-        epoch_data = await clickhouse_service.execute_query(epoch_query)
-        
-        if not epoch_data or not epoch_data[0][0]:
-            raise HTTPException(status_code=404, detail="No epoch data found")
-        
-        latest_epoch = int(epoch_data[0][0])
-        total_epochs = days * 225  # 225 epochs per day
-        start_epoch = latest_epoch - total_epochs + 1
-        
-        # Check if we have sufficient data availability
-        min_epoch_query = "SELECT MIN(epoch) FROM validators_summary WHERE val_nos_name IS NOT NULL"
-        min_epoch_data = await clickhouse_service.execute_query(min_epoch_query)
-        
-        if not min_epoch_data or not min_epoch_data[0][0]:
-            raise HTTPException(status_code=404, detail="No minimum epoch data found")
-        
-        min_available_epoch = int(min_epoch_data[0][0])
-        
-        # Check if we have enough historical data
-        if start_epoch < min_available_epoch:
-            epochs_available = latest_epoch - min_available_epoch + 1
-            return {
-                "error": "Insufficient data available",
-                "message": f"Not enough historical data to perform {total_epochs} epoch analysis ({days} days)",
-                "epochs_requested": total_epochs,
-                "epochs_available": epochs_available,
-                "days_requested": days,
-                "days_available": round(epochs_available / 225, 2),
-                "latest_epoch": latest_epoch,
-                "min_available_epoch": min_available_epoch,
-                "requested_start_epoch": start_epoch,
-                "data_completeness_percentage": round((epochs_available / total_epochs) * 100, 2)
-            }
-        
-        # Query to get operator-level theoretical performance
-        query = f"""
-        WITH validator_rewards AS (
-            SELECT 
-                val_id,
-                val_nos_name,
-                COUNT(*) as total_epochs,
-                -- Actual attestation rewards earned per validator
-                SUM(COALESCE(att_earned_reward, 0)) as actual_rewards,
-                -- Theoretical maximum attestation rewards per validator
-                SUM(COALESCE(att_earned_reward, 0) + COALESCE(att_missed_reward, 0)) as theoretical_max_rewards,
-                -- Performance metrics per validator
-                SUM(CASE WHEN att_happened = 1 THEN 1 ELSE 0 END) as attestations_made,
-                SUM(CASE WHEN att_happened = 0 OR att_happened IS NULL THEN 1 ELSE 0 END) as attestations_missed,
-                SUM(CASE WHEN is_proposer = 1 AND block_proposed = 1 THEN 1 ELSE 0 END) as blocks_proposed,
-                SUM(CASE WHEN is_proposer = 1 AND (block_proposed = 0 OR block_proposed IS NULL) THEN 1 ELSE 0 END) as blocks_missed,
-                AVG(CASE WHEN sync_percent IS NOT NULL THEN sync_percent ELSE NULL END) as avg_sync_performance,
-                -- Recent day performance (most recent 225 epochs)
-                SUM(CASE WHEN epoch > {latest_epoch} - 225 THEN COALESCE(att_earned_reward, 0) ELSE 0 END) as recent_day_actual,
-                SUM(CASE WHEN epoch > {latest_epoch} - 225 THEN COALESCE(att_earned_reward, 0) + COALESCE(att_missed_reward, 0) ELSE 0 END) as recent_day_theoretical,
-                -- Calculate per-validator reward percentage
-                CASE 
-                    WHEN SUM(COALESCE(att_earned_reward, 0) + COALESCE(att_missed_reward, 0)) > 0 
-                    THEN (SUM(COALESCE(att_earned_reward, 0)) * 100.0 / SUM(COALESCE(att_earned_reward, 0) + COALESCE(att_missed_reward, 0)))
-                    ELSE 0.0
-                END as validator_reward_percentage
-            FROM validators_summary 
-            WHERE epoch >= {start_epoch} 
-            AND epoch <= {latest_epoch}
-            AND val_nos_name IS NOT NULL
-            AND val_status NOT IN ('exited_unslashed', 'active_exiting', 'withdrawal_possible', 'withdrawal_done')
-            GROUP BY val_id, val_nos_name
-            HAVING COUNT(*) >= 1  -- Must have at least some data
-        ),
-        operator_performance AS (
-            SELECT 
-                val_nos_name as operator,
-                COUNT(*) as validator_count,
-                -- Aggregate totals across all validators for this operator
-                SUM(total_epochs) as total_epochs_all_validators,
-                SUM(actual_rewards) as total_actual_rewards,
-                SUM(theoretical_max_rewards) as total_theoretical_max_rewards,
-                SUM(attestations_made) as total_attestations_made,
-                SUM(attestations_missed) as total_attestations_missed,
-                SUM(blocks_proposed) as total_blocks_proposed,
-                SUM(blocks_missed) as total_blocks_missed,
-                AVG(avg_sync_performance) as avg_sync_performance_all_validators,
-                -- Recent day totals
-                SUM(recent_day_actual) as total_recent_day_actual,
-                SUM(recent_day_theoretical) as total_recent_day_theoretical,
-                -- Average reward percentage across all validators for this operator
-                AVG(validator_reward_percentage) as avg_reward_percentage,
-                -- Calculate operator-level reward percentage using totals
-                CASE 
-                    WHEN SUM(theoretical_max_rewards) > 0 THEN (SUM(actual_rewards) * 100.0 / SUM(theoretical_max_rewards))
-                    ELSE 0.0
-                END as operator_reward_percentage,
-                -- Calculate recent day operator percentage
-                CASE 
-                    WHEN SUM(recent_day_theoretical) > 0 THEN (SUM(recent_day_actual) * 100.0 / SUM(recent_day_theoretical))
-                    ELSE 0.0
-                END as recent_day_percentage
-            FROM validator_rewards
-            GROUP BY val_nos_name
+        results = await _theoretical_performance_impl(
+            request, response, "theoretical_performance_extended", days, limit,
+            extended=True, compute=_query_theoretical_performance_extended
         )
-        SELECT 
-            operator,
-            validator_count,
-            total_actual_rewards,
-            total_theoretical_max_rewards,
-            operator_reward_percentage,
-            avg_reward_percentage,
-            total_attestations_made,
-            total_attestations_missed,
-            total_blocks_proposed,
-            total_blocks_missed,
-            avg_sync_performance_all_validators,
-            total_recent_day_actual,
-            total_recent_day_theoretical,
-            recent_day_percentage,
-            {latest_epoch} as latest_epoch,
-            {start_epoch} as start_epoch,
-            {days} as days_analyzed,
-            {total_epochs} as total_epochs_analyzed
-        FROM operator_performance
-        ORDER BY operator_reward_percentage DESC
-        LIMIT {limit}
-        """
-        
-        raw_data = await clickhouse_service.execute_query(query)
-        
-        # Transform to structured format
-        results = []
-        for row in raw_data:
-            if len(row) >= 18:
-                results.append({
-                    'operator': row[0],
-                    'validator_count': int(row[1]),
-                    'total_actual_rewards': int(row[2]),
-                    'total_theoretical_max_rewards': int(row[3]),
-                    'operator_reward_percentage': float(row[4]),
-                    'avg_validator_reward_percentage': float(row[5]),
-                    'total_attestations_made': int(row[6]),
-                    'total_attestations_missed': int(row[7]),
-                    'total_blocks_proposed': int(row[8]),
-                    'total_blocks_missed': int(row[9]),
-                    'avg_sync_performance': float(row[10]) if row[10] not in ['\\N', None, ''] else 0.0,
-                    'recent_day_actual_rewards': int(row[11]),
-                    'recent_day_theoretical_rewards': int(row[12]),
-                    'recent_day_percentage': float(row[13]),
-                    'latest_epoch': int(row[14]),
-                    'start_epoch': int(row[15]),
-                    'days_analyzed': int(row[16]),
-                    'total_epochs_analyzed': int(row[17])
-                })
+        if not isinstance(results, list):
+            return results
         
         logger.info(f"Found theoretical performance data for {len(results)} operators over {days} day(s) period")
-        return results
+        return _epoch_json_response(results, response)
         
     except Exception as e:
         logger.error(f"Failed to get theoretical performance extended: {e}")
         raise HTTPException(status_code=500, detail=f"Database query failed: {str(e)}")
+
+
+async def _query_operator_efficiency(window: Dict[str, Any], limit: int) -> List[Dict[str, Any]]:
+    """Operator efficiency over `window`, from the per-epoch operator stats when available; one dict per operator"""
+    params = {"start_epoch": window["start_epoch"], "latest_epoch": window["latest_epoch"], "lim": limit}
+
+    raw_data = None
+    if await _operator_stats_cover(window["start_epoch"]):
+        try:
+            raw_data = await clickhouse_service.execute_query(
+                OPERATOR_EFFICIENCY_ROLLUP_QUERY,
+                params=params,
+                settings=_AGGREGATION_SETTINGS,
+                typed=True
+            )
+        except Exception as rollup_error:
+            logger.warning(f"Operator stats rollup query failed, falling back to raw query: {rollup_error}")
+
+    if raw_data is None:
+        raw_data = await clickhouse_service.execute_query(
+            OPERATOR_EFFICIENCY_QUERY,
+            params=params,
+            settings=_AGGREGATION_SETTINGS,
+            typed=True
+        )
+    return [_operator_efficiency(row, window) for row in raw_data]
+
 @router.get("/theoretical_performance_all")
 async def get_theoretical_performance_all(
+    request: Request,
+    response: Response,
     limit: int = Query(100, description="Maximum number of operators to return")
 ) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
     """
@@ -1470,157 +1289,15 @@ async def get_theoretical_performance_all(
         List of operators with their comprehensive efficiency metrics over 1 day period (225 epochs)
     """
     try:
-        if not await clickhouse_service.is_available():
-            raise HTTPException(status_code=503, detail="ClickHouse service unavailable")
-        
-        # Get the latest epoch first
-        epoch_query = "SELECT MAX(epoch) FROM validators_summary WHERE val_nos_name IS NOT NULL"
-        epoch_data = await clickhouse_service.execute_query(epoch_query)
-        
-        if not epoch_data or not epoch_data[0][0]:
-            raise HTTPException(status_code=404, detail="No epoch data found")
-        
-        latest_epoch = int(epoch_data[0][0])
-        start_epoch = latest_epoch - 224  # 225 epochs total (1 day)
-        
-        # Check if we have sufficient data availability
-        min_epoch_query = "SELECT MIN(epoch) FROM validators_summary WHERE val_nos_name IS NOT NULL"
-        min_epoch_data = await clickhouse_service.execute_query(min_epoch_query)
-        
-        if not min_epoch_data or not min_epoch_data[0][0]:
-            raise HTTPException(status_code=404, detail="No minimum epoch data found")
-        
-        min_available_epoch = int(min_epoch_data[0][0])
-        epochs_requested = 225
-        
-        # Check if we have enough historical data, if not use available data
-        if start_epoch < min_available_epoch:
-            epochs_available = latest_epoch - min_available_epoch + 1
-            start_epoch = min_available_epoch
-            epochs_requested = epochs_available
-            logger.info(f"Using {epochs_available} epochs instead of 225 due to insufficient data")
-        
-        # Query for comprehensive efficiency analysis with epoch-specific median comparison
-        query = f"""
-        WITH epoch_medians AS (
-            -- Calculate median proposal reward for each epoch (from other 31 proposals)
-            SELECT 
-                epoch,
-                median(propose_earned_reward) as epoch_median_reward
-            FROM validators_summary
-            WHERE epoch >= {start_epoch} AND epoch <= {latest_epoch}
-            AND is_proposer = 1 AND block_proposed = 1
-            AND propose_earned_reward > 0
-            GROUP BY epoch
+        results = await _theoretical_performance_impl(
+            request, response, "theoretical_performance_all", 1, limit,
+            extended=False, compute=_query_operator_efficiency
         )
-        SELECT 
-            val_nos_name as operator,
-            COUNT(DISTINCT val_id) as validator_count,
-            -- Attestation rewards (unchanged)
-            SUM(COALESCE(att_earned_reward, 0)) as total_attester_actual_reward,
-            SUM(COALESCE(att_earned_reward, 0) + COALESCE(att_missed_reward, 0)) as total_attester_ideal_reward,
-            -- Proposer rewards (corrected with epoch-specific median comparison)
-            SUM(CASE WHEN is_proposer = 1 THEN COALESCE(propose_earned_reward, 0) ELSE 0 END) as total_proposer_actual_reward,
-            SUM(CASE WHEN is_proposer = 1 THEN COALESCE(em.epoch_median_reward, 47000000) ELSE 0 END) as total_proposer_ideal_reward,
-            -- Sync committee rewards (unchanged)
-            SUM(CASE WHEN is_sync = 1 THEN COALESCE(sync_earned_reward, 0) ELSE 0 END) as total_sync_actual_reward,
-            SUM(CASE WHEN is_sync = 1 THEN COALESCE(sync_earned_reward, 0) + COALESCE(sync_missed_reward, 0) ELSE 0 END) as total_sync_ideal_reward,
-            -- Performance metrics
-            SUM(CASE WHEN att_happened = 1 THEN 1 ELSE 0 END) as successful_attestations,
-            SUM(CASE WHEN att_happened = 0 OR att_happened IS NULL THEN 1 ELSE 0 END) as missed_attestations,
-            SUM(CASE WHEN is_proposer = 1 AND block_proposed = 1 THEN 1 ELSE 0 END) as successful_proposals,
-            SUM(CASE WHEN is_proposer = 1 AND (block_proposed = 0 OR block_proposed IS NULL) THEN 1 ELSE 0 END) as missed_proposals,
-            SUM(CASE WHEN is_proposer = 1 THEN 1 ELSE 0 END) as total_proposer_duties,
-            SUM(CASE WHEN is_sync = 1 THEN 1 ELSE 0 END) as total_sync_duties,
-            AVG(CASE WHEN is_sync = 1 AND sync_percent IS NOT NULL THEN sync_percent ELSE NULL END) as avg_sync_participation,
-            COUNT(*) as total_epochs_data
-        FROM validators_summary vs
-        LEFT JOIN epoch_medians em ON vs.epoch = em.epoch
-        WHERE vs.epoch >= {start_epoch}
-        AND vs.epoch <= {latest_epoch}
-        AND vs.val_nos_name IS NOT NULL
-        AND vs.val_status NOT IN ('exited_unslashed', 'active_exiting', 'withdrawal_possible', 'withdrawal_done')
-        GROUP BY vs.val_nos_name
-        ORDER BY (
-            CASE 
-                WHEN (SUM(COALESCE(att_earned_reward, 0) + COALESCE(att_missed_reward, 0)) + 
-                      SUM(CASE WHEN is_proposer = 1 THEN COALESCE(em.epoch_median_reward, 47000000) ELSE 0 END) + 
-                      SUM(CASE WHEN is_sync = 1 THEN COALESCE(sync_earned_reward, 0) + COALESCE(sync_missed_reward, 0) ELSE 0 END)) > 0 
-                THEN ((SUM(COALESCE(att_earned_reward, 0)) + 
-                       SUM(CASE WHEN is_proposer = 1 THEN COALESCE(propose_earned_reward, 0) ELSE 0 END) + 
-                       SUM(CASE WHEN is_sync = 1 THEN COALESCE(sync_earned_reward, 0) ELSE 0 END)) * 100.0 / 
-                      (SUM(COALESCE(att_earned_reward, 0) + COALESCE(att_missed_reward, 0)) + 
-                       SUM(CASE WHEN is_proposer = 1 THEN COALESCE(em.epoch_median_reward, 47000000) ELSE 0 END) + 
-                       SUM(CASE WHEN is_sync = 1 THEN COALESCE(sync_earned_reward, 0) + COALESCE(sync_missed_reward, 0) ELSE 0 END)))
-                ELSE 0.0
-            END
-        ) DESC
-        LIMIT {limit}
-        """
+        if not isinstance(results, list):
+            return results
         
-        raw_data = await clickhouse_service.execute_query(query)
-        
-        # Transform to structured format
-        results = []
-        for row in raw_data:
-            if len(row) >= 16:
-                try:
-                    # Calculate efficiencies from raw data
-                    attester_actual = int(float(row[2])) if row[2] is not None else 0
-                    attester_ideal = int(float(row[3])) if row[3] is not None else 0
-                    proposer_actual = int(float(row[4])) if row[4] is not None else 0
-                    proposer_ideal = int(float(row[5])) if row[5] is not None else 0
-                    sync_actual = int(float(row[6])) if row[6] is not None else 0
-                    sync_ideal = int(float(row[7])) if row[7] is not None else 0
-                    
-                    # Calculate individual efficiencies
-                    attester_efficiency = (attester_actual * 100.0 / attester_ideal) if attester_ideal > 0 else 0.0
-                    proposer_efficiency = min(100.0, (proposer_actual * 100.0 / proposer_ideal)) if proposer_ideal > 0 else 0.0
-                    sync_efficiency = (sync_actual * 100.0 / sync_ideal) if sync_ideal > 0 else 0.0
-                    
-                    # Calculate capped proposer actual for overall efficiency (cap at baseline)
-                    proposer_actual_capped = min(proposer_actual, proposer_ideal) if proposer_ideal > 0 else proposer_actual
-                    total_actual_capped = attester_actual + proposer_actual_capped + sync_actual
-                    total_ideal = attester_ideal + proposer_ideal + sync_ideal
-                    
-                    overall_efficiency = (total_actual_capped * 100.0 / total_ideal) if total_ideal > 0 else 0.0
-                    
-                    results.append({
-                        'operator': str(row[0]),
-                        'validator_count': int(float(row[1])) if row[1] is not None else 0,
-                        # Reward components
-                        'attester_actual_reward': attester_actual,
-                        'proposer_actual_reward': proposer_actual,
-                        'sync_actual_reward': sync_actual,
-                        'attester_ideal_reward': attester_ideal,
-                        'proposer_ideal_reward': proposer_ideal,
-                        'sync_ideal_reward': sync_ideal,
-                        'total_actual_reward': total_actual_capped,
-                        'total_ideal_reward': total_ideal,
-                        # Efficiency metrics
-                        'overall_efficiency': overall_efficiency,
-                        'attester_efficiency': attester_efficiency,
-                        'proposer_efficiency': proposer_efficiency,
-                        'sync_efficiency': sync_efficiency,
-                        # Performance metrics
-                        'successful_attestations': int(float(row[8])) if row[8] is not None else 0,
-                        'missed_attestations': int(float(row[9])) if row[9] is not None else 0,
-                        'successful_proposals': int(float(row[10])) if row[10] is not None else 0,
-                        'missed_proposals': int(float(row[11])) if row[11] is not None else 0,
-                        'total_proposer_duties': int(float(row[12])) if row[12] is not None else 0,
-                        'total_sync_duties': int(float(row[13])) if row[13] is not None else 0,
-                        'avg_sync_participation': float(row[14]) if row[14] not in ['\\N', None, ''] else 0.0,
-                        'total_epochs_data': int(float(row[15])) if row[15] is not None else 0,
-                        'latest_epoch': latest_epoch,
-                        'start_epoch': start_epoch,
-                        'epochs_analyzed': epochs_requested
-                    })
-                except (ValueError, TypeError) as e:
-                    logger.warning(f"Failed to parse row for operator {row[0]}: {e}")
-                    continue
-        
-        logger.info(f"Found comprehensive efficiency data for {len(results)} operators over {epochs_requested} epochs")
-        return results
+        logger.info(f"Found comprehensive efficiency data for {len(results)} operators over 1 day period")
+        return _epoch_json_response(results, response)
         
     except Exception as e:
         logger.error(f"Failed to get comprehensive theoretical performance: {e}")
@@ -1640,22 +1317,8 @@ async def get_validator_status_values() -> Dict[str, Any]:
         if not await clickhouse_service.is_available():
             raise HTTPException(status_code=503, detail="ClickHouse service unavailable")
         
-        # Query to get all distinct validator status values with counts
-        query = """
-        SELECT 
-            val_status,
-            COUNT(*) as status_count,
-            COUNT(DISTINCT val_id) as unique_validators,
-            COUNT(DISTINCT epoch) as epochs_seen,
-            MIN(epoch) as first_seen_epoch,
-            MAX(epoch) as last_seen_epoch
-        FROM validators_summary 
-        WHERE val_nos_name IS NOT NULL
-        GROUP BY val_status
-        ORDER BY status_count DESC
-        """
-        
-        raw_data = await clickhouse_service.execute_query(query)
+        # Get all distinct validator status values with counts
+        raw_data = await clickhouse_service.execute_query(VALIDATOR_STATUS_VALUES_QUERY)
         
         # Transform to structured format
         status_values = []
@@ -1718,59 +1381,20 @@ async def verify_validators_down_filter(
         if not await clickhouse_service.is_available():
             raise HTTPException(status_code=503, detail="ClickHouse service unavailable")
         
-        # Get the latest epoch first
-        epoch_query = "SELECT MAX(epoch) FROM validators_summary WHERE val_nos_name IS NOT NULL"
-        epoch_data = await clickhouse_service.execute_query(epoch_query)
+        # Get cached epoch bounds using a fast partition-based lookup.
+        epoch_bounds = await _get_nodeset_epoch_bounds()
         
-        if not epoch_data or not epoch_data[0][0]:
+        if not epoch_bounds:
             raise HTTPException(status_code=404, detail="No epoch data found")
         
-        latest_epoch = int(epoch_data[0][0])
+        latest_epoch = int(epoch_bounds["latest_epoch"])
         start_epoch = latest_epoch - 2  # 3 epochs total: latest, latest-1, latest-2
         
         # Get validators that would be returned by validators_down
-        query = f"""
-        WITH validator_epochs AS (
-            SELECT 
-                val_id,
-                val_nos_name,
-                epoch,
-                val_status,
-                CASE WHEN att_happened = 0 OR att_happened IS NULL THEN 1 ELSE 0 END as missed_attestation
-            FROM validators_summary 
-            WHERE epoch >= {start_epoch} 
-            AND epoch <= {latest_epoch}
-            AND val_nos_name IS NOT NULL
-        ),
-        active_validators AS (
-            SELECT DISTINCT val_id
-            FROM validator_epochs
-            WHERE epoch = {latest_epoch}
-            AND val_status NOT IN ('exited_unslashed', 'active_exiting', 'withdrawal_possible', 'withdrawal_done')
-        ),
-        consecutive_misses AS (
-            SELECT 
-                ve.val_id,
-                ve.val_nos_name,
-                COUNT(*) as total_epochs,
-                SUM(ve.missed_attestation) as missed_epochs
-            FROM validator_epochs ve
-            INNER JOIN active_validators av ON ve.val_id = av.val_id
-            GROUP BY ve.val_id, ve.val_nos_name
-            HAVING COUNT(*) = 3 AND SUM(ve.missed_attestation) = 3
+        raw_data = await clickhouse_service.execute_query(
+            VALIDATORS_DOWN_STATUS_QUERY,
+            params={"start_epoch": start_epoch, "latest_epoch": latest_epoch, "n": 3, "lim": limit}
         )
-        SELECT 
-            cm.val_id,
-            cm.val_nos_name,
-            ve.val_status as current_status,
-            {latest_epoch} as latest_epoch
-        FROM consecutive_misses cm
-        INNER JOIN validator_epochs ve ON cm.val_id = ve.val_id AND ve.epoch = {latest_epoch}
-        ORDER BY cm.val_nos_name, cm.val_id
-        LIMIT {limit}
-        """
-        
-        raw_data = await clickhouse_service.execute_query(query)
         
         # Analyze the results
         validator_statuses = {}
@@ -1818,6 +1442,8 @@ async def verify_validators_down_filter(
 
 @router.get("/theoretical_performance_all/extended")
 async def get_theoretical_performance_all_extended(
+    request: Request,
+    response: Response,
     days: int = Query(1, description="Number of days to analyze (1-31)", ge=1, le=31),
     limit: int = Query(100, description="Maximum number of operators to return")
 ) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
@@ -1844,167 +1470,15 @@ async def get_theoretical_performance_all_extended(
         List of operators with their comprehensive efficiency metrics over specified time period
     """
     try:
-        if not await clickhouse_service.is_available():
-            raise HTTPException(status_code=503, detail="ClickHouse service unavailable")
-        
-        # Get the latest epoch first
-        epoch_query = "SELECT MAX(epoch) FROM validators_summary WHERE val_nos_name IS NOT NULL"
-        epoch_data = await clickhouse_service.execute_query(epoch_query)
-        
-        if not epoch_data or not epoch_data[0][0]:
-            raise HTTPException(status_code=404, detail="No epoch data found")
-        
-        latest_epoch = int(epoch_data[0][0])
-        total_epochs = days * 225  # 225 epochs per day
-        start_epoch = latest_epoch - total_epochs + 1
-        
-        # Check if we have sufficient data availability
-        min_epoch_query = "SELECT MIN(epoch) FROM validators_summary WHERE val_nos_name IS NOT NULL"
-        min_epoch_data = await clickhouse_service.execute_query(min_epoch_query)
-        
-        if not min_epoch_data or not min_epoch_data[0][0]:
-            raise HTTPException(status_code=404, detail="No minimum epoch data found")
-        
-        min_available_epoch = int(min_epoch_data[0][0])
-        
-        # Check if we have enough historical data
-        if start_epoch < min_available_epoch:
-            epochs_available = latest_epoch - min_available_epoch + 1
-            return {
-                "error": "Insufficient data available",
-                "message": f"Not enough historical data to perform {total_epochs} epoch analysis ({days} days)",
-                "epochs_requested": total_epochs,
-                "epochs_available": epochs_available,
-                "days_requested": days,
-                "days_available": round(epochs_available / 225, 2),
-                "latest_epoch": latest_epoch,
-                "min_available_epoch": min_available_epoch,
-                "requested_start_epoch": start_epoch,
-                "data_completeness_percentage": round((epochs_available / total_epochs) * 100, 2)
-            }
-        
-        # Query with epoch-specific median comparison (same as regular _all endpoint but with configurable days)
-        query = f"""
-        WITH epoch_medians AS (
-            -- Calculate median proposal reward for each epoch (from other 31 proposals)
-            SELECT 
-                epoch,
-                median(propose_earned_reward) as epoch_median_reward
-            FROM validators_summary
-            WHERE epoch >= {start_epoch} AND epoch <= {latest_epoch}
-            AND is_proposer = 1 AND block_proposed = 1
-            AND propose_earned_reward > 0
-            GROUP BY epoch
+        results = await _theoretical_performance_impl(
+            request, response, "theoretical_performance_all_extended", days, limit,
+            extended=True, compute=_query_operator_efficiency
         )
-        SELECT 
-            val_nos_name as operator,
-            COUNT(DISTINCT val_id) as validator_count,
-            -- Attestation rewards (unchanged)
-            SUM(COALESCE(att_earned_reward, 0)) as total_attester_actual_reward,
-            SUM(COALESCE(att_earned_reward, 0) + COALESCE(att_missed_reward, 0)) as total_attester_ideal_reward,
-            -- Proposer rewards (corrected with epoch-specific median comparison)
-            SUM(CASE WHEN is_proposer = 1 THEN COALESCE(propose_earned_reward, 0) ELSE 0 END) as total_proposer_actual_reward,
-            SUM(CASE WHEN is_proposer = 1 THEN COALESCE(em.epoch_median_reward, 47000000) ELSE 0 END) as total_proposer_ideal_reward,
-            -- Sync committee rewards (only when is_sync = 1)
-            SUM(CASE WHEN is_sync = 1 THEN COALESCE(sync_earned_reward, 0) ELSE 0 END) as total_sync_actual_reward,
-            SUM(CASE WHEN is_sync = 1 THEN COALESCE(sync_earned_reward, 0) + COALESCE(sync_missed_reward, 0) ELSE 0 END) as total_sync_ideal_reward,
-            -- Performance metrics
-            SUM(CASE WHEN att_happened = 1 THEN 1 ELSE 0 END) as successful_attestations,
-            SUM(CASE WHEN att_happened = 0 OR att_happened IS NULL THEN 1 ELSE 0 END) as missed_attestations,
-            SUM(CASE WHEN is_proposer = 1 AND block_proposed = 1 THEN 1 ELSE 0 END) as successful_proposals,
-            SUM(CASE WHEN is_proposer = 1 AND (block_proposed = 0 OR block_proposed IS NULL) THEN 1 ELSE 0 END) as missed_proposals,
-            SUM(CASE WHEN is_proposer = 1 THEN 1 ELSE 0 END) as total_proposer_duties,
-            SUM(CASE WHEN is_sync = 1 THEN 1 ELSE 0 END) as total_sync_duties,
-            AVG(CASE WHEN is_sync = 1 AND sync_percent IS NOT NULL THEN sync_percent ELSE NULL END) as avg_sync_participation,
-            COUNT(*) as total_epochs_data
-        FROM validators_summary vs
-        LEFT JOIN epoch_medians em ON vs.epoch = em.epoch
-        WHERE vs.epoch >= {start_epoch}
-        AND vs.epoch <= {latest_epoch}
-        AND vs.val_nos_name IS NOT NULL
-        AND vs.val_status NOT IN ('exited_unslashed', 'active_exiting', 'withdrawal_possible', 'withdrawal_done')
-        GROUP BY vs.val_nos_name
-        ORDER BY (
-            CASE 
-                WHEN (SUM(COALESCE(att_earned_reward, 0) + COALESCE(att_missed_reward, 0)) + 
-                      SUM(CASE WHEN is_proposer = 1 THEN COALESCE(em.epoch_median_reward, 47000000) ELSE 0 END) + 
-                      SUM(CASE WHEN is_sync = 1 THEN COALESCE(sync_earned_reward, 0) + COALESCE(sync_missed_reward, 0) ELSE 0 END)) > 0 
-                THEN ((SUM(COALESCE(att_earned_reward, 0)) + 
-                       SUM(CASE WHEN is_proposer = 1 THEN COALESCE(propose_earned_reward, 0) ELSE 0 END) + 
-                       SUM(CASE WHEN is_sync = 1 THEN COALESCE(sync_earned_reward, 0) ELSE 0 END)) * 100.0 / 
-                      (SUM(COALESCE(att_earned_reward, 0) + COALESCE(att_missed_reward, 0)) + 
-                       SUM(CASE WHEN is_proposer = 1 THEN COALESCE(em.epoch_median_reward, 47000000) ELSE 0 END) + 
-                       SUM(CASE WHEN is_sync = 1 THEN COALESCE(sync_earned_reward, 0) + COALESCE(sync_missed_reward, 0) ELSE 0 END)))
-                ELSE 0.0
-            END
-        ) DESC
-        LIMIT {limit}
-        """
-        
-        raw_data = await clickhouse_service.execute_query(query)
-        
-        # Transform to structured format
-        results = []
-        for row in raw_data:
-            if len(row) >= 16:
-                try:
-                    # Calculate efficiencies from raw data (same as regular _all endpoint)
-                    attester_actual = int(float(row[2])) if row[2] is not None else 0
-                    attester_ideal = int(float(row[3])) if row[3] is not None else 0
-                    proposer_actual = int(float(row[4])) if row[4] is not None else 0
-                    proposer_ideal = int(float(row[5])) if row[5] is not None else 0
-                    sync_actual = int(float(row[6])) if row[6] is not None else 0
-                    sync_ideal = int(float(row[7])) if row[7] is not None else 0
-                    
-                    # Calculate individual efficiencies
-                    attester_efficiency = (attester_actual * 100.0 / attester_ideal) if attester_ideal > 0 else 0.0
-                    proposer_efficiency = min(100.0, (proposer_actual * 100.0 / proposer_ideal)) if proposer_ideal > 0 else 0.0
-                    sync_efficiency = (sync_actual * 100.0 / sync_ideal) if sync_ideal > 0 else 0.0
-                    
-                    # Calculate capped proposer actual for overall efficiency (cap at baseline)
-                    proposer_actual_capped = min(proposer_actual, proposer_ideal) if proposer_ideal > 0 else proposer_actual
-                    total_actual_capped = attester_actual + proposer_actual_capped + sync_actual
-                    total_ideal = attester_ideal + proposer_ideal + sync_ideal
-                    
-                    overall_efficiency = (total_actual_capped * 100.0 / total_ideal) if total_ideal > 0 else 0.0
-                    
-                    results.append({
-                        'operator': str(row[0]),
-                        'validator_count': int(float(row[1])) if row[1] is not None else 0,
-                        # Reward components
-                        'attester_actual_reward': attester_actual,
-                        'proposer_actual_reward': proposer_actual,
-                        'sync_actual_reward': sync_actual,
-                        'attester_ideal_reward': attester_ideal,
-                        'proposer_ideal_reward': proposer_ideal,
-                        'sync_ideal_reward': sync_ideal,
-                        'total_actual_reward': total_actual_capped,
-                        'total_ideal_reward': total_ideal,
-                        # Efficiency metrics
-                        'overall_efficiency': overall_efficiency,
-                        'attester_efficiency': attester_efficiency,
-                        'proposer_efficiency': proposer_efficiency,
-                        'sync_efficiency': sync_efficiency,
-                        # Performance metrics
-                        'successful_attestations': int(float(row[8])) if row[8] is not None else 0,
-                        'missed_attestations': int(float(row[9])) if row[9] is not None else 0,
-                        'successful_proposals': int(float(row[10])) if row[10] is not None else 0,
-                        'missed_proposals': int(float(row[11])) if row[11] is not None else 0,
-                        'total_proposer_duties': int(float(row[12])) if row[12] is not None else 0,
-                        'total_sync_duties': int(float(row[13])) if row[13] is not None else 0,
-                        'avg_sync_participation': float(row[14]) if row[14] not in ['\\N', None, ''] else 0.0,
-                        'total_epochs_data': int(float(row[15])) if row[15] is not None else 0,
-                        'latest_epoch': latest_epoch,
-                        'start_epoch': start_epoch,
-                        'days_analyzed': days,
-                        'epochs_analyzed': total_epochs
-                    })
-                except (ValueError, TypeError) as e:
-                    logger.warning(f"Failed to parse row for operator {row[0]}: {e}")
-                    continue
+        if not isinstance(results, list):
+            return results
         
         logger.info(f"Found comprehensive efficiency data for {len(results)} operators over {days} day(s) period")
-        return results
+        return _epoch_json_response(results, response)
         
     except Exception as e:
         logger.error(f"Failed to get comprehensive theoretical performance extended: {e}")
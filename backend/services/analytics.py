@@ -7,14 +7,11 @@ import numpy as np
 import pandas as pd
 from typing import Dict, Any, List, Optional, Tuple
 from collections import Counter
-import sys
-import os
-
-# Add parent directory to path for imports
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from data_loader_api import (
+    get_operator_validator_counts,
     load_validator_data,
+    load_validator_arrays,
     load_proposals_data,
     load_mev_analysis_data,
     load_sync_committee_data,
@@ -24,6 +21,11 @@ from data_loader_api import (
 )
 from utils import format_operator_display_plain, get_performance_category
 
+# Gas limit strategy buckets, ascending: an operator's max gas limit falls into
+# the bucket whose lower threshold it meets
+GAS_STRATEGY_THRESHOLDS = [36000000, 45000000, 60000000]
+GAS_STRATEGY_NAMES = ["low", "normal", "high", "ultra"]
+
 class AnalyticsService:
     """Service class for all analytics operations"""
     
@@ -32,23 +34,7 @@ class AnalyticsService:
     
     def _get_operator_validators_from_data(self, validator_data: Dict) -> Dict[str, int]:
         """Extract operator validator counts from validator data"""
-        if not validator_data:
-            return {}
-        
-        # Check if data has operator_validators directly
-        if "operator_validators" in validator_data:
-            return validator_data["operator_validators"]
-        
-        # Fallback to parsing validators array
-        operator_counts = {}
-        validators = validator_data.get("validators", [])
-        
-        for validator in validators:
-            operator = validator.get("operator", "")
-            if operator:
-                operator_counts[operator] = operator_counts.get(operator, 0) + 1
-        
-        return operator_counts
+        return get_operator_validator_counts(validator_data)
     
     def _get_operator_performance_from_data(self, validator_data: Dict, performance_data: Dict) -> Dict[str, float]:
         """Extract operator performance data"""
@@ -313,15 +299,16 @@ class AnalyticsService:
     def calculate_concentration_metrics(self) -> Dict[str, Any]:
         """Calculate concentration metrics including Gini coefficient using active validators (excluding exits)"""
         try:
-            validator_data, _ = load_validator_data()
+            validator_arrays = load_validator_arrays()
             exit_data, _ = load_exit_data()
             
-            if not validator_data:
+            if not validator_arrays:
                 return {"error": "Validator data not available"}
             
-            operator_validators = self._get_operator_validators_from_data(validator_data)
+            operator_ids = validator_arrays['operator_ids']
+            operator_counts = validator_arrays['operator_counts']
             
-            if not operator_validators:
+            if operator_ids.size == 0:
                 return {"error": "No operator data found"}
             
             # Create a map of exits by operator
@@ -330,52 +317,46 @@ class AnalyticsService:
                 for op in exit_data['operators_with_exits']:
                     operator_exits[op['operator']] = op.get('exits', 0)
             
-            # Calculate active validators for each operator (total - exits)
-            active_operator_validators = {}
-            for operator, total in operator_validators.items():
-                exits = operator_exits.get(operator, 0)
-                active = max(0, total - exits)  # Ensure non-negative
-                if active > 0:  # Only include operators with active validators
-                    active_operator_validators[operator] = active
+            # Calculate active validators for each operator (total - exits), keeping only operators with active validators
+            exits = np.fromiter((operator_exits.get(op, 0) for op in operator_ids), dtype=np.int64, count=operator_ids.size)
+            active_counts = operator_counts - exits
+            active_counts = active_counts[active_counts > 0]
             
-            if not active_operator_validators:
+            if active_counts.size == 0:
                 return {"error": "No active operator data found"}
 
-            # Use active validators for calculations
-            total_active_validators = sum(active_operator_validators.values())
-            active_operator_counts = list(active_operator_validators.values())
-            active_operator_counts.sort()
+            # Use active validators for calculations (sorted ascending once)
+            counts = np.sort(active_counts)
 
-            n = len(active_operator_counts)
+            n = counts.size
+            total_active_validators = int(counts.sum())
             if n == 0 or total_active_validators == 0:
                 return {"error": "Invalid data for concentration calculation"}
 
             # Calculate Gini coefficient using active validators
             index = np.arange(1, n + 1)
-            gini = (2 * np.sum(index * active_operator_counts)) / (n * total_active_validators) - (n + 1) / n
-            gini = max(0, min(1, gini))
+            gini = (2 * np.dot(index, counts)) / (n * total_active_validators) - (n + 1) / n
+            gini = max(0, min(1, float(gini)))
+
+            # Calculate top operator concentrations from the descending cumulative share
+            cumulative_desc = np.cumsum(counts[::-1]) * 100.0 / total_active_validators
+
+            def top_share(k: int) -> float:
+                return float(cumulative_desc[min(k, n) - 1])
 
-            # Calculate top operator concentrations using active validators
-            active_operator_counts_desc = sorted(active_operator_counts, reverse=True)
-            
-            top_1_pct = (active_operator_counts_desc[0] / total_active_validators) * 100 if active_operator_counts_desc else 0
-            top_5_pct = (sum(active_operator_counts_desc[:min(5, len(active_operator_counts_desc))]) / total_active_validators) * 100
-            top_10_pct = (sum(active_operator_counts_desc[:min(10, len(active_operator_counts_desc))]) / total_active_validators) * 100
-            top_20_pct = (sum(active_operator_counts_desc[:min(20, len(active_operator_counts_desc))]) / total_active_validators) * 100
-            
             # Calculate Herfindahl index using active validators
-            market_shares = [count / total_active_validators for count in active_operator_counts]
-            herfindahl_index = sum(share ** 2 for share in market_shares)
+            market_shares = counts / total_active_validators
+            herfindahl_index = float(np.dot(market_shares, market_shares))
 
             return {
                 'gini_coefficient': round(gini, 4),
-                'top_1_percent': round(top_1_pct, 2),
-                'top_5_percent': round(top_5_pct, 2),
-                'top_10_percent': round(top_10_pct, 2),
-                'top_20_percent': round(top_20_pct, 2),
+                'top_1_percent': round(top_share(1), 2),
+                'top_5_percent': round(top_share(5), 2),
+                'top_10_percent': round(top_share(10), 2),
+                'top_20_percent': round(top_share(20), 2),
                 'herfindahl_index': round(herfindahl_index, 4),
                 'total_validators': total_active_validators,
-                'total_operators': len(active_operator_validators)
+                'total_operators': int(active_counts.size)
             }
             
         except Exception as e:
@@ -503,42 +484,36 @@ class AnalyticsService:
             if not operator_analysis:
                 return {"error": "No operator analysis found in MEV data"}
             
-            strategy_counts = {"ultra": 0, "high": 0, "normal": 0, "low": 0}
-            all_gas_limits = []
+            operators_with_limits = [
+                (operator_addr, data, data['gas_limits'])
+                for operator_addr, data in operator_analysis.items() if data.get('gas_limits')
+            ]
+            all_gas_limits = np.fromiter(
+                (gas for _, _, gas_limits in operators_with_limits for gas in gas_limits), dtype=np.float64
+            )
+            
+            # Categorize each operator's gas limit approach by its max gas limit
+            max_gas_limits = [max(gas_limits) for _, _, gas_limits in operators_with_limits]
+            strategy_ids = np.digitize(max_gas_limits, GAS_STRATEGY_THRESHOLDS) if max_gas_limits else np.array([], dtype=np.int64)
+            strategy_totals = np.bincount(strategy_ids, minlength=len(GAS_STRATEGY_NAMES))
+            strategy_counts = {name: int(strategy_totals[i]) for i, name in reversed(list(enumerate(GAS_STRATEGY_NAMES)))}
             
             gas_data = []
-            for operator_addr, data in operator_analysis.items():
-                gas_limits = data.get('gas_limits', [])
-                if gas_limits:
-                    all_gas_limits.extend(gas_limits)
-                    
-                    # Categorize gas limit approach
-                    max_gas = max(gas_limits)
-                    if max_gas >= 60000000:
-                        strategy = "ultra"
-                    elif max_gas >= 45000000:
-                        strategy = "high"
-                    elif max_gas >= 36000000:
-                        strategy = "normal"
-                    else:
-                        strategy = "low"
-                    
-                    strategy_counts[strategy] += 1
-                    
-                    # Get ENS name if available from merged ENS sources
-                    ens_name = all_ens_names.get(operator_addr, '')
-                    
-                    gas_data.append({
-                        'operator': operator_addr,  # Raw address
-                        'operator_name': ens_name if ens_name and ens_name != operator_addr else None,  # ENS name only
-                        'max_gas_limit': max_gas,
-                        'avg_gas_limit': data.get('average_gas_limit', 0),
-                        'strategy': strategy
-                    })
+            for (operator_addr, data, _), max_gas, strategy_id in zip(operators_with_limits, max_gas_limits, strategy_ids):
+                # Get ENS name if available from merged ENS sources
+                ens_name = all_ens_names.get(operator_addr, '')
+                
+                gas_data.append({
+                    'operator': operator_addr,  # Raw address
+                    'operator_name': ens_name if ens_name and ens_name != operator_addr else None,  # ENS name only
+                    'max_gas_limit': max_gas,
+                    'avg_gas_limit': data.get('average_gas_limit', 0),
+                    'strategy': GAS_STRATEGY_NAMES[strategy_id]
+                })
             
             # Calculate overall statistics
             overall_stats = {}
-            if all_gas_limits:
+            if all_gas_limits.size:
                 overall_stats = {
                     'average_gas_limit': int(np.mean(all_gas_limits)),
                     'median_gas_limit': int(np.median(all_gas_limits)),
@@ -583,34 +558,24 @@ class AnalyticsService:
             operators_with_proposals = analysis_result.get('operators_with_proposals', 0)
             
             # Convert counts to percentages
-            if operators_with_proposals > 0:
-                execution_clients = {}
-                consensus_clients = {}
-                setup_types = {}
-                
-                for client, count in execution_counts.items():
-                    execution_clients[client.lower()] = round((count / operators_with_proposals) * 100, 1)
-                
-                for client, count in consensus_counts.items():
-                    consensus_clients[client.lower()] = round((count / operators_with_proposals) * 100, 1)
-                
-                for setup, count in setup_counts.items():
-                    setup_types[setup.lower()] = round((count / operators_with_proposals) * 100, 1)
-            else:
-                execution_clients = {}
-                consensus_clients = {}
-                setup_types = {}
-            
+            def to_percentages(counts: Dict[str, int]) -> Dict[str, float]:
+                if operators_with_proposals <= 0 or not counts:
+                    return {}
+                values = np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+                percentages = np.round(values * 100 / operators_with_proposals, 1)
+                return {name.lower(): float(pct) for name, pct in zip(counts.keys(), percentages)}
+
+            execution_clients = to_percentages(execution_counts)
+            consensus_clients = to_percentages(consensus_counts)
+            setup_types = to_percentages(setup_counts)
+
             # Calculate diversity score using Shannon entropy
             def calculate_entropy(percentages):
                 if not percentages:
                     return 0
-                entropy = 0
-                for p in percentages.values():
-                    if p > 0:
-                        p_normalized = p / 100
-                        entropy -= p_normalized * np.log(p_normalized)
-                return entropy
+                p = np.fromiter(percentages.values(), dtype=np.float64, count=len(percentages)) / 100
+                p = p[p > 0]
+                return float(-np.sum(p * np.log(p)))
             
             consensus_entropy = calculate_entropy(consensus_clients)
             execution_entropy = calculate_entropy(execution_clients)
@@ -645,23 +610,31 @@ class AnalyticsService:
     def get_top_operators(self, limit: int = 20) -> Dict[str, Any]:
         """Get top operators by validator count"""
         try:
-            validator_data, _ = load_validator_data()
+            validator_arrays = load_validator_arrays()
             ens_names, _ = load_ens_names()
             
-            if not validator_data:
+            if not validator_arrays:
                 return {"error": "Validator data not available"}
             
-            operator_validators = self._get_operator_validators_from_data(validator_data)
-            exited_validators = validator_data.get('exited_validators', {})
-            total_validators = sum(operator_validators.values())
+            operator_ids = validator_arrays['operator_ids']
+            operator_counts = validator_arrays['operator_counts']
+            exited_counts = validator_arrays['exited_counts']
+            total_validators = int(operator_counts.sum())
             
-            # Sort operators by validator count
-            sorted_operators = sorted(operator_validators.items(), key=lambda x: x[1], reverse=True)
+            # Select the top operators by validator count in O(n), then order just that slice.
+            # Ties keep their original order, matching a stable descending sort.
+            top_idx = np.arange(operator_counts.size)
+            if 0 < limit < operator_counts.size:
+                kth = np.partition(operator_counts, -limit)[-limit]
+                top_idx = np.flatnonzero(operator_counts >= kth)
+            top_idx = top_idx[np.argsort(-operator_counts[top_idx], kind='stable')][:limit]
             
             top_operators = []
-            for i, (operator_addr, total_count) in enumerate(sorted_operators[:limit]):
+            for i, idx in enumerate(top_idx):
+                operator_addr = operator_ids[idx]
+                total_count = int(operator_counts[idx])
+                exited_count = int(exited_counts[idx])
                 display_name = format_operator_display_plain(operator_addr, ens_names or {})
-                exited_count = exited_validators.get(operator_addr, 0)
                 active_count = total_count - exited_count
                 percentage = (total_count / total_validators) * 100 if total_validators > 0 else 0
                 exit_rate = (exited_count / total_count) * 100 if total_count > 0 else 0
@@ -679,7 +652,7 @@ class AnalyticsService:
             
             return {
                 'operators': top_operators,
-                'total_operators': len(operator_validators),
+                'total_operators': int(operator_ids.size),
                 'total_validators': total_validators
             }
             
@@ -5,8 +5,9 @@ ClickHouse HTTP client service for Ethereum validator data
 import aiohttp
 import asyncio
 import logging
+import orjson
 import time
-from typing import List, Dict, Any, Optional
+from typing import AsyncIterator, List, Dict, Any, Optional
 from config import settings
 from data_loader_api import load_validator_data
 
@@ -22,6 +23,9 @@ class ClickHouseService:
         self.base_url = settings.clickhouse_url
         self.timeout = settings.CLICKHOUSE_TIMEOUT
         self.enabled = settings.CLICKHOUSE_ENABLED
+        # Caps in-flight queries so a burst of dashboard requests queues here instead of
+        # piling concurrent scans onto ClickHouse
+        self._query_slots = asyncio.Semaphore(settings.CLICKHOUSE_MAX_CONCURRENT_QUERIES)
         self._session = None
         self._connector = None
         self._availability_cache: Dict[str, Any] = {
@@ -162,8 +166,11 @@ class ClickHouseService:
         *,
         client_timeout: Optional[int] = None,
         max_execution_time: Optional[int] = None,
-        settings: Optional[Dict[str, Any]] = None
-    ) -> List[List[str]]:
+        settings: Optional[Dict[str, Any]] = None,
+        params: Optional[Dict[str, Any]] = None,
+        typed: bool = False,
+        named: bool = False
+    ) -> List[Any]:
         """Execute ClickHouse query via HTTP interface.
 
         Args:
@@ -171,6 +178,12 @@ class ClickHouseService:
             client_timeout: Optional per-request HTTP timeout in seconds.
             max_execution_time: Optional ClickHouse max execution time in seconds.
             settings: Optional ClickHouse query settings passed as URL params.
+            params: Optional values for `{name:Type}` placeholders in the query,
+                bound server-side as `param_<name>` URL params.
+            typed: Return rows with native Python types (JSONCompact output)
+                instead of TSV strings.
+            named: Return natively typed rows as dicts keyed by column alias
+                (JSON output); implies `typed`.
         """
         if not self.enabled:
             logger.warning("ClickHouse is disabled")
@@ -187,9 +200,15 @@ class ClickHouseService:
                 for key, value in settings.items():
                     if value is not None:
                         query_params[key] = str(value)
+            if params:
+                for key, value in params.items():
+                    query_params[f"param_{key}"] = str(value)
+            if typed or named:
+                query_params['default_format'] = 'JSON' if named else 'JSONCompact'
+                query_params['output_format_json_quote_64bit_integers'] = '0'
 
             request_timeout = aiohttp.ClientTimeout(total=client_timeout) if client_timeout is not None else None
-            async with session.get(
+            async with self._query_slots, session.get(
                 f"{self.base_url}/",
                 params=query_params,
                 timeout=request_timeout
@@ -204,6 +223,9 @@ class ClickHouseService:
                         headers=response.headers
                     )
 
+                if typed or named:
+                    return self._parse_json_response(await response.read())
+
                 text = await response.text()
                 
                 # Parse TSV response (ClickHouse default)
@@ -219,6 +241,85 @@ class ClickHouseService:
             logger.error(f"Unexpected error in ClickHouse query: {e}")
             raise
 
+    async def stream_query(
+        self,
+        query: str,
+        *,
+        client_timeout: Optional[int] = None,
+        max_execution_time: Optional[int] = None,
+        settings: Optional[Dict[str, Any]] = None,
+        params: Optional[Dict[str, Any]] = None,
+        chunk_size: int = 65536
+    ) -> AsyncIterator[bytes]:
+        """Stream a query result as a JSON array of row objects, chunk by chunk.
+
+        The body is forwarded as ClickHouse writes it (JSONEachRow with
+        `output_format_json_array_of_rows`), so memory stays flat regardless of the
+        row count. HTTP/ClickHouse errors are raised on the first iteration, before
+        any bytes are yielded; the query slot is released once the first chunk has
+        arrived, so a slow client reading the body does not hold it.
+
+        Args:
+            query: SQL query string.
+            client_timeout: Optional per-request HTTP timeout in seconds.
+            max_execution_time: Optional ClickHouse max execution time in seconds.
+            settings: Optional ClickHouse query settings passed as URL params.
+            params: Optional values for `{name:Type}` placeholders in the query.
+            chunk_size: Maximum size of each yielded chunk in bytes.
+        """
+        if not self.enabled:
+            logger.warning("ClickHouse is disabled")
+            yield b"[]"
+            return
+
+        session = await self.get_session()
+        query_params = {
+            'query': query,
+            'default_format': 'JSONEachRow',
+            'output_format_json_array_of_rows': '1',
+            'output_format_json_quote_64bit_integers': '0'
+        }
+        if max_execution_time is not None:
+            query_params['max_execution_time'] = str(max_execution_time)
+        if settings:
+            for key, value in settings.items():
+                if value is not None:
+                    query_params[key] = str(value)
+        if params:
+            for key, value in params.items():
+                query_params[f"param_{key}"] = str(value)
+
+        request_timeout = aiohttp.ClientTimeout(total=client_timeout) if client_timeout is not None else None
+        await self._query_slots.acquire()
+        slot_held = True
+        try:
+            async with session.get(
+                f"{self.base_url}/",
+                params=query_params,
+                timeout=request_timeout
+            ) as response:
+                if response.status >= 400:
+                    error_text = await response.text()
+                    logger.error(f"ClickHouse streaming query failed: {error_text[:200]}")
+                    raise aiohttp.ClientResponseError(
+                        request_info=response.request_info,
+                        history=response.history,
+                        status=response.status,
+                        message=error_text[:1000],
+                        headers=response.headers
+                    )
+
+                async for chunk in response.content.iter_chunked(chunk_size):
+                    if slot_held:
+                        # ClickHouse has produced the first rows; the rest of the stream is
+                        # paced by the client, so it must not keep other queries waiting
+                        self._query_slots.release()
+                        slot_held = False
+                    yield chunk
+        finally:
+            if slot_held:
+                self._query_slots.release()
+
     def _get_current_mainnet_epoch(self) -> int:
         """Calculate the current mainnet epoch locally to avoid expensive MAX(epoch) lookups."""
         return max(0, int((time.time() - MAINNET_GENESIS_TIME) // (12 * 32)))
@@ -297,6 +398,13 @@ class ClickHouseService:
         
         return data
     
+    def _parse_json_response(self, body: bytes) -> List[Any]:
+        """Parse a JSON/JSONCompact response into rows (dicts or lists) of natively typed values"""
+        if not body.strip():
+            return []
+        payload = orjson.loads(body)
+        return payload.get("data", [])
+    
     async def get_epoch_range(self) -> Dict[str, int]:
         """Get the available epoch range in the database"""
         query = "SELECT MIN(epoch), MAX(epoch), COUNT(DISTINCT epoch) FROM validators_summary"
@@ -324,12 +432,16 @@ class ClickHouseService:
         where_conditions = ["val_nos_name IS NOT NULL", 
                           "val_status NOT IN ('exited_unslashed', 'active_exiting', 'withdrawal_possible', 'withdrawal_done')"]
         
+        query_params: Dict[str, Any] = {}
         if start_epoch is not None:
-            where_conditions.append(f"epoch >= {start_epoch}")
+            where_conditions.append("epoch >= {start_epoch:UInt64}")
+            query_params["start_epoch"] = start_epoch
         if end_epoch is not None:
-            where_conditions.append(f"epoch <= {end_epoch}")
+            where_conditions.append("epoch <= {end_epoch:UInt64}")
+            query_params["end_epoch"] = end_epoch
         if operator:
-            where_conditions.append(f"val_nos_name = '{operator}'")
+            where_conditions.append("val_nos_name = {operator:String}")
+            query_params["operator"] = operator
             
         where_clause = " AND ".join(where_conditions)
         
@@ -370,7 +482,7 @@ class ClickHouseService:
         """
         
         try:
-            raw_data = await self.execute_query(query)
+            raw_data = await self.execute_query(query, params=query_params)
             
             # Helper functions for safe conversion
             def safe_float(value):
@@ -411,7 +523,7 @@ class ClickHouseService:
     
     async def get_operator_performance(self, operator: Optional[str] = None) -> List[Dict[str, Any]]:
         """Get detailed operator performance metrics"""
-        where_clause = f"AND val_nos_name = '{operator}'" if operator else ""
+        where_clause = "AND val_nos_name = {operator:String}" if operator else ""
         
         query = f"""
         SELECT 
@@ -429,7 +541,7 @@ class ClickHouseService:
         """
         
         try:
-            raw_data = await self.execute_query(query)
+            raw_data = await self.execute_query(query, params={"operator": operator} if operator else None)
             
             # Helper functions for safe conversion
             def safe_int(value):
@@ -713,12 +825,15 @@ class ClickHouseService:
                                      end_epoch: Optional[int] = None) -> List[Dict[str, Any]]:
         """Get epoch-by-epoch performance for a specific operator"""
         
-        where_conditions = [f"val_nos_name = '{operator}'",
+        where_conditions = ["val_nos_name = {operator:String}",
                           "val_status NOT IN ('exited_unslashed', 'active_exiting', 'withdrawal_possible', 'withdrawal_done')"]
+        query_params: Dict[str, Any] = {"operator": operator}
         if start_epoch is not None:
-            where_conditions.append(f"epoch >= {start_epoch}")
+            where_conditions.append("epoch >= {start_epoch:UInt64}")
+            query_params["start_epoch"] = start_epoch
         if end_epoch is not None:
-            where_conditions.append(f"epoch <= {end_epoch}")
+            where_conditions.append("epoch <= {end_epoch:UInt64}")
+            query_params["end_epoch"] = end_epoch
             
         where_clause = " AND ".join(where_conditions)
         
@@ -746,7 +861,7 @@ class ClickHouseService:
         """
         
         try:
-            raw_data = await self.execute_query(query)
+            raw_data = await self.execute_query(query, params=query_params)
             
             def safe_float(value):
                 return float(value) if value not in ['\\N', None, ''] else 0.0
@@ -787,16 +902,23 @@ class ClickHouseService:
                                      operator: Optional[str] = None) -> List[Dict[str, Any]]:
         """Get validator accuracy metrics for NodeSet operators only"""
         
-        # Build WHERE clause with filters - always include NodeSet filter
+        # Build PREWHERE clause with filters - always include NodeSet filter. Every condition is
+        # on a filter column, so the aggregated columns are only read for matching rows, and an
+        # operator filter can use the idx_nos_name skip index when it exists
+        # (sql/validators_summary_skip_indexes.sql)
         where_conditions = ["val_nos_name IS NOT NULL",
                           "val_status NOT IN ('exited_unslashed', 'active_exiting', 'withdrawal_possible', 'withdrawal_done')"]
         
+        query_params: Dict[str, Any] = {}
         if start_epoch is not None:
-            where_conditions.append(f"epoch >= {start_epoch}")
+            where_conditions.append("epoch >= {start_epoch:UInt64}")
+            query_params["start_epoch"] = start_epoch
         if end_epoch is not None:
-            where_conditions.append(f"epoch <= {end_epoch}")
+            where_conditions.append("epoch <= {end_epoch:UInt64}")
+            query_params["end_epoch"] = end_epoch
         if operator:
-            where_conditions.append(f"val_nos_name = '{operator}'")
+            where_conditions.append("val_nos_name = {operator:String}")
+            query_params["operator"] = operator
             
         where_clause = " AND ".join(where_conditions)
         
@@ -831,13 +953,13 @@ class ClickHouseService:
             SUM(COALESCE(att_penalty, 0)) as total_penalties
             
         FROM validators_summary 
-        WHERE {where_clause}
+        PREWHERE {where_clause}
         GROUP BY val_nos_name 
         ORDER BY head_accuracy DESC
         """
         
         try:
-            raw_data = await self.execute_query(query)
+            raw_data = await self.execute_query(query, params=query_params)
             
             # Helper functions for safe conversion
             def safe_float(value):
@@ -961,109 +1083,71 @@ class ClickHouseService:
                                     start_epoch: Optional[int] = None,
                                     end_epoch: Optional[int] = None,
                                     limit: int = 1000) -> List[Dict[str, Any]]:
-        """Get detailed NodeSet validator performance data only"""
+        """Get detailed NodeSet validator performance data only.
+
+        Rows come back as JSON objects already shaped like the response: NULL
+        handling, flag-to-bool conversion and key names are done in the SELECT,
+        so no per-value parsing happens in Python.
+        """
         
         where_conditions = ["val_nos_name IS NOT NULL",  # NodeSet validators only
                           "val_status NOT IN ('exited_unslashed', 'active_exiting', 'withdrawal_possible', 'withdrawal_done')"]
+        params: Dict[str, Any] = {'limit': limit}
         if validator_id is not None:
-            where_conditions.append(f"val_id = {validator_id}")
+            where_conditions.append("val_id = {validator_id:UInt64}")
+            params['validator_id'] = validator_id
         if start_epoch is not None:
-            where_conditions.append(f"epoch >= {start_epoch}")
+            where_conditions.append("epoch >= {start_epoch:UInt64}")
+            params['start_epoch'] = start_epoch
         if end_epoch is not None:
-            where_conditions.append(f"epoch <= {end_epoch}")
+            where_conditions.append("epoch <= {end_epoch:UInt64}")
+            params['end_epoch'] = end_epoch
             
         where_clause = " AND ".join(where_conditions)
         
         query = f"""
         SELECT 
             epoch,
-            val_id,
-            val_nos_name,
-            val_status,
-            val_balance,
-            val_effective_balance,
+            val_id as validator_id,
+            val_nos_name as operator,
+            ifNull(val_status, 'unknown') as status,
+            ifNull(val_balance, 0) as balance,
+            ifNull(val_effective_balance, 0) as effective_balance,
             
             -- Attestation details
-            att_happened,
-            att_inc_delay,
-            att_valid_head,
-            att_valid_target,
-            att_valid_source,
-            att_earned_reward,
-            att_missed_reward,
-            att_penalty,
+            toBool(ifNull(att_happened, 0)) as attestation_made,
+            ifNull(att_inc_delay, 0) as inclusion_delay,
+            toBool(ifNull(att_valid_head, 0)) as head_valid,
+            toBool(ifNull(att_valid_target, 0)) as target_valid,
+            toBool(ifNull(att_valid_source, 0)) as source_valid,
+            ifNull(att_earned_reward, 0) as att_earned_reward,
+            ifNull(att_missed_reward, 0) as att_missed_reward,
+            ifNull(att_penalty, 0) as att_penalty,
             
             -- Proposer details
-            is_proposer,
-            block_to_propose,
-            block_proposed,
-            propose_earned_reward,
-            propose_missed_reward,
-            propose_penalty,
+            toBool(ifNull(is_proposer, 0)) as is_proposer,
+            ifNull(block_to_propose, 0) as block_to_propose,
+            toBool(ifNull(block_proposed, 0)) as block_proposed,
+            ifNull(propose_earned_reward, 0) as propose_earned_reward,
+            ifNull(propose_missed_reward, 0) as propose_missed_reward,
+            ifNull(propose_penalty, 0) as propose_penalty,
             
             -- Sync committee details
-            is_sync,
-            sync_percent,
-            sync_earned_reward,
-            sync_missed_reward,
-            sync_penalty
+            toBool(ifNull(is_sync, 0)) as is_sync_committee,
+            toFloat64(ifNull(sync_percent, 0)) as sync_performance,
+            ifNull(sync_earned_reward, 0) as sync_earned_reward,
+            ifNull(sync_missed_reward, 0) as sync_missed_reward,
+            ifNull(sync_penalty, 0) as sync_penalty
             
         FROM validators_summary 
         WHERE {where_clause}
-        ORDER BY epoch DESC, val_id ASC
-        LIMIT {limit}
+        ORDER BY epoch DESC, validator_id ASC
+        LIMIT {{limit:UInt32}}
         """
         
         try:
-            raw_data = await self.execute_query(query)
-            
-            def safe_float(value):
-                return float(value) if value not in ['\\N', None, ''] else 0.0
-            
-            def safe_int(value):
-                return int(value) if value not in ['\\N', None, ''] else 0
-            
-            def safe_bool(value):
-                return bool(safe_int(value))
-            
-            results = []
-            for row in raw_data:
-                if len(row) >= 25:
-                    results.append({
-                        'epoch': safe_int(row[0]),
-                        'validator_id': safe_int(row[1]),
-                        'operator': row[2] if row[2] != '\\N' else None,
-                        'status': row[3] if row[3] != '\\N' else 'unknown',
-                        'balance': safe_int(row[4]),
-                        'effective_balance': safe_int(row[5]),
-                        
-                        # Attestation details
-                        'attestation_made': safe_bool(row[6]),
-                        'inclusion_delay': safe_int(row[7]),
-                        'head_valid': safe_bool(row[8]),
-                        'target_valid': safe_bool(row[9]),
-                        'source_valid': safe_bool(row[10]),
-                        'att_earned_reward': safe_int(row[11]),
-                        'att_missed_reward': safe_int(row[12]),
-                        'att_penalty': safe_int(row[13]),
-                        
-                        # Proposer details
-                        'is_proposer': safe_bool(row[14]),
-                        'block_to_propose': safe_int(row[15]),
-                        'block_proposed': safe_bool(row[16]),
-                        'propose_earned_reward': safe_int(row[17]),
-                        'propose_missed_reward': safe_int(row[18]),
-                        'propose_penalty': safe_int(row[19]),
-                        
-                        # Sync committee details
-                        'is_sync_committee': safe_bool(row[20]),
-                        'sync_performance': safe_float(row[21]),
-                        'sync_earned_reward': safe_int(row[22]),
-                        'sync_missed_reward': safe_int(row[23]),
-                        'sync_penalty': safe_int(row[24])
-                    })
-            
-            return results
+            # Single-validator or LIMIT-bound reads; keep them off most cores
+            return await self.execute_query(query, settings={"max_threads": 2}, params=params, named=True)
             
         except Exception as e:
             logger.error(f"Failed to get NodeSet validator details: {e}")
@@ -0,0 +1,64 @@
+"""
+Epoch-scoped result cache for ClickHouse-backed endpoints
+Results that are a pure function of the latest epoch and the request arguments
+are reused until a new epoch lands, instead of expiring on a wall-clock TTL
+"""
+
+import asyncio
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class EpochScopedCache:
+    """
+    Bounded LRU of {key: (epoch, value)}
+
+    An entry is only served while the caller's epoch matches the epoch it was
+    computed at. Concurrent misses for the same key are coalesced behind a
+    per-key lock, so only one query runs per key and epoch (single-flight).
+    """
+
+    def __init__(self, max_entries: int = 128):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[int, Any]]" = OrderedDict()
+        self._locks: Dict[Hashable, asyncio.Lock] = {}
+
+    def _lookup(self, key: Hashable, epoch: int) -> Tuple[bool, Any]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != epoch:
+            return False, None
+        self._entries.move_to_end(key)
+        return True, entry[1]
+
+    async def get_or_compute(self, key: Hashable, epoch: int, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value for `key` at `epoch`, running `compute` once on a miss"""
+        hit, value = self._lookup(key, epoch)
+        if hit:
+            return value
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        try:
+            async with lock:
+                # Another request may have filled the entry while we waited
+                hit, value = self._lookup(key, epoch)
+                if hit:
+                    return value
+
+                value = await compute()
+                self._entries[key] = (epoch, value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    evicted, _ = self._entries.popitem(last=False)
+                    evicted_lock = self._locks.get(evicted)
+                    if evicted_lock is not None and not evicted_lock.locked():
+                        del self._locks[evicted]
+                return value
+        finally:
+            # A key whose compute raised has no entry (and so is never evicted); drop
+            # its lock so failing keys don't accumulate one lock per epoch
+            if key not in self._entries and not lock.locked() and self._locks.get(key) is lock:
+                del self._locks[key]
+
+    def clear(self):
+        """Drop all cached results"""
+        self._entries.clear()
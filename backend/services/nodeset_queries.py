@@ -0,0 +1,716 @@
+"""
+ClickHouse query templates for the NodeSet router
+Values are bound server-side through `clickhouse_service.execute_query(..., params=...)`,
+so each query shape has one constant SQL text regardless of epoch or request arguments
+"""
+
+EPOCH_RANGE_QUERY = "SELECT MAX(epoch), MIN(epoch) FROM validators_summary WHERE val_nos_name IS NOT NULL"
+
+# Latest/earliest NodeSet epochs read only from the newest/oldest active partitions
+PARTITION_EPOCH_BOUNDS_QUERY = """
+WITH
+    (
+        SELECT max(toInt64(partition))
+        FROM system.parts
+        WHERE active
+          AND database = currentDatabase()
+          AND table = 'validators_summary'
+    ) as max_partition,
+    (
+        SELECT min(toInt64(partition))
+        FROM system.parts
+        WHERE active
+          AND database = currentDatabase()
+          AND table = 'validators_summary'
+    ) as min_partition
+SELECT
+    (
+        SELECT MAX(epoch)
+        FROM validators_summary
+        PREWHERE intDiv(epoch, 225) = max_partition
+        WHERE val_nos_id IS NOT NULL
+    ) as latest_epoch,
+    (
+        SELECT MIN(epoch)
+        FROM validators_summary
+        PREWHERE intDiv(epoch, 225) = min_partition
+        WHERE val_nos_id IS NOT NULL
+    ) as min_epoch
+"""
+
+# Latest NodeSet epoch only, read from the newest active partition
+LATEST_PARTITION_EPOCH_QUERY = """
+WITH
+    (
+        SELECT max(toInt64(partition))
+        FROM system.parts
+        WHERE active
+          AND database = currentDatabase()
+          AND table = 'validators_summary'
+    ) as max_partition
+SELECT MAX(epoch)
+FROM validators_summary
+PREWHERE intDiv(epoch, 225) = max_partition
+WHERE val_nos_id IS NOT NULL
+"""
+
+VALIDATORS_DOWN_FIELDS = ("operator", "validator_id", "latest_epoch", "start_epoch", "consecutive_misses")
+VALIDATORS_DOWN_QUERY = """
+SELECT 
+    any(val_nos_name) as operator,
+    val_id as validator_id,
+    {latest_epoch:UInt64} as latest_epoch,
+    {start_epoch:UInt64} as start_epoch,
+    {n:UInt8} as consecutive_misses
+FROM validators_summary
+PREWHERE epoch BETWEEN {start_epoch:UInt64} AND {latest_epoch:UInt64}
+    AND val_status IN ('active_ongoing', 'active_slashed')
+    AND val_nos_id IS NOT NULL
+GROUP BY val_id
+HAVING COUNT() = {n:UInt8}
+   AND max(coalesce(att_happened, 0)) = 0
+ORDER BY operator, val_id
+LIMIT {lim:UInt32}
+"""
+
+# Same result as VALIDATORS_DOWN_QUERY using the persisted missed_attestation column
+# (sql/validators_summary_missed_attestation.sql): only missed rows are read, so a
+# validator is down when it has a missed row for every epoch in the window
+VALIDATORS_DOWN_MISSED_QUERY = """
+SELECT 
+    any(val_nos_name) as operator,
+    val_id as validator_id,
+    {latest_epoch:UInt64} as latest_epoch,
+    {start_epoch:UInt64} as start_epoch,
+    {n:UInt8} as consecutive_misses
+FROM validators_summary
+PREWHERE epoch BETWEEN {start_epoch:UInt64} AND {latest_epoch:UInt64}
+    AND missed_attestation = 1
+    AND val_status IN ('active_ongoing', 'active_slashed')
+    AND val_nos_id IS NOT NULL
+GROUP BY val_id
+HAVING COUNT() = {n:UInt8}
+ORDER BY operator, val_id
+LIMIT {lim:UInt32}
+"""
+
+MISSED_ATTESTATION_COLUMN_QUERY = """
+SELECT count()
+FROM system.columns
+WHERE database = currentDatabase()
+  AND table = 'validators_summary'
+  AND name = 'missed_attestation'
+"""
+
+OPERATOR_ACTIVE_VALIDATORS_QUERY = """
+SELECT DISTINCT val_id
+FROM validators_summary 
+PREWHERE epoch = {latest_epoch:UInt64}
+WHERE val_nos_name = {operator:String}
+AND val_status IN ('active_ongoing', 'active_slashed')
+ORDER BY val_id
+LIMIT {lim:UInt32}
+"""
+
+# Single pass: validators missing every epoch in the window that were not exiting at the latest
+# epoch, with their status at that epoch
+VALIDATORS_DOWN_STATUS_QUERY = """
+SELECT 
+    val_id,
+    val_nos_name,
+    argMax(val_status, epoch) as current_status,
+    {latest_epoch:UInt64} as latest_epoch
+FROM validators_summary
+PREWHERE epoch BETWEEN {start_epoch:UInt64} AND {latest_epoch:UInt64}
+    AND val_nos_name IS NOT NULL
+GROUP BY val_id, val_nos_name
+HAVING count() = {n:UInt8}
+   AND max(coalesce(att_happened, 0)) = 0
+   AND countIf(epoch = {latest_epoch:UInt64} AND val_status NOT IN ('exited_unslashed', 'active_exiting', 'withdrawal_possible', 'withdrawal_done')) > 0
+ORDER BY val_nos_name, val_id
+LIMIT {lim:UInt32}
+"""
+
+# Validators-down summary in one scan: per-validator flags for the window, then totals over them
+VALIDATORS_DOWN_SUMMARY_QUERY = """
+SELECT
+    sum(in_latest) as total_validators,
+    uniqExactIf(operator, in_latest > 0) as total_operators,
+    sum(missed_latest) as missed_latest,
+    sum(missed_minus_1) as missed_epoch_minus_1,
+    sum(missed_minus_2) as missed_epoch_minus_2,
+    countIf(epochs = {n:UInt8} AND attested = 0) as consecutive_down
+FROM (
+    SELECT
+        val_id,
+        any(val_nos_name) as operator,
+        count() as epochs,
+        max(coalesce(att_happened, 0)) as attested,
+        countIf(epoch = {latest_epoch:UInt64}) as in_latest,
+        countIf(epoch = {latest_epoch:UInt64} AND ((att_happened = 0) OR isNull(att_happened))) as missed_latest,
+        countIf(epoch = {latest_epoch:UInt64} - 1 AND ((att_happened = 0) OR isNull(att_happened))) as missed_minus_1,
+        countIf(epoch = {latest_epoch:UInt64} - 2 AND ((att_happened = 0) OR isNull(att_happened))) as missed_minus_2
+    FROM validators_summary
+    PREWHERE epoch BETWEEN {start_epoch:UInt64} AND {latest_epoch:UInt64}
+        AND val_status IN ('active_ongoing', 'active_slashed')
+        AND val_nos_id IS NOT NULL
+    WHERE val_nos_name IS NOT NULL
+    GROUP BY val_id
+)
+"""
+
+# Below-threshold validators from the pre-aggregated daily rollup table
+BELOW_THRESHOLD_ROLLUP_QUERY = """
+WITH validator_rollup AS (
+    SELECT
+        val_id,
+        anyLast(val_nos_name) as operator,
+        SUM(active_duty_epochs) as active_duty_epochs,
+        SUM(actual_rewards) as actual_rewards,
+        SUM(theoretical_max_rewards) as theoretical_max_rewards,
+        SUM(attestations_made) as attestations_made,
+        SUM(blocks_proposed) as blocks_proposed,
+        SUM(proposer_slots) as proposer_slots,
+        SUM(sync_percent_sum) as sync_percent_sum,
+        SUM(sync_percent_count) as sync_percent_count,
+        SUM(if(day_partition = {latest_partition:Int64}, actual_rewards, 0)) as day_1_actual,
+        SUM(if(day_partition = {latest_partition:Int64}, theoretical_max_rewards, 0)) as day_1_theoretical
+    FROM validators_daily_attestation_rollup
+    PREWHERE day_partition BETWEEN {start_partition:Int64} AND {latest_partition:Int64}
+    WHERE val_nos_id IS NOT NULL
+      AND val_nos_name IS NOT NULL
+    GROUP BY val_id
+    HAVING active_duty_epochs = {total_epochs:UInt32}
+),
+scored AS (
+    SELECT
+        operator,
+        val_id as validator_id,
+        active_duty_epochs,
+        actual_rewards,
+        theoretical_max_rewards,
+        attestations_made,
+        blocks_proposed,
+        proposer_slots,
+        sync_percent_sum,
+        sync_percent_count,
+        day_1_actual,
+        day_1_theoretical,
+        if(theoretical_max_rewards > 0, (actual_rewards * 100.0 / theoretical_max_rewards), 0.0) as reward_percentage,
+        if(day_1_theoretical > 0, (day_1_actual * 100.0 / day_1_theoretical), 0.0) as day_1_percentage,
+        if(sync_percent_count > 0, (sync_percent_sum / sync_percent_count), 0.0) as avg_sync_performance
+    FROM validator_rollup
+)
+SELECT
+    operator,
+    validator_id,
+    {total_epochs:UInt32} as total_epochs,
+    active_duty_epochs,
+    actual_rewards,
+    theoretical_max_rewards,
+    reward_percentage,
+    attestations_made,
+    (active_duty_epochs - attestations_made) as attestations_missed,
+    blocks_proposed,
+    (proposer_slots - blocks_proposed) as blocks_missed,
+    avg_sync_performance,
+    day_1_actual as day_1_actual_rewards,
+    day_1_theoretical as day_1_theoretical_rewards,
+    day_1_percentage,
+    {latest_epoch:UInt64} as latest_epoch,
+    {start_epoch:UInt64} as start_epoch,
+    {days:UInt32} as days_analyzed,
+    {threshold:Float64} as threshold_percentage
+FROM scored
+WHERE reward_percentage < {threshold:Float64}
+ORDER BY reward_percentage ASC, operator, validator_id
+LIMIT {lim:UInt32}
+"""
+
+# Validators below a reward threshold over the latest day; the epoch window is resolved server-side
+BELOW_THRESHOLD_QUERY = """
+WITH validator_rewards AS (
+    SELECT 
+        val_id,
+        val_nos_name,
+        -- Count all epochs and active duty epochs separately
+        COUNT(*) as total_epochs,
+        SUM(CASE WHEN val_status IN ('active_ongoing', 'active_slashed') THEN 1 ELSE 0 END) as active_duty_epochs,
+        -- Actual attestation rewards earned (only during active duty)
+        SUM(CASE WHEN val_status IN ('active_ongoing', 'active_slashed') THEN COALESCE(att_earned_reward, 0) ELSE 0 END) as actual_rewards,
+        -- Theoretical maximum attestation rewards (earned + missed, only during active duty)
+        SUM(CASE WHEN val_status IN ('active_ongoing', 'active_slashed') THEN COALESCE(att_earned_reward, 0) + COALESCE(att_missed_reward, 0) ELSE 0 END) as theoretical_max_rewards,
+        -- Performance metrics (only during active duty)
+        SUM(CASE WHEN val_status IN ('active_ongoing', 'active_slashed') AND att_happened = 1 THEN 1 ELSE 0 END) as attestations_made,
+        SUM(CASE WHEN val_status IN ('active_ongoing', 'active_slashed') AND (att_happened = 0 OR att_happened IS NULL) THEN 1 ELSE 0 END) as attestations_missed,
+        SUM(CASE WHEN val_status IN ('active_ongoing', 'active_slashed') AND is_proposer = 1 AND block_proposed = 1 THEN 1 ELSE 0 END) as blocks_proposed,
+        SUM(CASE WHEN val_status IN ('active_ongoing', 'active_slashed') AND is_proposer = 1 AND (block_proposed = 0 OR block_proposed IS NULL) THEN 1 ELSE 0 END) as blocks_missed,
+        ifNull(AVG(CASE WHEN val_status IN ('active_ongoing', 'active_slashed') AND sync_percent IS NOT NULL THEN sync_percent ELSE NULL END), 0.0) as avg_sync_performance
+    FROM validators_summary 
+    PREWHERE epoch BETWEEN {start_epoch:UInt64} AND {latest_epoch:UInt64}
+        AND val_nos_name IS NOT NULL
+        AND val_status NOT IN ('exited_unslashed', 'active_exiting', 'withdrawal_possible', 'withdrawal_done')
+    -- Only validators that lost some reward (or earned nothing) in the window can fall below
+    -- the threshold, so the full aggregation runs for those candidates only
+    WHERE val_id IN (
+        SELECT val_id
+        FROM validators_summary
+        PREWHERE epoch BETWEEN {start_epoch:UInt64} AND {latest_epoch:UInt64}
+        WHERE val_nos_name IS NOT NULL
+          AND (att_missed_reward > 0 OR COALESCE(att_earned_reward, 0) = 0)
+    )
+    GROUP BY val_id, val_nos_name
+    HAVING SUM(CASE WHEN val_status IN ('active_ongoing', 'active_slashed') THEN 1 ELSE 0 END) = 225  -- Must have 100% active duty data coverage for 1 day (225 epochs)
+),
+performance_analysis AS (
+    SELECT 
+        val_id,
+        val_nos_name,
+        total_epochs,
+        active_duty_epochs,
+        actual_rewards,
+        theoretical_max_rewards,
+        attestations_made,
+        attestations_missed,
+        blocks_proposed,
+        blocks_missed,
+        avg_sync_performance,
+        -- Calculate reward percentage
+        CASE 
+            WHEN theoretical_max_rewards > 0 THEN (actual_rewards * 100.0 / theoretical_max_rewards)
+            ELSE 0.0
+        END as reward_percentage
+    FROM validator_rewards
+)
+SELECT 
+    val_nos_name as operator,
+    val_id as validator_id,
+    total_epochs,
+    active_duty_epochs,
+    actual_rewards,
+    theoretical_max_rewards,
+    reward_percentage,
+    attestations_made,
+    attestations_missed,
+    blocks_proposed,
+    blocks_missed,
+    avg_sync_performance,
+    {latest_epoch:UInt64} as latest_epoch,
+    {start_epoch:UInt64} as start_epoch,
+    {threshold:Float64} as threshold_percentage
+FROM performance_analysis
+WHERE reward_percentage < {threshold:Float64}
+ORDER BY reward_percentage ASC, val_nos_name, val_id
+LIMIT {lim:UInt32}
+"""
+
+# Phase 1 of /below_threshold/extended: lightweight scan for candidate validators
+BELOW_THRESHOLD_CANDIDATES_QUERY = """
+WITH validator_rewards AS (
+    SELECT
+        val_id,
+        COUNT() as active_duty_epochs,
+        SUM(COALESCE(att_earned_reward, 0)) as actual_rewards,
+        SUM(COALESCE(att_earned_reward, 0) + COALESCE(att_missed_reward, 0)) as theoretical_max_rewards,
+        if(theoretical_max_rewards > 0, (actual_rewards * 100.0 / theoretical_max_rewards), 0.0) as reward_percentage
+    FROM validators_summary
+    PREWHERE epoch BETWEEN {start_epoch:UInt64} AND {latest_epoch:UInt64}
+        AND val_status IN ('active_ongoing', 'active_slashed')
+        AND val_nos_id IS NOT NULL
+    GROUP BY val_id
+    HAVING active_duty_epochs = {total_epochs:UInt32}
+)
+SELECT
+    val_id as validator_id,
+    active_duty_epochs,
+    actual_rewards,
+    theoretical_max_rewards,
+    reward_percentage
+FROM validator_rewards
+WHERE reward_percentage < {threshold:Float64}
+ORDER BY reward_percentage ASC, validator_id
+LIMIT {lim:UInt32}
+"""
+
+# Phase 2 of /below_threshold/extended: detailed metrics for the selected validators only
+BELOW_THRESHOLD_DETAILS_QUERY = """
+SELECT
+    val_id as validator_id,
+    any(val_nos_name) as operator,
+    SUM(att_happened = 1) as attestations_made,
+    SUM((is_proposer = 1) AND (block_proposed = 1)) as blocks_proposed,
+    SUM(is_proposer = 1) as proposer_slots,
+    AVG(sync_percent) as avg_sync_performance,
+    SUM(if(epoch > {latest_epoch:UInt64} - 225, COALESCE(att_earned_reward, 0), 0)) as day_1_actual,
+    SUM(if(epoch > {latest_epoch:UInt64} - 225, COALESCE(att_earned_reward, 0) + COALESCE(att_missed_reward, 0), 0)) as day_1_theoretical
+FROM validators_summary
+PREWHERE epoch BETWEEN {start_epoch:UInt64} AND {latest_epoch:UInt64}
+    AND val_id IN {validator_ids:Array(UInt64)}
+    AND val_status IN ('active_ongoing', 'active_slashed')
+    AND val_nos_id IS NOT NULL
+    AND val_nos_name IS NOT NULL
+GROUP BY val_id
+"""
+
+# Operator attestation performance vs theoretical maximum, with duty/pending/coverage breakdown
+THEORETICAL_PERFORMANCE_QUERY = """
+WITH operator_performance AS (
+    SELECT 
+        val_nos_name as operator,
+        uniqExact(val_id) as validator_count,
+        -- Count duty periods and attestations (active duty = active_ongoing); the status
+        -- test is evaluated once per row as is_active and shared by every aggregate below
+        countIf(val_status = 'active_ongoing' AS is_active) as active_duty_periods,
+        countIf(is_active AND att_happened = 1) as successful_attestations,
+        countIf(val_status IN ('pending_initialized', 'pending_queued')) as pending_periods,
+        -- Sum rewards and penalties for active periods only
+        sumIf(COALESCE(att_earned_reward, 0), is_active) as total_actual_rewards,
+        sumIf(COALESCE(att_penalty, 0), is_active) as total_penalties,
+        -- Calculate theoretical maximum using actual reward structure
+        sumIf(COALESCE(att_earned_reward, 0) + COALESCE(att_missed_reward, 0), is_active) as total_theoretical_max_rewards,
+        -- Calculate validator coverage
+        COUNT(*) as total_data_points,
+        ({latest_epoch:UInt64} - {start_epoch:UInt64} + 1) as epochs_in_period
+    FROM validators_summary
+    PREWHERE epoch BETWEEN {start_epoch:UInt64} AND {latest_epoch:UInt64}
+        AND val_nos_name IS NOT NULL
+        AND val_status NOT IN ('exited_unslashed', 'active_exiting', 'withdrawal_possible', 'withdrawal_done')
+    GROUP BY val_nos_name
+)
+SELECT 
+    operator,
+    validator_count,
+    active_duty_periods,
+    successful_attestations,
+    -- Every active period either attested (att_happened = 1) or missed (0 or NULL)
+    (active_duty_periods - successful_attestations) as missed_attestations,
+    pending_periods,
+    total_actual_rewards,
+    total_penalties,
+    total_theoretical_max_rewards,
+    total_data_points,
+    epochs_in_period,
+    -- Calculate expected total epochs for all validators
+    (validator_count * epochs_in_period) as expected_total_epochs,
+    -- Net rewards after penalties
+    (total_actual_rewards - total_penalties) as net_rewards,
+    -- Theoretical performance using actual reward structure
+    CASE 
+        WHEN total_theoretical_max_rewards > 0 
+        THEN ((total_actual_rewards - total_penalties) * 100.0 / total_theoretical_max_rewards)
+        ELSE 0.0
+    END as theoretical_performance,
+    -- Attestation success rate
+    CASE 
+        WHEN active_duty_periods > 0 
+        THEN (successful_attestations * 100.0 / active_duty_periods)
+        ELSE 0.0
+    END as attestation_success_rate,
+    -- Data coverage
+    CASE 
+        WHEN (validator_count * epochs_in_period) > 0 
+        THEN (total_data_points * 100.0 / (validator_count * epochs_in_period))
+        ELSE 0.0
+    END as data_coverage_percentage
+FROM operator_performance
+ORDER BY theoretical_performance DESC
+LIMIT {lim:UInt32}
+"""
+
+# Operator-level stages of the extended query, shared by the raw and rollup variants; each
+# variant supplies a per-validator `validator_rewards` CTE with the same columns
+_THEORETICAL_PERFORMANCE_EXTENDED_OPERATORS = """
+operator_performance AS (
+    SELECT 
+        val_nos_name as operator,
+        COUNT(*) as validator_count,
+        -- Aggregate totals across all validators for this operator
+        SUM(total_epochs) as total_epochs_all_validators,
+        SUM(actual_rewards) as total_actual_rewards,
+        SUM(theoretical_max_rewards) as total_theoretical_max_rewards,
+        SUM(attestations_made) as total_attestations_made,
+        SUM(attestations_missed) as total_attestations_missed,
+        SUM(blocks_proposed) as total_blocks_proposed,
+        SUM(blocks_missed) as total_blocks_missed,
+        AVG(avg_sync_performance) as avg_sync_performance_all_validators,
+        -- Recent day totals
+        SUM(recent_day_actual) as total_recent_day_actual,
+        SUM(recent_day_theoretical) as total_recent_day_theoretical,
+        -- Average reward percentage across all validators for this operator
+        AVG(validator_reward_percentage) as avg_reward_percentage,
+        -- Calculate operator-level reward percentage using totals
+        CASE 
+            WHEN SUM(theoretical_max_rewards) > 0 THEN (SUM(actual_rewards) * 100.0 / SUM(theoretical_max_rewards))
+            ELSE 0.0
+        END as operator_reward_percentage,
+        -- Calculate recent day operator percentage
+        CASE 
+            WHEN SUM(recent_day_theoretical) > 0 THEN (SUM(recent_day_actual) * 100.0 / SUM(recent_day_theoretical))
+            ELSE 0.0
+        END as recent_day_percentage
+    FROM validator_rewards
+    GROUP BY val_nos_name
+)
+SELECT 
+    operator,
+    validator_count,
+    total_actual_rewards,
+    total_theoretical_max_rewards,
+    operator_reward_percentage,
+    avg_reward_percentage as avg_validator_reward_percentage,
+    total_attestations_made,
+    total_attestations_missed,
+    total_blocks_proposed,
+    total_blocks_missed,
+    ifNull(avg_sync_performance_all_validators, 0.0) as avg_sync_performance,
+    total_recent_day_actual as recent_day_actual_rewards,
+    total_recent_day_theoretical as recent_day_theoretical_rewards,
+    recent_day_percentage,
+    {latest_epoch:UInt64} as latest_epoch,
+    {start_epoch:UInt64} as start_epoch,
+    {days:UInt32} as days_analyzed,
+    {total_epochs:UInt32} as total_epochs_analyzed
+FROM operator_performance
+ORDER BY operator_reward_percentage DESC
+LIMIT {lim:UInt32}
+"""
+
+# Per-validator scan of the raw extended query, split around the recent-day columns
+_THEORETICAL_PERFORMANCE_EXTENDED_SCAN_HEAD = """
+WITH validator_rewards AS (
+    SELECT 
+        val_id,
+        val_nos_name,
+        COUNT(*) as total_epochs,
+        -- Actual attestation rewards earned per validator
+        SUM(COALESCE(att_earned_reward, 0)) as actual_rewards,
+        -- Theoretical maximum attestation rewards per validator
+        SUM(COALESCE(att_earned_reward, 0) + COALESCE(att_missed_reward, 0)) as theoretical_max_rewards,
+        -- Performance metrics per validator
+        countIf(att_happened = 1) as attestations_made,
+        countIf(att_happened = 0 OR att_happened IS NULL) as attestations_missed,
+        countIf(is_proposer = 1 AND block_proposed = 1) as blocks_proposed,
+        countIf(is_proposer = 1 AND (block_proposed = 0 OR block_proposed IS NULL)) as blocks_missed,
+        AVG(sync_percent) as avg_sync_performance,"""
+
+_THEORETICAL_PERFORMANCE_EXTENDED_SCAN_TAIL = """
+        -- Calculate per-validator reward percentage
+        if(theoretical_max_rewards > 0, (actual_rewards * 100.0 / theoretical_max_rewards), 0.0) as validator_reward_percentage
+    FROM validators_summary 
+    PREWHERE epoch BETWEEN {start_epoch:UInt64} AND {latest_epoch:UInt64}
+        AND val_nos_name IS NOT NULL
+        AND val_status NOT IN ('exited_unslashed', 'active_exiting', 'withdrawal_possible', 'withdrawal_done')
+    GROUP BY val_id, val_nos_name
+    HAVING COUNT(*) >= 1  -- Must have at least some data
+),
+"""
+
+# Operator attestation performance vs theoretical maximum over a configurable window
+THEORETICAL_PERFORMANCE_EXTENDED_QUERY = (
+    _THEORETICAL_PERFORMANCE_EXTENDED_SCAN_HEAD + """
+        -- Recent day performance (most recent 225 epochs)
+        sumIf(COALESCE(att_earned_reward, 0), epoch > {latest_epoch:UInt64} - 225) as recent_day_actual,
+        sumIf(COALESCE(att_earned_reward, 0) + COALESCE(att_missed_reward, 0), epoch > {latest_epoch:UInt64} - 225) as recent_day_theoretical,"""
+    + _THEORETICAL_PERFORMANCE_EXTENDED_SCAN_TAIL + _THEORETICAL_PERFORMANCE_EXTENDED_OPERATORS
+)
+
+# days=1 variant: the window is exactly the most recent 225 epochs, so the recent-day
+# columns equal the window totals and the two conditional sums are skipped
+THEORETICAL_PERFORMANCE_EXTENDED_DAY_QUERY = (
+    _THEORETICAL_PERFORMANCE_EXTENDED_SCAN_HEAD + """
+        -- Recent day performance (the whole window)
+        actual_rewards as recent_day_actual,
+        theoretical_max_rewards as recent_day_theoretical,"""
+    + _THEORETICAL_PERFORMANCE_EXTENDED_SCAN_TAIL + _THEORETICAL_PERFORMANCE_EXTENDED_OPERATORS
+)
+
+# Extended query served from the daily performance rollup
+# (sql/nodeset_daily_performance_rollup.sql): whole days before the most recent 225 epochs
+# come from the rollup, the partial leading day and the most recent 225 epochs from the raw table
+THEORETICAL_PERFORMANCE_EXTENDED_ROLLUP_QUERY = """
+WITH validator_rewards AS (
+    SELECT 
+        val_id,
+        val_nos_name,
+        SUM(epochs) as total_epochs,
+        SUM(earned) as actual_rewards,
+        SUM(theoretical) as theoretical_max_rewards,
+        SUM(made) as attestations_made,
+        SUM(missed) as attestations_missed,
+        SUM(proposed) as blocks_proposed,
+        SUM(proposals_missed) as blocks_missed,
+        if(SUM(sync_count) > 0, SUM(sync_sum) / SUM(sync_count), NULL) as avg_sync_performance,
+        SUM(recent_earned) as recent_day_actual,
+        SUM(recent_theoretical) as recent_day_theoretical,
+        if(theoretical_max_rewards > 0, (actual_rewards * 100.0 / theoretical_max_rewards), 0.0) as validator_reward_percentage
+    FROM (
+        SELECT
+            val_id,
+            val_nos_name,
+            data_points as epochs,
+            actual_rewards as earned,
+            theoretical_max_rewards as theoretical,
+            attestations_made as made,
+            attestations_missed as missed,
+            blocks_proposed as proposed,
+            blocks_missed as proposals_missed,
+            sync_percent_sum as sync_sum,
+            sync_percent_count as sync_count,
+            toUInt64(0) as recent_earned,
+            toUInt64(0) as recent_theoretical
+        FROM validators_daily_performance_rollup
+        PREWHERE day_partition BETWEEN {first_partition:Int64} AND {last_partition:Int64}
+
+        UNION ALL
+
+        SELECT
+            val_id,
+            val_nos_name,
+            toUInt64(count()) as epochs,
+            toUInt64(SUM(COALESCE(att_earned_reward, 0))) as earned,
+            toUInt64(SUM(COALESCE(att_earned_reward, 0) + COALESCE(att_missed_reward, 0))) as theoretical,
+            toUInt64(countIf(att_happened = 1)) as made,
+            toUInt64(countIf(att_happened = 0 OR att_happened IS NULL)) as missed,
+            toUInt64(countIf(is_proposer = 1 AND block_proposed = 1)) as proposed,
+            toUInt64(countIf(is_proposer = 1 AND (block_proposed = 0 OR block_proposed IS NULL))) as proposals_missed,
+            toFloat64(sumIf(COALESCE(sync_percent, 0), sync_percent IS NOT NULL)) as sync_sum,
+            toUInt64(countIf(sync_percent IS NOT NULL)) as sync_count,
+            toUInt64(sumIf(COALESCE(att_earned_reward, 0), epoch > {latest_epoch:UInt64} - 225)) as recent_earned,
+            toUInt64(sumIf(COALESCE(att_earned_reward, 0) + COALESCE(att_missed_reward, 0), epoch > {latest_epoch:UInt64} - 225)) as recent_theoretical
+        FROM validators_summary
+        PREWHERE (
+                epoch BETWEEN {start_epoch:UInt64} AND {head_end_epoch:Int64}
+                OR epoch BETWEEN {tail_start_epoch:UInt64} AND {latest_epoch:UInt64}
+            )
+            AND val_nos_name IS NOT NULL
+            AND val_status NOT IN ('exited_unslashed', 'active_exiting', 'withdrawal_possible', 'withdrawal_done')
+        GROUP BY val_id, val_nos_name
+    )
+    GROUP BY val_id, val_nos_name
+    HAVING total_epochs >= 1  -- Must have at least some data
+),
+""" + _THEORETICAL_PERFORMANCE_EXTENDED_OPERATORS
+
+# Per-epoch median proposal reward and the final ordering, shared by the raw and rollup
+# operator efficiency queries
+_OPERATOR_EFFICIENCY_EPOCH_MEDIANS = """
+WITH epoch_medians AS (
+    -- Calculate median proposal reward for each epoch (from other 31 proposals)
+    SELECT 
+        epoch,
+        median(propose_earned_reward) as epoch_median_reward
+    FROM validators_summary
+    PREWHERE epoch BETWEEN {start_epoch:UInt64} AND {latest_epoch:UInt64}
+        AND is_proposer = 1
+    WHERE block_proposed = 1
+    AND propose_earned_reward > 0
+    GROUP BY epoch
+)
+"""
+
+_OPERATOR_EFFICIENCY_ORDER = """
+-- Overall efficiency, from the aggregates above
+ORDER BY if(
+    (total_attester_ideal_reward + total_proposer_ideal_reward + total_sync_ideal_reward) > 0,
+    (total_attester_actual_reward + total_proposer_actual_reward + total_sync_actual_reward) * 100.0 /
+        (total_attester_ideal_reward + total_proposer_ideal_reward + total_sync_ideal_reward),
+    0.0
+) DESC
+LIMIT {lim:UInt32}
+"""
+
+# Operator efficiency across attestation, proposal and sync duties; proposals are compared
+# against the epoch's median proposal reward (shared by the 1-day and extended endpoints)
+OPERATOR_EFFICIENCY_QUERY = _OPERATOR_EFFICIENCY_EPOCH_MEDIANS + """SELECT 
+    val_nos_name as operator,
+    uniqExact(val_id) as validator_count,
+    -- Attestation rewards (unchanged)
+    SUM(COALESCE(att_earned_reward, 0)) as total_attester_actual_reward,
+    SUM(COALESCE(att_earned_reward, 0) + COALESCE(att_missed_reward, 0)) as total_attester_ideal_reward,
+    -- Proposer rewards (corrected with epoch-specific median comparison); the duty flags are
+    -- named once (proposer_duty, sync_duty) and shared by every -If aggregate below
+    sumIf(COALESCE(propose_earned_reward, 0), is_proposer = 1 AS proposer_duty) as total_proposer_actual_reward,
+    sumIf(COALESCE(em.epoch_median_reward, 47000000), proposer_duty) as total_proposer_ideal_reward,
+    -- Sync committee rewards (unchanged)
+    sumIf(COALESCE(sync_earned_reward, 0), is_sync = 1 AS sync_duty) as total_sync_actual_reward,
+    sumIf(COALESCE(sync_earned_reward, 0) + COALESCE(sync_missed_reward, 0), sync_duty) as total_sync_ideal_reward,
+    -- Performance metrics
+    countIf(att_happened = 1) as successful_attestations,
+    countIf(att_happened = 0 OR att_happened IS NULL) as missed_attestations,
+    countIf(proposer_duty AND block_proposed = 1) as successful_proposals,
+    countIf(proposer_duty AND (block_proposed = 0 OR block_proposed IS NULL)) as missed_proposals,
+    countIf(proposer_duty) as total_proposer_duties,
+    countIf(sync_duty) as total_sync_duties,
+    -- Mean over sync duties with a reported participation, 0.0 when there are none
+    if(countIf(sync_duty AND sync_percent IS NOT NULL AS sync_reported) > 0,
+       sumIf(COALESCE(sync_percent, 0), sync_reported) / countIf(sync_reported),
+       0.0) as avg_sync_participation,
+    COUNT(*) as total_epochs_data
+FROM (
+    -- Filter in PREWHERE before the join so reward columns are only read for matching rows
+    SELECT
+        val_id,
+        val_nos_name,
+        epoch,
+        att_happened,
+        att_earned_reward,
+        att_missed_reward,
+        is_proposer,
+        block_proposed,
+        propose_earned_reward,
+        is_sync,
+        sync_earned_reward,
+        sync_missed_reward,
+        sync_percent
+    FROM validators_summary
+    PREWHERE epoch BETWEEN {start_epoch:UInt64} AND {latest_epoch:UInt64}
+        AND val_nos_name IS NOT NULL
+        AND val_status NOT IN ('exited_unslashed', 'active_exiting', 'withdrawal_possible', 'withdrawal_done')
+) vs
+LEFT JOIN epoch_medians em ON vs.epoch = em.epoch
+GROUP BY vs.val_nos_name
+""" + _OPERATOR_EFFICIENCY_ORDER
+
+# Operator efficiency served from the per-epoch operator stats
+# (sql/nodeset_epoch_operator_stats.sql); same columns and order as OPERATOR_EFFICIENCY_QUERY.
+# The epoch median is per epoch, so the proposer ideal reward is proposer_duties * median
+OPERATOR_EFFICIENCY_ROLLUP_QUERY = _OPERATOR_EFFICIENCY_EPOCH_MEDIANS + """SELECT 
+    s.val_nos_name as operator,
+    uniqExactMerge(validators) as validator_count,
+    SUM(attester_actual_reward) as total_attester_actual_reward,
+    SUM(attester_ideal_reward) as total_attester_ideal_reward,
+    SUM(proposer_actual_reward) as total_proposer_actual_reward,
+    SUM(proposer_duties * COALESCE(em.epoch_median_reward, 47000000)) as total_proposer_ideal_reward,
+    SUM(sync_actual_reward) as total_sync_actual_reward,
+    SUM(sync_ideal_reward) as total_sync_ideal_reward,
+    SUM(attestations_made) as successful_attestations,
+    SUM(attestations_missed) as missed_attestations,
+    SUM(proposals_made) as successful_proposals,
+    SUM(proposals_missed) as missed_proposals,
+    SUM(proposer_duties) as total_proposer_duties,
+    SUM(sync_duties) as total_sync_duties,
+    if(SUM(sync_percent_count) > 0, SUM(sync_percent_sum) / SUM(sync_percent_count), 0.0) as avg_sync_participation,
+    SUM(data_points) as total_epochs_data
+FROM (
+    SELECT *
+    FROM validators_epoch_operator_stats
+    PREWHERE epoch BETWEEN {start_epoch:UInt64} AND {latest_epoch:UInt64}
+) s
+LEFT JOIN epoch_medians em ON s.epoch = em.epoch
+GROUP BY s.val_nos_name
+""" + _OPERATOR_EFFICIENCY_ORDER
+
+# Distinct NodeSet validator statuses with record/validator/epoch counts
+VALIDATOR_STATUS_VALUES_QUERY = """
+SELECT 
+    val_status,
+    COUNT(*) as status_count,
+    COUNT(DISTINCT val_id) as unique_validators,
+    COUNT(DISTINCT epoch) as epochs_seen,
+    MIN(epoch) as first_seen_epoch,
+    MAX(epoch) as last_seen_epoch
+FROM validators_summary 
+WHERE val_nos_name IS NOT NULL
+GROUP BY val_status
+ORDER BY status_count DESC
+"""
@@ -1,54 +1,110 @@
 -- Daily rollup table for fast below-threshold queries.
 -- Purpose: reduce scan size from (epochs * validators) to (days * validators).
 -- Expected row reduction: ~225x for day-based windows.
+--
+-- Columns are SimpleAggregateFunction states, so rows for the same (day_partition, val_id)
+-- are summed on merge and any partial rows not yet merged still add up correctly under
+-- the SUM(...) GROUP BY val_id in the below_threshold rollup query. This lets the
+-- materialized view below keep the table current as epochs are inserted.
+--
+-- Run with an explicit cutover epoch, the first epoch the view will see:
+-- 1) Pause the loader and read it: SELECT max(epoch) + 1 FROM validators_summary;
+-- 2) clickhouse-client --multiquery --param_cutover_epoch=<cutover> < nodeset_daily_attestation_rollup.sql
+-- 3) Resume the loader.
+-- The view then sees every epoch from the cutover on and the backfill covers everything
+-- before it, so no epoch is missed or counted twice (a day split across the two simply
+-- has two partial rows that sum up). Without the parameter the backfill fails instead of
+-- inserting nothing. The router only reads the rollup once its first day is at or before
+-- the requested window, so an empty or partly backfilled table falls back to the raw query.
 
 CREATE TABLE IF NOT EXISTS validators_daily_attestation_rollup
 (
     day_partition Int64,
     val_id Int64,
-    val_nos_id Nullable(UInt32),
-    val_nos_name Nullable(String),
-    active_duty_epochs UInt32,
-    actual_rewards UInt64,
-    theoretical_max_rewards UInt64,
-    attestations_made UInt32,
-    blocks_proposed UInt32,
-    proposer_slots UInt32,
-    sync_percent_sum Float64,
-    sync_percent_count UInt32,
-    updated_at DateTime DEFAULT now()
+    val_nos_id SimpleAggregateFunction(anyLast, Nullable(UInt32)),
+    val_nos_name SimpleAggregateFunction(anyLast, Nullable(String)),
+    active_duty_epochs SimpleAggregateFunction(sum, UInt64),
+    actual_rewards SimpleAggregateFunction(sum, UInt64),
+    theoretical_max_rewards SimpleAggregateFunction(sum, UInt64),
+    attestations_made SimpleAggregateFunction(sum, UInt64),
+    blocks_proposed SimpleAggregateFunction(sum, UInt64),
+    proposer_slots SimpleAggregateFunction(sum, UInt64),
+    sync_percent_sum SimpleAggregateFunction(sum, Float64),
+    sync_percent_count SimpleAggregateFunction(sum, UInt64),
+    updated_at SimpleAggregateFunction(max, DateTime)
 )
-ENGINE = ReplacingMergeTree(updated_at)
+ENGINE = AggregatingMergeTree
 PARTITION BY day_partition
 ORDER BY (day_partition, val_id);
 
--- One-time backfill (can take time on large datasets).
+-- Incremental maintenance: each insert into validators_summary is pre-aggregated per
+-- (day_partition, val_id) and appended to the rollup.
+CREATE MATERIALIZED VIEW IF NOT EXISTS validators_daily_attestation_rollup_mv
+TO validators_daily_attestation_rollup
+AS
+SELECT
+    intDiv(epoch, 225) as day_partition,
+    val_id,
+    anyLast(val_nos_id) as val_nos_id,
+    anyLast(val_nos_name) as val_nos_name,
+    toUInt64(countIf(val_status IN ('active_ongoing', 'active_slashed') AND val_nos_id IS NOT NULL)) as active_duty_epochs,
+    toUInt64(sumIf(COALESCE(att_earned_reward, 0), val_status IN ('active_ongoing', 'active_slashed') AND val_nos_id IS NOT NULL)) as actual_rewards,
+    toUInt64(sumIf(COALESCE(att_earned_reward, 0) + COALESCE(att_missed_reward, 0), val_status IN ('active_ongoing', 'active_slashed') AND val_nos_id IS NOT NULL)) as theoretical_max_rewards,
+    toUInt64(sumIf(att_happened = 1, val_status IN ('active_ongoing', 'active_slashed') AND val_nos_id IS NOT NULL)) as attestations_made,
+    toUInt64(sumIf((is_proposer = 1) AND (block_proposed = 1), val_status IN ('active_ongoing', 'active_slashed') AND val_nos_id IS NOT NULL)) as blocks_proposed,
+    toUInt64(sumIf(is_proposer = 1, val_status IN ('active_ongoing', 'active_slashed') AND val_nos_id IS NOT NULL)) as proposer_slots,
+    toFloat64(sumIf(COALESCE(sync_percent, 0), val_status IN ('active_ongoing', 'active_slashed') AND val_nos_id IS NOT NULL AND sync_percent IS NOT NULL)) as sync_percent_sum,
+    toUInt64(countIf(val_status IN ('active_ongoing', 'active_slashed') AND val_nos_id IS NOT NULL AND sync_percent IS NOT NULL)) as sync_percent_count,
+    now() as updated_at
+FROM validators_summary
+WHERE val_nos_name IS NOT NULL
+GROUP BY day_partition, val_id;
+
+-- One-time backfill of the history that predates the view (can take time on large
+-- datasets): every epoch below the cutover.
 INSERT INTO validators_daily_attestation_rollup
 SELECT
     intDiv(epoch, 225) as day_partition,
     val_id,
     anyLast(val_nos_id) as val_nos_id,
     anyLast(val_nos_name) as val_nos_name,
-    countIf(val_status IN ('active_ongoing', 'active_slashed') AND val_nos_id IS NOT NULL) as active_duty_epochs,
-    sumIf(COALESCE(att_earned_reward, 0), val_status IN ('active_ongoing', 'active_slashed') AND val_nos_id IS NOT NULL) as actual_rewards,
-    sumIf(COALESCE(att_earned_reward, 0) + COALESCE(att_missed_reward, 0), val_status IN ('active_ongoing', 'active_slashed') AND val_nos_id IS NOT NULL) as theoretical_max_rewards,
-    sumIf(att_happened = 1, val_status IN ('active_ongoing', 'active_slashed') AND val_nos_id IS NOT NULL) as attestations_made,
-    sumIf((is_proposer = 1) AND (block_proposed = 1), val_status IN ('active_ongoing', 'active_slashed') AND val_nos_id IS NOT NULL) as blocks_proposed,
-    sumIf(is_proposer = 1, val_status IN ('active_ongoing', 'active_slashed') AND val_nos_id IS NOT NULL) as proposer_slots,
-    sumIf(COALESCE(sync_percent, 0), val_status IN ('active_ongoing', 'active_slashed') AND val_nos_id IS NOT NULL AND sync_percent IS NOT NULL) as sync_percent_sum,
-    countIf(val_status IN ('active_ongoing', 'active_slashed') AND val_nos_id IS NOT NULL AND sync_percent IS NOT NULL) as sync_percent_count,
+    toUInt64(countIf(val_status IN ('active_ongoing', 'active_slashed') AND val_nos_id IS NOT NULL)) as active_duty_epochs,
+    toUInt64(sumIf(COALESCE(att_earned_reward, 0), val_status IN ('active_ongoing', 'active_slashed') AND val_nos_id IS NOT NULL)) as actual_rewards,
+    toUInt64(sumIf(COALESCE(att_earned_reward, 0) + COALESCE(att_missed_reward, 0), val_status IN ('active_ongoing', 'active_slashed') AND val_nos_id IS NOT NULL)) as theoretical_max_rewards,
+    toUInt64(sumIf(att_happened = 1, val_status IN ('active_ongoing', 'active_slashed') AND val_nos_id IS NOT NULL)) as attestations_made,
+    toUInt64(sumIf((is_proposer = 1) AND (block_proposed = 1), val_status IN ('active_ongoing', 'active_slashed') AND val_nos_id IS NOT NULL)) as blocks_proposed,
+    toUInt64(sumIf(is_proposer = 1, val_status IN ('active_ongoing', 'active_slashed') AND val_nos_id IS NOT NULL)) as proposer_slots,
+    toFloat64(sumIf(COALESCE(sync_percent, 0), val_status IN ('active_ongoing', 'active_slashed') AND val_nos_id IS NOT NULL AND sync_percent IS NOT NULL)) as sync_percent_sum,
+    toUInt64(countIf(val_status IN ('active_ongoing', 'active_slashed') AND val_nos_id IS NOT NULL AND sync_percent IS NOT NULL)) as sync_percent_count,
     now() as updated_at
 FROM validators_summary
+WHERE val_nos_name IS NOT NULL
+  AND epoch < {cutover_epoch:UInt64}
 GROUP BY day_partition, val_id;
 
--- Daily refresh pattern:
--- 1) Delete one day partition.
--- 2) Re-insert that partition from validators_summary.
+-- Migrating from the earlier ReplacingMergeTree rollup (loader paused throughout):
+-- 1) RENAME TABLE validators_daily_attestation_rollup TO validators_daily_attestation_rollup_old;
+-- 2) Run this file with the cutover as above (table, view, backfill).
+-- 3) Days whose validators_summary partitions were already dropped only exist in the old
+--    table; carry them over:
+--    INSERT INTO validators_daily_attestation_rollup
+--    SELECT day_partition, val_id, val_nos_id, val_nos_name,
+--        toUInt64(active_duty_epochs), actual_rewards, theoretical_max_rewards,
+--        toUInt64(attestations_made), toUInt64(blocks_proposed), toUInt64(proposer_slots),
+--        sync_percent_sum, toUInt64(sync_percent_count), updated_at
+--    FROM validators_daily_attestation_rollup_old FINAL
+--    WHERE day_partition < (SELECT intDiv(min(epoch), 225) FROM validators_summary);
+-- 4) Resume the loader, then DROP TABLE validators_daily_attestation_rollup_old;
+-- The per-day DELETE + re-INSERT refresh is no longer needed for ongoing maintenance.
 --
--- Example:
+-- Per-day rebuild (e.g. epochs inserted while the loader could not be paused, or after a
+-- backfill correction):
 -- ALTER TABLE validators_daily_attestation_rollup DELETE WHERE day_partition = 1924;
 -- INSERT INTO validators_daily_attestation_rollup
--- SELECT ...same SELECT above...
+-- SELECT ...same SELECT as the backfill above...
 -- FROM validators_summary
--- WHERE intDiv(epoch, 225) = 1924
+-- WHERE intDiv(epoch, 225) = 1924 AND val_nos_name IS NOT NULL
 -- GROUP BY day_partition, val_id;
+--
+-- Optional: collapse unmerged partial rows for a finished day.
+-- OPTIMIZE TABLE validators_daily_attestation_rollup PARTITION 1924 FINAL;
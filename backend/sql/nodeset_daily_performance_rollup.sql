@@ -0,0 +1,94 @@
+-- Daily per-validator rollup for the theoretical_performance/extended endpoint.
+-- Purpose: a 31-day window reads 6975 epochs per validator from validators_summary; with
+-- this table whole days are read as one row per (day_partition, val_id, val_nos_name), and
+-- only the partial leading day plus the most recent 225 epochs still come from the raw
+-- table (THEORETICAL_PERFORMANCE_EXTENDED_ROLLUP_QUERY).
+--
+-- Rows carry the same filter as the raw query (NodeSet validators not in an exit state);
+-- val_nos_name is never NULL after that filter, so it is stored as a plain String key.
+-- Columns are SimpleAggregateFunction states, kept current by the materialized view below
+-- in the same way as validators_daily_attestation_rollup.
+--
+-- Run with an explicit cutover epoch, the first epoch the view will see, exactly as for
+-- validators_daily_attestation_rollup: pause the loader, read SELECT max(epoch) + 1 FROM
+-- validators_summary, run this file with --param_cutover_epoch=<cutover>, resume the loader.
+-- The router only reads the rollup once its first day is at or before the window's first
+-- whole day, so an empty or partly backfilled table falls back to the raw query.
+
+CREATE TABLE IF NOT EXISTS validators_daily_performance_rollup
+(
+    day_partition Int64,
+    val_id Int64,
+    val_nos_name String,
+    data_points SimpleAggregateFunction(sum, UInt64),
+    actual_rewards SimpleAggregateFunction(sum, UInt64),
+    theoretical_max_rewards SimpleAggregateFunction(sum, UInt64),
+    attestations_made SimpleAggregateFunction(sum, UInt64),
+    attestations_missed SimpleAggregateFunction(sum, UInt64),
+    blocks_proposed SimpleAggregateFunction(sum, UInt64),
+    blocks_missed SimpleAggregateFunction(sum, UInt64),
+    sync_percent_sum SimpleAggregateFunction(sum, Float64),
+    sync_percent_count SimpleAggregateFunction(sum, UInt64),
+    updated_at SimpleAggregateFunction(max, DateTime)
+)
+ENGINE = AggregatingMergeTree
+PARTITION BY day_partition
+ORDER BY (day_partition, val_id, val_nos_name);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS validators_daily_performance_rollup_mv
+TO validators_daily_performance_rollup
+AS
+SELECT
+    intDiv(epoch, 225) as day_partition,
+    val_id,
+    val_nos_name,
+    toUInt64(count()) as data_points,
+    toUInt64(SUM(COALESCE(att_earned_reward, 0))) as actual_rewards,
+    toUInt64(SUM(COALESCE(att_earned_reward, 0) + COALESCE(att_missed_reward, 0))) as theoretical_max_rewards,
+    toUInt64(countIf(att_happened = 1)) as attestations_made,
+    toUInt64(countIf(att_happened = 0 OR att_happened IS NULL)) as attestations_missed,
+    toUInt64(countIf(is_proposer = 1 AND block_proposed = 1)) as blocks_proposed,
+    toUInt64(countIf(is_proposer = 1 AND (block_proposed = 0 OR block_proposed IS NULL))) as blocks_missed,
+    toFloat64(sumIf(COALESCE(sync_percent, 0), sync_percent IS NOT NULL)) as sync_percent_sum,
+    toUInt64(countIf(sync_percent IS NOT NULL)) as sync_percent_count,
+    now() as updated_at
+FROM validators_summary
+WHERE val_nos_name IS NOT NULL
+  AND val_status NOT IN ('exited_unslashed', 'active_exiting', 'withdrawal_possible', 'withdrawal_done')
+GROUP BY day_partition, val_id, val_nos_name;
+
+-- One-time backfill of the history that predates the view: every epoch below the cutover.
+INSERT INTO validators_daily_performance_rollup
+SELECT
+    intDiv(epoch, 225) as day_partition,
+    val_id,
+    val_nos_name,
+    toUInt64(count()) as data_points,
+    toUInt64(SUM(COALESCE(att_earned_reward, 0))) as actual_rewards,
+    toUInt64(SUM(COALESCE(att_earned_reward, 0) + COALESCE(att_missed_reward, 0))) as theoretical_max_rewards,
+    toUInt64(countIf(att_happened = 1)) as attestations_made,
+    toUInt64(countIf(att_happened = 0 OR att_happened IS NULL)) as attestations_missed,
+    toUInt64(countIf(is_proposer = 1 AND block_proposed = 1)) as blocks_proposed,
+    toUInt64(countIf(is_proposer = 1 AND (block_proposed = 0 OR block_proposed IS NULL))) as blocks_missed,
+    toFloat64(sumIf(COALESCE(sync_percent, 0), sync_percent IS NOT NULL)) as sync_percent_sum,
+    toUInt64(countIf(sync_percent IS NOT NULL)) as sync_percent_count,
+    now() as updated_at
+FROM validators_summary
+WHERE val_nos_name IS NOT NULL
+  AND val_status NOT IN ('exited_unslashed', 'active_exiting', 'withdrawal_possible', 'withdrawal_done')
+  AND epoch < {cutover_epoch:UInt64}
+GROUP BY day_partition, val_id, val_nos_name;
+
+-- Per-day rebuild (e.g. epochs inserted while the loader could not be paused, or after a
+-- backfill correction):
+-- ALTER TABLE validators_daily_performance_rollup DELETE WHERE day_partition = 1924;
+-- INSERT INTO validators_daily_performance_rollup
+-- SELECT ...same SELECT as the backfill above...
+-- FROM validators_summary
+-- WHERE intDiv(epoch, 225) = 1924 AND val_nos_name IS NOT NULL
+--   AND val_status NOT IN ('exited_unslashed', 'active_exiting', 'withdrawal_possible', 'withdrawal_done')
+-- GROUP BY day_partition, val_id, val_nos_name;
+--
+-- The router checks minOrNull(day_partition) of validators_daily_performance_rollup against
+-- the window and falls back to the raw query when the table is missing, does not cover the
+-- window yet, or the rollup query fails.
@@ -0,0 +1,112 @@
+-- Per-epoch, per-operator efficiency sums for the theoretical_performance_all endpoints.
+-- Purpose: OPERATOR_EFFICIENCY_QUERY aggregates every NodeSet validator row in the window
+-- (validators x epochs). The efficiency inputs are plain sums and counts, so they can be
+-- pre-aggregated to one row per (epoch, operator); the endpoints then read
+-- operators x epochs rows instead (OPERATOR_EFFICIENCY_ROLLUP_QUERY).
+--
+-- The proposer ideal reward uses the epoch's median proposal reward, which still comes
+-- from the raw table (a PREWHERE is_proposer = 1 scan). Because that median is per epoch,
+-- sum(median) over an operator's proposer duties in an epoch is proposer_duties * median,
+-- so only the duty count has to be stored here.
+--
+-- validator_count is a distinct count over the whole window and cannot be summed, so it
+-- is kept as a uniqExact state and merged at query time.
+--
+-- Ordered by (epoch, val_nos_name): the endpoints always read an epoch range for all
+-- operators. Rows carry the same filter as the raw query (NodeSet validators not in an exit
+-- state); val_nos_name is never NULL after that filter, so it is stored as a plain String.
+--
+-- Run with an explicit cutover epoch, the first epoch the view will see, exactly as for
+-- validators_daily_attestation_rollup: pause the loader, read SELECT max(epoch) + 1 FROM
+-- validators_summary, run this file with --param_cutover_epoch=<cutover>, resume the loader.
+-- The router only reads this table once its first epoch is at or before the window start,
+-- so an empty or partly backfilled table falls back to the raw query.
+
+CREATE TABLE IF NOT EXISTS validators_epoch_operator_stats
+(
+    epoch UInt64,
+    val_nos_name String,
+    validators AggregateFunction(uniqExact, Int64),
+    data_points SimpleAggregateFunction(sum, UInt64),
+    attester_actual_reward SimpleAggregateFunction(sum, UInt64),
+    attester_ideal_reward SimpleAggregateFunction(sum, UInt64),
+    proposer_actual_reward SimpleAggregateFunction(sum, UInt64),
+    proposer_duties SimpleAggregateFunction(sum, UInt64),
+    proposals_made SimpleAggregateFunction(sum, UInt64),
+    proposals_missed SimpleAggregateFunction(sum, UInt64),
+    sync_actual_reward SimpleAggregateFunction(sum, UInt64),
+    sync_ideal_reward SimpleAggregateFunction(sum, UInt64),
+    sync_duties SimpleAggregateFunction(sum, UInt64),
+    attestations_made SimpleAggregateFunction(sum, UInt64),
+    attestations_missed SimpleAggregateFunction(sum, UInt64),
+    sync_percent_sum SimpleAggregateFunction(sum, Float64),
+    sync_percent_count SimpleAggregateFunction(sum, UInt64)
+)
+ENGINE = AggregatingMergeTree
+PARTITION BY intDiv(epoch, 6750)
+ORDER BY (epoch, val_nos_name);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS validators_epoch_operator_stats_mv
+TO validators_epoch_operator_stats
+AS
+SELECT
+    epoch,
+    val_nos_name,
+    uniqExactState(toInt64(val_id)) as validators,
+    toUInt64(count()) as data_points,
+    toUInt64(SUM(COALESCE(att_earned_reward, 0))) as attester_actual_reward,
+    toUInt64(SUM(COALESCE(att_earned_reward, 0) + COALESCE(att_missed_reward, 0))) as attester_ideal_reward,
+    toUInt64(sumIf(COALESCE(propose_earned_reward, 0), is_proposer = 1)) as proposer_actual_reward,
+    toUInt64(countIf(is_proposer = 1)) as proposer_duties,
+    toUInt64(countIf(is_proposer = 1 AND block_proposed = 1)) as proposals_made,
+    toUInt64(countIf(is_proposer = 1 AND (block_proposed = 0 OR block_proposed IS NULL))) as proposals_missed,
+    toUInt64(sumIf(COALESCE(sync_earned_reward, 0), is_sync = 1)) as sync_actual_reward,
+    toUInt64(sumIf(COALESCE(sync_earned_reward, 0) + COALESCE(sync_missed_reward, 0), is_sync = 1)) as sync_ideal_reward,
+    toUInt64(countIf(is_sync = 1)) as sync_duties,
+    toUInt64(countIf(att_happened = 1)) as attestations_made,
+    toUInt64(countIf(att_happened = 0 OR att_happened IS NULL)) as attestations_missed,
+    toFloat64(sumIf(COALESCE(sync_percent, 0), is_sync = 1 AND sync_percent IS NOT NULL)) as sync_percent_sum,
+    toUInt64(countIf(is_sync = 1 AND sync_percent IS NOT NULL)) as sync_percent_count
+FROM validators_summary
+WHERE val_nos_name IS NOT NULL
+  AND val_status NOT IN ('exited_unslashed', 'active_exiting', 'withdrawal_possible', 'withdrawal_done')
+GROUP BY epoch, val_nos_name;
+
+-- One-time backfill of the history that predates the view: every epoch below the cutover.
+INSERT INTO validators_epoch_operator_stats
+SELECT
+    epoch,
+    val_nos_name,
+    uniqExactState(toInt64(val_id)) as validators,
+    toUInt64(count()) as data_points,
+    toUInt64(SUM(COALESCE(att_earned_reward, 0))) as attester_actual_reward,
+    toUInt64(SUM(COALESCE(att_earned_reward, 0) + COALESCE(att_missed_reward, 0))) as attester_ideal_reward,
+    toUInt64(sumIf(COALESCE(propose_earned_reward, 0), is_proposer = 1)) as proposer_actual_reward,
+    toUInt64(countIf(is_proposer = 1)) as proposer_duties,
+    toUInt64(countIf(is_proposer = 1 AND block_proposed = 1)) as proposals_made,
+    toUInt64(countIf(is_proposer = 1 AND (block_proposed = 0 OR block_proposed IS NULL))) as proposals_missed,
+    toUInt64(sumIf(COALESCE(sync_earned_reward, 0), is_sync = 1)) as sync_actual_reward,
+    toUInt64(sumIf(COALESCE(sync_earned_reward, 0) + COALESCE(sync_missed_reward, 0), is_sync = 1)) as sync_ideal_reward,
+    toUInt64(countIf(is_sync = 1)) as sync_duties,
+    toUInt64(countIf(att_happened = 1)) as attestations_made,
+    toUInt64(countIf(att_happened = 0 OR att_happened IS NULL)) as attestations_missed,
+    toFloat64(sumIf(COALESCE(sync_percent, 0), is_sync = 1 AND sync_percent IS NOT NULL)) as sync_percent_sum,
+    toUInt64(countIf(is_sync = 1 AND sync_percent IS NOT NULL)) as sync_percent_count
+FROM validators_summary
+WHERE val_nos_name IS NOT NULL
+  AND val_status NOT IN ('exited_unslashed', 'active_exiting', 'withdrawal_possible', 'withdrawal_done')
+  AND epoch < {cutover_epoch:UInt64}
+GROUP BY epoch, val_nos_name;
+
+-- If the loader could not be paused, rebuild each epoch it inserted around the cutover:
+-- ALTER TABLE validators_epoch_operator_stats DELETE WHERE epoch = 433125;
+-- INSERT INTO validators_epoch_operator_stats
+-- SELECT ...same SELECT as the backfill above...
+-- FROM validators_summary
+-- WHERE epoch = 433125 AND val_nos_name IS NOT NULL
+--   AND val_status NOT IN ('exited_unslashed', 'active_exiting', 'withdrawal_possible', 'withdrawal_done')
+-- GROUP BY epoch, val_nos_name;
+--
+-- The router checks minOrNull(epoch) of validators_epoch_operator_stats against the window
+-- and falls back to the raw query when the table is missing, does not cover the window yet,
+-- or the rollup query fails.
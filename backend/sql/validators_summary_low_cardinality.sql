@@ -0,0 +1,44 @@
+-- Dictionary-encode the NodeSet filter columns on validators_summary.
+-- Purpose: every query in the NodeSet router filters on val_status IN / NOT IN (...)
+-- and val_nos_name IS NOT NULL over the whole epoch window. As plain String
+-- columns each row compares variable-length bytes; LowCardinality stores a small
+-- dictionary plus integer codes, so the columns shrink several times on disk and
+-- the comparisons run on codes. The theoretical_performance queries also
+-- GROUP BY val_nos_name; with a LowCardinality key ClickHouse aggregates on the
+-- dictionary codes instead of hashing each operator string per row. No query
+-- changes are needed.
+--
+-- val_status has a fixed beacon-chain domain (pending_initialized, pending_queued,
+-- active_ongoing, active_exiting, active_slashed, exited_unslashed, exited_slashed,
+-- withdrawal_possible, withdrawal_done). LowCardinality is used rather than Enum8
+-- so that an unexpected status from the loader does not make the insert fail.
+
+-- Check the current types first (skip any column that is already LowCardinality).
+SELECT name, type
+FROM system.columns
+WHERE database = currentDatabase()
+  AND table = 'validators_summary'
+  AND name IN ('val_status', 'val_nos_name');
+
+-- Rewrites the columns in every part (runs as a background mutation).
+ALTER TABLE validators_summary
+    MODIFY COLUMN val_status LowCardinality(String);
+
+ALTER TABLE validators_summary
+    MODIFY COLUMN val_nos_name LowCardinality(Nullable(String));
+
+-- Wait for the mutations to finish before comparing sizes.
+SELECT command, parts_to_do, is_done
+FROM system.mutations
+WHERE table = 'validators_summary' AND NOT is_done;
+
+-- Compare on-disk size of the two columns before/after.
+SELECT
+    name,
+    type,
+    formatReadableSize(data_compressed_bytes) as compressed,
+    formatReadableSize(data_uncompressed_bytes) as uncompressed
+FROM system.columns
+WHERE database = currentDatabase()
+  AND table = 'validators_summary'
+  AND name IN ('val_status', 'val_nos_name');
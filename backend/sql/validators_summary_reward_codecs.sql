@@ -0,0 +1,76 @@
+-- Narrow and re-encode the per-epoch reward columns on validators_summary.
+-- Purpose: the theoretical_performance, below_threshold and efficiency queries are mostly
+-- SUMs over these columns for every NodeSet validator in the window, so they are bound by
+-- the bytes read. A single epoch's earned or missed reward is a few thousand to a few
+-- million gwei, so 64-bit storage is mostly zero bytes. UInt32 halves the uncompressed
+-- width and T64 + ZSTD packs the values into the bits actually used. SUM over UInt32 still
+-- returns UInt64, so no query changes are needed.
+--
+-- Penalties may be stored signed and have no hard upper bound, so those columns keep their
+-- type and only get the codec. Balances (val_balance, val_effective_balance) are ~32e9 gwei
+-- and must stay 64-bit; only their codec changes too. The effective balance is the same
+-- 32 ETH for almost every row, so T64 + a higher ZSTD level shrinks it to a fraction of
+-- its size.
+--
+-- Run with clickhouse-client --multiquery: the script stops at the first error, so the
+-- assertion below aborts it before any column is narrowed.
+-- The loader must keep writing values in range afterwards; if that ever changes, widen
+-- the columns back first (MODIFY COLUMN ... Nullable(Int64) CODEC(T64, ZSTD(1))).
+
+-- Current types, for the record.
+SELECT name, type
+FROM system.columns
+WHERE database = currentDatabase()
+  AND table = 'validators_summary'
+  AND name IN ('att_earned_reward', 'att_missed_reward', 'att_penalty',
+               'propose_earned_reward', 'propose_missed_reward', 'propose_penalty',
+               'sync_earned_reward', 'sync_missed_reward', 'sync_penalty');
+
+-- Abort unless every value of the narrowed columns fits in UInt32 (NULLs are kept as
+-- NULL). A negative value or one >= 2^32 would wrap silently under MODIFY COLUMN.
+SELECT throwIf(
+    countIf(
+        ifNull(att_earned_reward, 0) NOT BETWEEN 0 AND 4294967295
+        OR ifNull(att_missed_reward, 0) NOT BETWEEN 0 AND 4294967295
+        OR ifNull(propose_earned_reward, 0) NOT BETWEEN 0 AND 4294967295
+        OR ifNull(propose_missed_reward, 0) NOT BETWEEN 0 AND 4294967295
+        OR ifNull(sync_earned_reward, 0) NOT BETWEEN 0 AND 4294967295
+        OR ifNull(sync_missed_reward, 0) NOT BETWEEN 0 AND 4294967295
+    ) > 0,
+    'validators_summary reward values do not fit in UInt32; not narrowing'
+) as reward_range_check
+FROM validators_summary;
+
+-- Rewrites the columns in every part (runs as background mutations).
+ALTER TABLE validators_summary
+    MODIFY COLUMN att_earned_reward Nullable(UInt32) CODEC(T64, ZSTD(1)),
+    MODIFY COLUMN att_missed_reward Nullable(UInt32) CODEC(T64, ZSTD(1)),
+    MODIFY COLUMN propose_earned_reward Nullable(UInt32) CODEC(T64, ZSTD(1)),
+    MODIFY COLUMN propose_missed_reward Nullable(UInt32) CODEC(T64, ZSTD(1)),
+    MODIFY COLUMN sync_earned_reward Nullable(UInt32) CODEC(T64, ZSTD(1)),
+    MODIFY COLUMN sync_missed_reward Nullable(UInt32) CODEC(T64, ZSTD(1));
+
+-- Codec-only changes: the penalty and balance columns keep their types.
+ALTER TABLE validators_summary
+    MODIFY COLUMN att_penalty CODEC(T64, ZSTD(1)),
+    MODIFY COLUMN propose_penalty CODEC(T64, ZSTD(1)),
+    MODIFY COLUMN sync_penalty CODEC(T64, ZSTD(1)),
+    MODIFY COLUMN val_balance CODEC(T64, ZSTD(3)),
+    MODIFY COLUMN val_effective_balance CODEC(T64, ZSTD(3));
+
+-- Wait for the mutations to finish before comparing sizes.
+SELECT command, parts_to_do, is_done
+FROM system.mutations
+WHERE table = 'validators_summary' AND NOT is_done;
+
+-- Compare on-disk size of the columns before/after.
+SELECT
+    name,
+    type,
+    compression_codec,
+    formatReadableSize(data_compressed_bytes) as compressed,
+    formatReadableSize(data_uncompressed_bytes) as uncompressed
+FROM system.columns
+WHERE database = currentDatabase()
+  AND table = 'validators_summary'
+  AND (name LIKE '%reward' OR name LIKE '%penalty' OR name LIKE 'val_%balance');
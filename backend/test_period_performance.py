@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Test script to verify per-operator period performance aggregation, including
+validators whose operator is null
+"""
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from routers.data import _aggregate_period_performance
+
+def test_period_performance_aggregation():
+    """Test operator totals, ordering and the null-operator bucket"""
+    data = {
+        "last_updated": "2024-01-01T00:00:00",
+        "total_validators": 5,
+        "validators": {
+            "1": {"operator": "0xb", "validator_index": 1, "performance_metrics": {"performance_7d": 99.0}},
+            "2": {"operator": None, "validator_index": 2, "performance_metrics": {"performance_7d": 90.0}},
+            "3": {"operator": "0xa", "validator_index": 3, "performance_metrics": {"performance_7d": 100.0}},
+            "4": {"operator": "0xb", "validator_index": 4, "performance_metrics": {"performance_7d": 97.0}},
+            "5": {"operator": None, "validator_index": 5, "performance_metrics": {}},
+        }
+    }
+
+    result = _aggregate_period_performance(data, "7d", "performance_7d")
+    operators = result["operators_performance"]
+
+    print("Test 1: Operators are listed in first-seen order")
+    assert list(operators) == ["0xb", None, "0xa"], list(operators)
+    assert result["operator_count"] == 3
+    print("  ✓ Order preserved")
+
+    print("\nTest 2: Totals, counts and averages per operator")
+    assert operators["0xb"]["total_performance"] == 196.0
+    assert operators["0xb"]["count"] == 2
+    assert operators["0xb"]["average_performance"] == 98.0
+    assert [v["validator_index"] for v in operators["0xb"]["validators"]] == [1, 4]
+    print("  ✓ Totals match")
+
+    print("\nTest 3: Validators with a null operator keep the None bucket")
+    assert operators[None] == {
+        "validators": [{"validator_index": 2, "performance": 90.0}],
+        "total_performance": 90.0,
+        "count": 1,
+        "average_performance": 90.0
+    }
+    print("  ✓ Null operator aggregated")
+
+    print("\nTest 4: No validators reporting the period")
+    empty = _aggregate_period_performance(data, "31d", "performance_31d")
+    assert empty["operators_performance"] == {}
+    assert empty["operator_count"] == 0
+    print("  ✓ Empty period handled")
+
+if __name__ == "__main__":
+    test_period_performance_aggregation()
@@ -2,6 +2,27 @@
 Utility functions for the NodeSet Validator Dashboard backend
 """
 
+import functools
+import hashlib
+import os
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Tuple, Union
+
+from fastapi import HTTPException
+import orjson
+from fastapi.responses import JSONResponse, Response
+
+# Last whole second and its formatted ISO timestamp, reused by iso_now()
+_TS_CACHE = [0, ""]
+
+# Per-epoch ClickHouse responses: shared caches may reuse them within an epoch (~6.4 min)
+EPOCH_CACHE_CONTROL = "public, max-age=30, stale-while-revalidate=120"
+
+# (endpoint name, query parameters) -> (ETag, source data object, serialized response body)
+# for file-backed data endpoints
+_serialized_responses: Dict[Tuple[str, Tuple], Tuple[str, Any, bytes]] = {}
+
 def format_operator_display_plain(address: str, ens_names: dict) -> str:
     """
     Format operator address for plain text display with ENS name if available
@@ -43,4 +64,128 @@ def get_performance_category(performance: float) -> str:
     elif performance >= 97.0:
         return "Average"
     else:
-        return "Poor"
\ No newline at end of file
+        return "Poor"
+
+def iso_now() -> str:
+    """
+    Current local time as an ISO 8601 string, formatted at most once per second
+    
+    Returns:
+        ISO timestamp with second resolution
+    """
+    t = int(time.time())
+    cache = _TS_CACHE
+    if t != cache[0]:
+        cache[1] = datetime.fromtimestamp(t).isoformat()
+        cache[0] = t
+    return cache[1]
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson (numpy values and non-str keys allowed)"""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+def _format_message(message: Union[str, Callable[..., str]], kwargs: Dict[str, Any]) -> str:
+    """Build a success message from a template string or a callable taking the endpoint arguments"""
+    return message(**kwargs) if callable(message) else message.format(**kwargs)
+
+def analytics_endpoint(message: Union[str, Callable[..., str]], error_message: str):
+    """
+    Wrap an async handler returning an analytics result dict in the standard response envelope
+    
+    Args:
+        message: Success message, formatted with the endpoint's keyword arguments
+        error_message: Prefix for the 500 detail if the handler raises
+        
+    Returns:
+        Decorator emitting {data, success, message, timestamp}, 404 on an error dict
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(**kwargs):
+            try:
+                result = await func(**kwargs)
+            except HTTPException:
+                raise
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=f"{error_message}: {str(e)}")
+            
+            if "error" in result:
+                raise HTTPException(status_code=404, detail=result["error"])
+            
+            return FastJSONResponse({
+                "data": result,
+                "success": True,
+                "message": _format_message(message, kwargs),
+                "timestamp": iso_now()
+            })
+        return wrapper
+    return decorator
+
+def _file_etag(path: str, params: Tuple = ()) -> str:
+    """Build a strong ETag from a file's path, modification time and size plus any query parameters"""
+    stat = os.stat(path)
+    digest = hashlib.blake2b(f"{path}:{stat.st_mtime_ns}:{stat.st_size}:{params!r}".encode(), digest_size=8).hexdigest()
+    return f'"{digest}"'
+
+def epoch_etag(endpoint: str, latest_epoch: int, params: Tuple = ()) -> str:
+    """Build a weak ETag for a response that only changes when a new epoch lands"""
+    digest = hashlib.blake2b(repr(params).encode(), digest_size=6).hexdigest()
+    return f'W/"{latest_epoch}-{endpoint}-{digest}"'
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Check an If-None-Match header value against an ETag (weak comparison)"""
+    opaque_tag = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") in (opaque_tag, "*") for tag in if_none_match.split(","))
+
+def data_endpoint(message: Union[str, Callable[..., str]], not_found: str, cache_bytes: bool = False):
+    """
+    Wrap an async handler returning (data, source_file) in the standard data response envelope
+    
+    Args:
+        message: Success message, formatted with the endpoint's keyword arguments
+        not_found: 404 detail when the handler returns no data
+        cache_bytes: Reuse the serialized body while the source file is unchanged and
+            answer matching If-None-Match with 304 (handler must take a `request` argument)
+        
+    Returns:
+        Decorator emitting {data, source_file, success, message}
+    """
+    def decorator(func):
+        cache_name = f"{func.__module__}.{func.__name__}"
+        
+        @functools.wraps(func)
+        async def wrapper(**kwargs):
+            # Unexpected errors propagate to the app-wide exception handler
+            data, source_file = await func(**kwargs)
+            if data is None:
+                raise HTTPException(status_code=404, detail=not_found)
+            
+            content = {
+                "data": data,
+                "source_file": source_file,
+                "success": True,
+                "message": _format_message(message, kwargs)
+            }
+            if not cache_bytes or not source_file:
+                return FastJSONResponse(content)
+            
+            params = tuple(sorted((k, v) for k, v in kwargs.items() if k != "request"))
+            try:
+                etag = _file_etag(source_file, params)
+            except OSError:
+                return FastJSONResponse(content)
+            
+            headers = {"ETag": etag, "Cache-Control": "private, max-age=5"}
+            if_none_match = kwargs["request"].headers.get("if-none-match")
+            if if_none_match and etag_matches(if_none_match, etag):
+                return Response(status_code=304, headers=headers)
+            
+            cached = _serialized_responses.get((cache_name, params))
+            if not cached or cached[0] != etag or cached[1] is not data:
+                cached = (etag, data, FastJSONResponse(content).body)
+                _serialized_responses[(cache_name, params)] = cached
+            return Response(content=cached[2], media_type="application/json", headers=headers)
+        return wrapper
+    return decorator